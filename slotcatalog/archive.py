@@ -0,0 +1,382 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Each pack record: magic, url/name/data lengths, codec, then url, name and
+# the compressed page. The header makes the pack self-describing, so the
+# index can always be rebuilt from it.
+MAGIC = b'PG01'
+HEADER = struct.Struct('<4sHHIB')
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Index line: url, name, offset, length, codec, sha1 of the raw page
+IndexEntry = namedtuple('IndexEntry', ['url', 'name', 'offset', 'length', 'codec', 'sha1'])
+
+
+class ArchivePage(namedtuple('ArchivePage', ['archive', 'url', 'name', 'sha1'])):
+    """
+    Reference to one page in an archive. Has the `name` and `stem` of the
+    file it replaces, so extractors can treat it like a Path.
+    """
+    __slots__ = ()
+
+    @property
+    def stem(self):
+        return os.path.splitext(self.name)[0]
+
+    def __str__(self):
+        return self.name
+
+
+class PageArchive:
+    """
+    Append-only pack of compressed pages with an offset index keyed by URL.
+
+    Pages are appended to `<path>` and located through `<path>.idx`, which is
+    loaded into a dict on open, so membership checks are O(1) and reads are a
+    slice of a memory-mapped file plus one decompression. Re-adding a URL
+    appends a new copy; the latest one wins until compact() drops the rest.
+    """
+
+    def __init__(self, path, writable=False, level=None):
+        """
+        Args:
+            path (str or Path): Pack file (e.g. game_details.pack)
+            writable (bool): Open for appending
+            level (int, optional): Compression level
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + '.idx')
+        self.writable = writable
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self.level = level if level is not None else (10 if self.codec == CODEC_ZSTD else 6)
+        self._map = None
+        self._file = None
+        self._pack = None
+        self._index = None
+        self._open()
+
+    def _open(self):
+        self.entries = {}
+        if self.writable:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.touch(exist_ok=True)
+        self._load_index()
+        if self.writable:
+            self._pack = open(self.path, 'ab')
+            self._index = open(self.index_path, 'a', encoding='utf-8')
+
+    def _load_index(self):
+        end = 0
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t')
+                    if len(parts) != 6:
+                        continue
+                    entry = IndexEntry(parts[0], parts[1], int(parts[2]), int(parts[3]), int(parts[4]), parts[5])
+                    self.entries[entry.url] = entry
+                    end = max(end, entry.offset + entry.length)
+        # Pages appended after the last index write (e.g. a crash) are recovered from the pack
+        if self.path.exists() and self.path.stat().st_size > end:
+            recovered = list(self._scan(end))
+            for entry in recovered:
+                self.entries[entry.url] = entry
+            if recovered and self.writable:
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.writelines(self._index_line(entry) for entry in recovered)
+
+    def _scan(self, offset=0):
+        """
+        Walk pack records from `offset`, yielding index entries.
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                magic, url_len, name_len, data_len, codec = HEADER.unpack(header)
+                if magic != MAGIC:
+                    raise ValueError(f"Corrupt archive {self.path} at offset {offset}")
+                url = f.read(url_len).decode('utf-8')
+                name = f.read(name_len).decode('utf-8')
+                data_offset = f.tell()
+                data = f.read(data_len)
+                if len(data) < data_len:
+                    return  # truncated final record
+                sha1 = hashlib.sha1(self._decompress(codec, data)).hexdigest()
+                yield IndexEntry(url, name, data_offset, data_len, codec, sha1)
+                offset = data_offset + data_len
+
+    @staticmethod
+    def _index_line(entry):
+        return '\t'.join(str(value) for value in entry) + '\n'
+
+    def _compress(self, data):
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return zlib.compress(data, self.level)
+
+    @staticmethod
+    def _decompress(codec, data):
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("This archive uses zstandard, which is not installed")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def urls(self):
+        return list(self.entries)
+
+    def pages(self):
+        """
+        Returns:
+            list: ArchivePage references for every page, in insertion order
+        """
+        return [ArchivePage(str(self.path), entry.url, entry.name, entry.sha1) for entry in self.entries.values()]
+
+    def put(self, url, html, name=None):
+        """
+        Append a page. Unchanged content for a URL already stored is skipped.
+
+        Args:
+            url (str): Page URL (the index key)
+            html (str or bytes): Page content
+            name (str, optional): File name the page would have on disk
+
+        Returns:
+            bool: True if the page was written
+        """
+        if not self.writable:
+            raise IOError(f"{self.path} is open read-only")
+        raw = html.encode('utf-8') if isinstance(html, str) else html
+        sha1 = hashlib.sha1(raw).hexdigest()
+        existing = self.entries.get(url)
+        if existing and existing.sha1 == sha1:
+            return False
+
+        name = name or url.rstrip('/').split('/')[-1] + '.html'
+        data = self._compress(raw)
+        url_bytes, name_bytes = url.encode('utf-8'), name.encode('utf-8')
+        offset = self._pack.tell()
+        self._pack.write(HEADER.pack(MAGIC, len(url_bytes), len(name_bytes), len(data), self.codec))
+        self._pack.write(url_bytes)
+        self._pack.write(name_bytes)
+        self._pack.write(data)
+        self._pack.flush()
+
+        entry = IndexEntry(url, name, offset + HEADER.size + len(url_bytes) + len(name_bytes),
+                           len(data), self.codec, sha1)
+        self._index.write(self._index_line(entry))
+        self._index.flush()
+        self.entries[url] = entry
+        return True
+
+    def get(self, url, default=None):
+        """
+        Returns:
+            str: Page content, or `default` if the URL is not archived
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            return default
+        return self.read(entry)
+
+    def read(self, entry):
+        """
+        Returns:
+            str: Page content with newlines translated as open() would
+        """
+        end = entry.offset + entry.length
+        if self._map is None or len(self._map) < end:
+            self._remap()
+        html = self._decompress(entry.codec, self._map[entry.offset:end]).decode('utf-8')
+        return html.replace('\r\n', '\n').replace('\r', '\n')
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def compact(self):
+        """
+        Rewrite the pack keeping only the latest copy of every URL.
+        """
+        tmp_path = self.path.with_name(self.path.name + '.compact')
+        tmp_index = tmp_path.with_name(tmp_path.name + '.idx')
+        for stale in (tmp_path, tmp_index):
+            if stale.exists():
+                stale.unlink()
+        with PageArchive(tmp_path, writable=True) as target:
+            for entry in self.entries.values():
+                target.put(entry.url, self.read(entry), name=entry.name)
+        self.close()
+        os.replace(tmp_index, self.index_path)
+        os.replace(tmp_path, self.path)
+        self._open()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+        if self._pack is not None:
+            self._pack.close()
+            self._index.close()
+            self._pack = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Archives opened by read_page, one per path and process (also in pool workers)
+_readers = {}
+
+
+def is_archive(source):
+    return str(source).endswith('.pack')
+
+
+def list_pages(source, pattern='*.html'):
+    """
+    Pages of an input source, which is either a directory of HTML files or a
+    .pack archive.
+
+    Returns:
+        list: Paths (directory) or ArchivePage references (archive)
+    """
+    if is_archive(source):
+        with PageArchive(source) as archive:
+            return archive.pages()
+    return list(Path(source).glob(pattern))
+
+
+def read_page(page):
+    """
+    Read a page given as a file path or an ArchivePage.
+    """
+    if isinstance(page, ArchivePage):
+        archive = _readers.get(page.archive)
+        if archive is None:
+            archive = _readers[page.archive] = PageArchive(page.archive)
+        entry = archive.entries.get(page.url)
+        if entry is None:
+            # Archive grew since it was opened
+            archive = _readers[page.archive] = PageArchive(page.archive)
+            entry = archive.entries[page.url]
+        return archive.read(entry)
+    with open(page, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def page_name(page):
+    """
+    File name of a page reference, e.g. 'Book-of-Dead.html'.
+    """
+    return page.name if isinstance(page, ArchivePage) else os.path.basename(str(page))
+
+
+def migrate(directory, archive_path, url_format='{stem}', url_map=None):
+    """
+    Pack every HTML file of a crawl directory into an archive.
+
+    Args:
+        directory (str): Directory of HTML files (details/, game_details/, games_data/)
+        archive_path (str): Pack file to append to
+        url_format (str): Key for each page, formatted with the file's {stem} and {name}
+        url_map (dict, optional): File stem -> URL overrides
+
+    Returns:
+        tuple: (pages written, raw bytes, packed bytes)
+    """
+    files = sorted(Path(directory).glob('*.html'))
+    raw_bytes = 0
+    written = 0
+    with PageArchive(archive_path, writable=True) as archive:
+        for i, file_path in enumerate(files, 1):
+            url = (url_map or {}).get(file_path.stem) or url_format.format(stem=file_path.stem, name=file_path.name)
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            raw_bytes += len(raw)
+            written += archive.put(url, raw, name=file_path.name)
+            if i % 1000 == 0:
+                print(f"Packed {i}/{len(files)} files")
+    return written, raw_bytes, Path(archive_path).stat().st_size
+
+
+def provider_url_map(providers_file):
+    """
+    details/ file stem -> provider page URL, using the same file naming as the crawler.
+    """
+    with open(providers_file, 'r', encoding='utf-8') as f:
+        providers = json.load(f)
+    return {re.sub(r'[^a-zA-Z0-9]', '_', provider['title']): provider['href'] for provider in providers}
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Pack crawled HTML pages into an indexed archive")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    migrate_cmd = commands.add_parser('migrate', help="Pack an existing directory of HTML files")
+    migrate_cmd.add_argument('directory', help="details, game_details or games_data")
+    migrate_cmd.add_argument('--archive', default=None, help="Pack file (defaults to <directory>.pack)")
+    migrate_cmd.add_argument('--url-format', default=None,
+                             help="Key per file from {stem}/{name}; defaults by directory")
+
+    compact_cmd = commands.add_parser('compact', help="Drop superseded copies from an archive")
+    compact_cmd.add_argument('archive')
+
+    info_cmd = commands.add_parser('info', help="Show archive statistics")
+    info_cmd.add_argument('archive')
+
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        directory = Path(args.directory)
+        archive_path = args.archive or str(directory.with_suffix('.pack'))
+        url_map = None
+        url_format = args.url_format
+        if url_format is None:
+            if directory.name == 'game_details':
+                url_format = '/en/slots/{stem}'
+            elif directory.name == 'details':
+                url_format = '{stem}'
+                url_map = provider_url_map(base_dir / 'providers.json')
+            else:
+                url_format = '{name}'
+        written, raw_bytes, packed_bytes = migrate(directory, archive_path, url_format, url_map)
+        print(f"Packed {written} pages into {archive_path}: "
+              f"{raw_bytes / 1e6:.1f} MB -> {packed_bytes / 1e6:.1f} MB")
+    elif args.command == 'compact':
+        with PageArchive(args.archive, writable=True) as archive:
+            archive.compact()
+            print(f"Compacted {args.archive}: {len(archive)} pages, {archive.path.stat().st_size / 1e6:.1f} MB")
+    else:
+        with PageArchive(args.archive) as archive:
+            print(f"{len(archive)} pages, {archive.path.stat().st_size / 1e6:.1f} MB")
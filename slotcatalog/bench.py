@@ -0,0 +1,192 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import best
+import detail
+import games
+from instrument import peak_rss_mb
+from parsers import available_backends, parse_html
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'bench_baseline.json')
+
+
+def corpus_files():
+    """
+    The checked-in HTML corpus: every provider page plus best_slots.html.
+    """
+    return {
+        'provider_pages': sorted(glob.glob(os.path.join(BASE_DIR, 'details', '*.html'))),
+        'best_slots': [os.path.join(BASE_DIR, 'games_data', 'best_slots.html')],
+    }
+
+
+def _extract(name, backend, file_path, html):
+    """
+    Run one benchmarked extractor on one page. Every case parses the
+    preloaded `html`, so no file is read inside the timed loop.
+    """
+    if name == 'detail.parse_provider_details':
+        return detail.extract_provider_page(html, os.path.basename(file_path), backend)['details']
+    if name == 'games.extract_game_data':
+        return games.extract_game_data(html, backend=backend)
+    if name == 'best.extract_games_from_html':
+        return best.extract_games_from_html(parse_html(html, backend))
+    if name == 'best.extract_countries_from_html':
+        return best.extract_countries(parse_html(html, backend))
+    raise ValueError(f"Unknown benchmark {name}")
+
+
+def _run_case(name, backend, files, repeat):
+    """
+    Time one extractor/backend case; run in a fresh process so its peak RSS
+    is its own rather than the high-water mark of the cases before it.
+    """
+    result = _time_extractor(name, files, lambda file_path, html: _extract(name, backend, file_path, html), repeat)
+    result['backend'] = backend
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return result
+
+
+def _time_extractor(name, files, extract, repeat):
+    """
+    Time `extract(file_path, html_content)` over `files`, keeping the fastest
+    of `repeat` passes. Reading the files is not timed.
+    """
+    contents = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            contents.append((file_path, f.read()))
+    total_bytes = sum(len(html.encode('utf-8')) for _, html in contents)
+
+    best_seconds = None
+    records = 0
+    for _ in range(repeat):
+        records = 0
+        start = time.perf_counter()
+        for file_path, html in contents:
+            result = extract(file_path, html)
+            records += len(result) if isinstance(result, list) else int(result is not None)
+        elapsed = time.perf_counter() - start
+        best_seconds = elapsed if best_seconds is None else min(best_seconds, elapsed)
+
+    mb = total_bytes / (1024 * 1024)
+    return {
+        'extractor': name,
+        'files': len(contents),
+        'megabytes': round(mb, 3),
+        'records': records,
+        'seconds': round(best_seconds, 4),
+        'ms_per_page': round(best_seconds * 1000 / max(len(contents), 1), 3),
+        'ms_per_mb': round(best_seconds * 1000 / mb, 3) if mb else None,
+    }
+
+
+def run_benchmarks(backends=None, limit=None, repeat=3):
+    """
+    Time every extractor on the checked-in corpus with each parser backend.
+    Each case runs in its own freshly started process, so its peak RSS
+    (which includes the interpreter and the parser modules) is not carried
+    over from earlier cases.
+
+    Args:
+        backends (list, optional): Backends to time. Defaults to all available
+        limit (int, optional): Only use the first N provider pages
+        repeat (int): Passes per benchmark; the fastest is kept
+
+    Returns:
+        dict: Benchmark report with one entry per 'extractor/backend'
+    """
+    files = corpus_files()
+    provider_pages = files['provider_pages'][:limit] if limit else files['provider_pages']
+    best_pages = files['best_slots']
+
+    cases = [
+        ('detail.parse_provider_details', provider_pages),
+        ('games.extract_game_data', provider_pages),
+        ('best.extract_games_from_html', best_pages),
+        ('best.extract_countries_from_html', best_pages),
+    ]
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for backend in backends or available_backends():
+        for name, case_files in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run_case, name, backend, case_files, repeat).result()
+            results[f'{name}/{backend}'] = result
+            print(f"{name:36} {backend:10} {result['files']:4} files  {result['seconds']:8.3f}s  "
+                  f"{result['ms_per_page']:8.2f} ms/page  {result['ms_per_mb'] or 0:9.1f} ms/MB  "
+                  f"peak RSS {result['peak_rss_mb']} MB")
+
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'limit': limit,
+        'results': results,
+    }
+
+
+def compare(report, baseline, threshold=0.10):
+    """
+    Compare a report against a baseline and list every benchmark whose time
+    per MB (or per page) grew by more than `threshold`. Reports over a
+    different number of pages (--limit) are not comparable and raise ValueError.
+
+    Returns:
+        list: (key, baseline_ms, current_ms, change) for each regression
+    """
+    if baseline.get('limit') != report.get('limit'):
+        raise ValueError(f"Baseline was taken with limit={baseline.get('limit')}, this run with "
+                         f"limit={report.get('limit')}; rerun with the same --limit or --save a new baseline")
+    regressions = []
+    for key, current in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous:
+            continue
+        metric = 'ms_per_mb' if current.get('ms_per_mb') and previous.get('ms_per_mb') else 'ms_per_page'
+        if not previous[metric]:
+            continue
+        change = current[metric] / previous[metric] - 1
+        status = 'REGRESSION' if change > threshold else 'ok'
+        print(f"{status:10} {key:48} {previous[metric]:10.2f} -> {current[metric]:10.2f} {metric} ({change:+.1%})")
+        if change > threshold:
+            regressions.append((key, previous[metric], current[metric], change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the HTML extractors on the checked-in corpus")
+    parser.add_argument('--backend', action='append', choices=available_backends(),
+                        help="Backend to time (repeatable; defaults to all installed)")
+    parser.add_argument('--limit', type=int, default=None, help="Only use the first N provider pages")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes per benchmark; the fastest is kept")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--compare', action='store_true', help="Compare against the baseline and fail on regressions")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Slowdown (fraction) counted as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(backends=args.backend, limit=args.limit, repeat=args.repeat)
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(report, baseline, args.threshold)
+        except ValueError as e:
+            print(f"Error comparing with {args.baseline}: {str(e)}")
+            raise SystemExit(2)
+        print(f"{len(regressions)} regressions past {args.threshold:.0%}")
+        raise SystemExit(1 if regressions else 0)
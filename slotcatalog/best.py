@@ -1,15 +1,24 @@
 import os
 from pathlib import Path
-from bs4 import BeautifulSoup
 import glob
 import json
+import argparse
+from functools import partial
 
-def extract_countries_from_html(html_file_path):
+from archive import is_archive, list_pages, page_name, read_page
+import instrument
+from instrument import count, count_output, stage
+from manifest import Manifest, extractor_version, incremental_map
+from parallel import print_error_summary
+from parsers import BACKENDS, parse_html
+
+def extract_countries_from_html(html_file_path, backend=None):
     """
     Extract country ISO codes from the best_slots.html file.
     
     Args:
         html_file_path (str): Path to the HTML file containing country data
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
         
     Returns:
         list: List of country ISO codes
@@ -18,30 +27,40 @@ def extract_countries_from_html(html_file_path):
         with open(html_file_path, 'r', encoding='utf-8') as file:
             html_content = file.read()
             
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Find the country selector dropdown
-        country_select = soup.find('select', {'name': 'ucountry'})
-        
-        if not country_select:
-            print("Country selector not found in the HTML file.")
-            return []
-        
-        countries = []
-        
-        # Extract country ISO codes
-        for option in country_select.find_all('option'):
-            country_iso = option.get('value')
-            
-            if country_iso:
-                countries.append(country_iso)
-        
-        return countries
+        return extract_countries(parse_html(html_content, backend))
     
     except Exception as e:
         print(f"Error extracting countries: {str(e)}")
         return []
 
+def extract_countries(soup):
+    """
+    Extract country ISO codes from the country selector of a parsed page.
+    
+    Args:
+        soup: Document returned by parsers.parse_html
+        
+    Returns:
+        list: List of country ISO codes
+    """
+    # Find the country selector dropdown
+    country_select = soup.find('select', {'name': 'ucountry'})
+    
+    if not country_select:
+        print("Country selector not found in the HTML file.")
+        return []
+    
+    countries = []
+    
+    # Extract country ISO codes
+    for option in country_select.find_all('option'):
+        country_iso = option.get('value')
+        
+        if country_iso:
+            countries.append(country_iso)
+    
+    return countries
+
 def save_countries_to_file(countries, output_file):
     """
     Save the extracted country ISO codes to a file.
@@ -127,35 +146,87 @@ def extract_games_from_html(soup):
         return []
 
 
+def parse_best_slots_file(file_path, backend=None):
+    """
+    Extract the ranked games from one best_slots_XX.html file.
+
+    Args:
+        file_path (str or ArchivePage): The country's best slots HTML page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+
+    Returns:
+        list: List of game dictionaries in ranking order
+    """
+    # Read the HTML page
+    html_content = read_page(file_path)
+    
+    # Parse the HTML and extract games data
+    soup = parse_html(html_content, backend)
+    return extract_games_from_html(soup)
+
+
 if __name__ == "__main__":
-    # Get all best_slots_XX.html files from games_data directory
-    games_data_dir = os.path.join(os.path.dirname(__file__), 'games_data')
-    best_slots_files = glob.glob(os.path.join(games_data_dir, 'best_slots_*.html'))
+    parser = argparse.ArgumentParser(description="Extract per-country best slots rankings")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parser processes (1 = serial, 0 = all cores)")
+    parser.add_argument('--parser', choices=BACKENDS, default=None,
+                        help="HTML parser backend (defaults to the fastest installed)")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-parse every file instead of only new or changed ones")
+    parser.add_argument('--source', default=None,
+                        help="Directory or .pack archive of best_slots_XX.html pages (defaults to games_data)")
+    parser.add_argument('--no-history', action='store_true',
+                        help="Do not record this run in the ranking history (see snapshots.py)")
+    parser.add_argument('--date', default=None, help="Day to record the rankings under (ISO, defaults to today)")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('best', args)
+    
+    # Get all best_slots_XX.html pages from the games_data directory or archive
+    games_data_dir = args.source or os.path.join(os.path.dirname(__file__), 'games_data')
+    if is_archive(games_data_dir):
+        best_slots_files = [page for page in list_pages(games_data_dir)
+                            if page.name.startswith('best_slots_')]
+    else:
+        best_slots_files = glob.glob(os.path.join(games_data_dir, 'best_slots_*.html'))
     
     # Dictionary to store games data by country code
     all_games_by_country = {}
+    errors = []
     
-    for file_path in best_slots_files:
-        # Extract country code from filename (best_slots_XX.html)
-        country_code = os.path.basename(file_path).split('_')[-1].split('.')[0]
-        
-        # Read the HTML file
-        with open(file_path, 'r', encoding='utf-8') as file:
-            html_content = file.read()
-        
-        # Parse the HTML and extract games data
-        soup = BeautifulSoup(html_content, 'html.parser')
-        games_list = extract_games_from_html(soup)
-        
-        # Store the games list with country code as key
-        all_games_by_country[country_code] = games_list
-        
-        print(f"Processed {country_code}: Found {len(games_list)} games")
+    manifest = None
+    if not args.full:
+        manifest = Manifest('best_slots', extractor_version(extract_games_from_html, parse_best_slots_file))
+    results = incremental_map(partial(parse_best_slots_file, backend=args.parser),
+                              best_slots_files, manifest, workers=args.workers)
+    with stage('parse'):
+        for file_path, games_list, error in results:
+            # Extract country code from filename (best_slots_XX.html)
+            country_code = page_name(file_path).split('_')[-1].split('.')[0]
+            if error is not None:
+                errors.append((file_path, error))
+                continue
+            
+            # Store the games list with country code as key
+            all_games_by_country[country_code] = games_list
+            count('records', len(games_list))
+            
+            print(f"Processed {country_code}: Found {len(games_list)} games")
     
+    print_error_summary(errors)
     print(f"Processed data for {len(all_games_by_country)} countries")
     # Save the games data to a JSON file
     output_file = os.path.join(os.path.dirname(__file__), 'games_data', 'all_games_by_country.json')
-    with open(output_file, 'w', encoding='utf-8') as file:
+    with stage('write_json'), open(output_file, 'w', encoding='utf-8') as file:
         json.dump(all_games_by_country, file, indent=4, ensure_ascii=False)
+    count_output(output_file)
     
     print(f"Games data saved to {output_file}")
+    
+    # Keep every run as a snapshot so the overwritten JSON is not the only copy
+    if not args.no_history and all_games_by_country:
+        from snapshots import DEFAULT_DB, connect, record_snapshot
+        with stage('history'):
+            stats = record_snapshot(connect(), all_games_by_country, day=args.date)
+        print(f"Recorded {stats['countries']} countries in {DEFAULT_DB.name}: "
+              f"{stats['lists']} new distinct lists, {stats['events']} rank changes")
@@ -0,0 +1,113 @@
+import argparse
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from jsonl import iter_records
+from normalize import merge_rows, normalize_record
+
+# Same column order as normalize.COLUMNS
+SCHEMA = pa.schema([
+    ('url', pa.string()),
+    ('name', pa.string()),
+    ('title', pa.string()),
+    ('provider', pa.dictionary(pa.int32(), pa.string())),
+    ('rtp', pa.float64()),
+    ('max_win', pa.float64()),
+    ('volatility', pa.int8()),
+    ('volatility_label', pa.dictionary(pa.int8(), pa.string())),
+    ('min_bet', pa.float64()),
+    ('max_bet', pa.float64()),
+    ('hit_frequency', pa.float64()),
+    ('reels', pa.int16()),
+    ('rows', pa.int16()),
+    ('lines', pa.int32()),
+    ('release_date', pa.date32()),
+    ('themes', pa.list_(pa.string())),
+    ('features', pa.list_(pa.string())),
+    ('thumbnail', pa.string()),
+    ('attributes', pa.map_(pa.string(), pa.string())),
+    ('cluster_id', pa.int32()),
+])
+
+def build_catalog(sources, output_path, format='parquet', clusters=False):
+    """
+    Normalize game records from one or more sources into a typed columnar file.
+    Records sharing a URL are merged, later sources taking precedence, so pass
+    provider card records before game-detail records.
+
+    Args:
+        sources (list): Paths accepted by iter_records
+        output_path (str): Output file
+        format (str): 'parquet' or 'feather'
+        clusters (bool): Fill 'cluster_id' with near-duplicate clusters (see dedup.py)
+
+    Returns:
+        int: Number of games written
+    """
+    rows = {}
+    for source in sources:
+        for record in iter_records(source):
+            row = normalize_record(record)
+            key = row['url'] or row['name']
+            rows[key] = merge_rows(rows[key], row) if key in rows else row
+
+    rows = list(rows.values())
+    if clusters:
+        from dedup import find_clusters
+        for row, cluster_id in zip(rows, find_clusters(rows)):
+            row['cluster_id'] = cluster_id
+
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+    if format == 'feather':
+        feather.write_feather(table, output_path, compression='zstd')
+    else:
+        pq.write_table(table, output_path, compression='zstd')
+    print(f"Wrote {table.num_rows} games to {output_path}")
+    return table.num_rows
+
+
+def load_catalog(path, columns=None, filters=None):
+    """
+    Load the typed catalog as a pandas DataFrame.
+
+    Args:
+        path (str): Parquet or Feather file written by build_catalog
+        columns (list, optional): Only read these columns
+        filters (list, optional): Parquet row filters, e.g. [('rtp', '>', 96)]
+
+    Returns:
+        pandas.DataFrame: One row per game
+    """
+    path = str(path)
+    if path.endswith('.feather') or path.endswith('.arrow'):
+        table = feather.read_table(path, columns=columns)
+        if filters:
+            import pyarrow.compute as pc
+            for column, op, value in filters:
+                table = table.filter(getattr(pc, {
+                    '>': 'greater', '>=': 'greater_equal', '<': 'less',
+                    '<=': 'less_equal', '==': 'equal', '!=': 'not_equal',
+                }[op])(table[column], value))
+    else:
+        table = pq.read_table(path, columns=columns, filters=filters)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the typed columnar game catalog")
+    parser.add_argument('sources', nargs='+',
+                        help="Game records: .jsonl[.zst|.gz], JSON array, or a directory of JSON files. "
+                             "Later sources override earlier ones for the same URL")
+    parser.add_argument('-o', '--output', default=str(Path(__file__).parent / 'games_catalog.parquet'),
+                        help="Output file")
+    parser.add_argument('--format', choices=('parquet', 'feather'), default=None,
+                        help="Output format (defaults from the output file extension)")
+    parser.add_argument('--clusters', action='store_true',
+                        help="Assign near-duplicate (reskinned/republished) games a shared cluster_id")
+    args = parser.parse_args()
+
+    output_format = args.format or ('feather' if args.output.endswith(('.feather', '.arrow')) else 'parquet')
+    build_catalog(args.sources, args.output, format=output_format, clusters=args.clusters)
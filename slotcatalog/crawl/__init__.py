@@ -0,0 +1,17 @@
+"""
+Asyncio crawl engine for slotcatalog.com.
+
+Replaces the sequential Node fetch scripts (list.js, detail.js, games.js,
+game_detail.js, best.js) with job definitions that share one pooled
+keep-alive HTTP client, a token-bucket rate limiter and a sliding window of
+concurrent workers.
+
+Usage:
+    python -m slotcatalog.crawl game_details --rate 5 --window 20
+"""
+from .client import BASE_URL, HttpClient, Response
+from .engine import run_job
+from .frontier import Frontier
+from .jobs import JOBS, Job
+from .ratelimit import TokenBucket
+from .revalidate import ValidatorCache
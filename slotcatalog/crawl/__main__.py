@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+from pathlib import Path
+
+from ..archive import PageArchive
+from .client import BASE_URL, HttpClient
+from .engine import run_job
+from .frontier import Frontier
+from .revalidate import ValidatorCache
+from .jobs import BASE_DIR, JOBS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl slotcatalog.com pages")
+    parser.add_argument('job', choices=sorted(JOBS), help="Job to run")
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help="Site to crawl (point at a local server for testing)")
+    parser.add_argument('--rate', type=float, default=2.0, help="Maximum requests per second")
+    parser.add_argument('--burst', type=float, default=None, help="Token bucket capacity")
+    parser.add_argument('--window', type=int, default=10, help="Items in flight at once")
+    parser.add_argument('--per-host', type=int, default=None, help="Maximum connections per host")
+    parser.add_argument('--timeout', type=float, default=30, help="Request timeout in seconds")
+    parser.add_argument('--retries', type=int, default=2, help="Retries on transient failures")
+    parser.add_argument('--cookie', default=os.environ.get('SLOTCATALOG_COOKIE'),
+                        help="Cookie header (defaults to $SLOTCATALOG_COOKIE)")
+    parser.add_argument('--data-dir', default=str(BASE_DIR), help="Directory holding inputs and outputs")
+    parser.add_argument('--archive', default=None,
+                        help="Store pages in this .pack archive (see archive.py) instead of HTML files")
+    parser.add_argument('--start-page', type=int, default=1,
+                        help="provider_games: first AJAX page to fetch (2 when the cards of page 1 "
+                             "are taken from the provider pages)")
+    parser.add_argument('--frontier', default=None,
+                        help="game_details, best_slots: track URL states and change history in this SQLite file")
+    parser.add_argument('--limit', type=int, default=None,
+                        help="game_details: with --frontier, crawl at most this many due URLs")
+    parser.add_argument('--budget', type=int, default=None,
+                        help="game_details, best_slots: with --frontier, make at most this many requests, "
+                             "new URLs first, then the pages most likely to have changed")
+    parser.add_argument('--revalidate', action='store_true',
+                        help="game_details: recrawl saved pages with If-None-Match/If-Modified-Since")
+    return parser.parse_args()
+
+
+async def main(args):
+    archive = PageArchive(args.archive, writable=True) if args.archive else None
+    frontier = Frontier(args.frontier) if args.frontier else None
+    options = {}
+    if args.job == 'provider_games':
+        options['start_page'] = args.start_page
+    if args.job == 'best_slots':
+        options.update(frontier=frontier, budget=args.budget)
+    if args.job == 'game_details':
+        # Validators live next to the saved pages
+        if archive is not None:
+            validators_path = archive.path.with_name(archive.path.name + '.validators.db')
+        else:
+            validators_path = Path(args.data_dir) / 'game_details' / '.validators.db'
+            validators_path.parent.mkdir(parents=True, exist_ok=True)
+        options.update(frontier=frontier, limit=args.limit, budget=args.budget,
+                       validators=ValidatorCache(validators_path), revalidate=args.revalidate)
+    job = JOBS[args.job](base_dir=Path(args.data_dir), archive=archive, **options)
+    async with HttpClient(
+        base_url=args.base_url,
+        rate=args.rate,
+        burst=args.burst,
+        concurrency=args.window,
+        per_host=args.per_host,
+        timeout=args.timeout,
+        retries=args.retries,
+        cookie=args.cookie,
+    ) as client:
+        try:
+            return await run_job(job, client, window=args.window)
+        finally:
+            if archive is not None:
+                archive.close()
+            if frontier is not None:
+                frontier.close()
+            if options.get('validators') is not None:
+                options['validators'].close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
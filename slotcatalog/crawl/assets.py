@@ -0,0 +1,386 @@
+"""
+Content-addressed mirror of the images referenced by the extracted records:
+ranking `image_url`s (best.py), card `thumbnail`s (games.py) and provider
+`Logo`s (detail.py).
+
+Every image is stored once under assets/<xx>/<sha256><ext>, however many
+URLs and records point at it, and an SQLite index maps each URL to its
+hash, so repeated runs only download URLs they have not seen. Thumbnails of
+fixed sizes are made in a process pool with Pillow (optional).
+
+Usage:
+    python -m slotcatalog.crawl.assets games_data/all_games_by_country.json provider_details.json \\
+        --size 128 --rewrite-dir mirrored
+    python -m slotcatalog.crawl.assets game_json/ --base-url http://127.0.0.1:8080
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ..jsonl import JsonlWriter, read_jsonl
+from .client import BASE_URL, HttpClient
+from .engine import run_job
+from .jobs import BASE_DIR, Job
+from .revalidate import _header
+
+# Record fields holding an image URL
+ASSET_FIELDS = ('image_url', 'thumbnail', 'Logo')
+
+DEFAULT_ASSET_DIR = BASE_DIR / 'assets'
+
+# Failed downloads with these statuses are not retried on later runs
+GONE_STATUSES = {404, 410}
+
+EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/svg+xml': '.svg',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT,
+    ext TEXT,
+    bytes INTEGER,
+    status INTEGER,
+    fetched_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assets_sha256 ON assets (sha256);
+CREATE TABLE IF NOT EXISTS variants (
+    sha256 TEXT,
+    size INTEGER,
+    path TEXT,
+    PRIMARY KEY (sha256, size)
+) WITHOUT ROWID;
+"""
+
+
+def _extension(url, content_type):
+    ext = EXTENSIONS.get((content_type or '').split(';')[0].strip().lower())
+    if ext is None:
+        ext = os.path.splitext(url.split('?')[0])[1].lower()
+    return ext if ext and len(ext) <= 5 else '.bin'
+
+
+def resize_image(source, target_base, size):
+    """
+    Write a thumbnail of `source` fitting in size x size (aspect kept).
+    Images with transparency become PNG, everything else JPEG.
+
+    Args:
+        source (str): Original image
+        target_base (str): Output path without extension
+        size (int): Bounding box edge in pixels
+
+    Returns:
+        str: Path of the written thumbnail
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        if image.mode in ('RGBA', 'LA', 'P'):
+            target = target_base + '.png'
+            image.save(target, 'PNG', optimize=True)
+        else:
+            target = target_base + '.jpg'
+            image.convert('RGB').save(target, 'JPEG', quality=85, optimize=True)
+    return target
+
+
+class AssetStore:
+    """
+    Directory of images named by content hash plus an index of the URLs
+    they were downloaded from and of the thumbnails made from them.
+    """
+
+    def __init__(self, root=DEFAULT_ASSET_DIR):
+        """
+        Args:
+            root (str or Path): Asset directory; the index is <root>/index.db
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.root / 'index.db'), isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def lookup(self, url):
+        """
+        Returns:
+            tuple: (sha256, ext, status), or None if the URL was never fetched
+        """
+        return self.conn.execute('SELECT sha256, ext, status FROM assets WHERE url = ?', (url,)).fetchone()
+
+    def known(self, url):
+        """
+        True when the URL is stored or permanently gone, so it need not be fetched again.
+        """
+        row = self.lookup(url)
+        return row is not None and (row[0] is not None or row[2] in GONE_STATUSES)
+
+    def path(self, sha256, ext):
+        return self.root / sha256[:2] / (sha256 + ext)
+
+    def put(self, url, body, content_type=None):
+        """
+        Store a downloaded image; identical bytes from another URL reuse the
+        existing file.
+
+        Returns:
+            tuple: (sha256, path)
+        """
+        sha256 = hashlib.sha256(body).hexdigest()
+        ext = _extension(url, content_type)
+        existing = self.conn.execute('SELECT ext FROM assets WHERE sha256 = ? LIMIT 1', (sha256,)).fetchone()
+        if existing is not None:
+            ext = existing[0]
+        path = self.path(sha256, ext)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(path.name + '.part')
+            tmp_path.write_bytes(body)
+            tmp_path.replace(path)
+        self.conn.execute('INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, 200, ?)',
+                          (url, sha256, ext, len(body), time.time()))
+        return sha256, path
+
+    def mark_failed(self, url, status):
+        self.conn.execute('INSERT OR REPLACE INTO assets VALUES (?, NULL, NULL, NULL, ?, ?)',
+                          (url, status, time.time()))
+
+    def variant(self, sha256, size):
+        row = self.conn.execute('SELECT path FROM variants WHERE sha256 = ? AND size = ?',
+                                (sha256, size)).fetchone()
+        return row[0] if row else None
+
+    def add_variant(self, sha256, size, path):
+        self.conn.execute('INSERT OR REPLACE INTO variants VALUES (?, ?, ?)',
+                          (sha256, size, Path(path).relative_to(self.root).as_posix()))
+
+    def local_path(self, url, size=None):
+        """
+        Path of the local copy of `url` (or of its `size` thumbnail when one
+        was made), relative to the asset directory's parent.
+
+        Returns:
+            str: e.g. 'assets/3f/3f2a...c1.jpg', or None if not mirrored
+        """
+        row = self.lookup(url)
+        if row is None or row[0] is None:
+            return None
+        relative = self.path(row[0], row[1]).relative_to(self.root).as_posix()
+        if size is not None:
+            relative = self.variant(row[0], size) or relative
+        return f'{self.root.name}/{relative}'
+
+    def stats(self):
+        urls, stored, blobs, total = self.conn.execute(
+            'SELECT COUNT(*), COUNT(sha256), COUNT(DISTINCT sha256), '
+            'COALESCE(SUM(bytes), 0) FROM assets').fetchone()
+        unique_bytes = self.conn.execute(
+            'SELECT COALESCE(SUM(bytes), 0) FROM (SELECT MAX(bytes) AS bytes FROM assets '
+            'WHERE sha256 IS NOT NULL GROUP BY sha256)').fetchone()[0]
+        variants = self.conn.execute('SELECT COUNT(*) FROM variants').fetchone()[0]
+        return {'urls': urls, 'stored': stored, 'files': blobs, 'bytes_downloaded': total,
+                'bytes_on_disk': unique_bytes, 'thumbnails': variants}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _walk(data):
+    """
+    Every dict in a loaded JSON document that holds an asset field, at any
+    depth (lists of records, {country: [record, ...]}, ...).
+    """
+    if isinstance(data, dict):
+        if any(isinstance(data.get(field), str) for field in ASSET_FIELDS):
+            yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _walk(value)
+
+
+def _load(source):
+    """
+    Yield the JSON documents of a source: each record of a .jsonl file, the
+    file itself for JSON, or every JSON file of a directory.
+    """
+    source = Path(source)
+    if source.is_dir():
+        for json_file in sorted(source.glob('*.json')):
+            with open(json_file, 'r', encoding='utf-8') as f:
+                yield json.load(f)
+    elif '.jsonl' in source.name:
+        yield from read_jsonl(source)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+
+def asset_urls(sources):
+    """
+    Distinct asset URLs referenced by the records in `sources`, in order of
+    first appearance.
+    """
+    urls = {}
+    for source in sources:
+        for document in _load(source):
+            for record in _walk(document):
+                for field in ASSET_FIELDS:
+                    value = record.get(field)
+                    if isinstance(value, str) and value:
+                        urls[value] = None
+    return list(urls)
+
+
+def assets_job(store, urls, sizes=(), pool=None):
+    """
+    Download every URL not yet in the store and make its thumbnails.
+
+    Args:
+        store (AssetStore): Asset store
+        urls (list): Asset URLs (absolute, or paths relative to the client's base URL)
+        sizes (tuple): Thumbnail sizes to make
+        pool (concurrent.futures.Executor, optional): Runs resize_image; required with sizes
+    """
+    async def make_thumbnails(url):
+        sha256, ext, _ = store.lookup(url)
+        loop = asyncio.get_running_loop()
+        for size in sizes:
+            if store.variant(sha256, size):
+                continue
+            base = store.path(sha256, ext).with_name(f'{sha256}_{size}')
+            try:
+                target = await loop.run_in_executor(pool, resize_image, str(store.path(sha256, ext)), str(base), size)
+            except Exception as e:
+                print(f"Error resizing {url}: {str(e)}")
+                return
+            store.add_variant(sha256, size, target)
+
+    async def fetch(client, url):
+        if store.known(url):
+            if sizes and store.lookup(url)[0] is not None:
+                await make_thumbnails(url)
+            return False
+        response = await client.get(url, binary=True)
+        if response.status != 200:
+            store.mark_failed(url, response.status)
+            raise RuntimeError(f"HTTP {response.status} for {response.url}")
+        store.put(url, response.text, _header(response.headers, 'Content-Type'))
+        if sizes:
+            await make_thumbnails(url)
+
+    return Job('assets', lambda: urls, fetch)
+
+
+def rewrite_records(data, store, size=None):
+    """
+    Point the asset fields of every record in a loaded JSON document at the
+    local copies, keeping the original URL as '<field>_source'. Fields whose
+    image is not mirrored are left alone.
+
+    Returns:
+        int: Number of fields rewritten
+    """
+    rewritten = 0
+    for record in _walk(data):
+        for field in ASSET_FIELDS:
+            value = record.get(field)
+            if not isinstance(value, str) or not value:
+                continue
+            local = store.local_path(value, size)
+            if local is not None:
+                record[f'{field}_source'] = value
+                record[field] = local
+                rewritten += 1
+    return rewritten
+
+
+def rewrite_file(source, target, store, size=None):
+    """
+    Write a copy of a record file (.json or .jsonl) with local asset paths.
+
+    Returns:
+        int: Number of fields rewritten
+    """
+    source, target = Path(source), Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    rewritten = 0
+    if '.jsonl' in source.name:
+        with JsonlWriter(target) as writer:
+            for record in read_jsonl(source):
+                rewritten += rewrite_records(record, store, size)
+                writer.write(record)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rewritten = rewrite_records(data, store, size)
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    return rewritten
+
+
+async def main(args):
+    urls = asset_urls(args.sources)
+    print(f"{len(urls)} distinct asset URLs in {len(args.sources)} sources")
+    sizes = tuple(args.size or ())
+    pool = ProcessPoolExecutor(max_workers=args.resize_workers or None) if sizes else None
+    with AssetStore(args.asset_dir) as store:
+        try:
+            async with HttpClient(base_url=args.base_url, rate=args.rate, concurrency=args.window,
+                                  timeout=args.timeout, retries=args.retries) as client:
+                await run_job(assets_job(store, urls, sizes, pool), client, window=args.window)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        print(f"Asset store: {store.stats()}")
+
+        if args.rewrite_dir:
+            for source in args.sources:
+                source = Path(source)
+                files = sorted(source.glob('*.json')) if source.is_dir() else [source]
+                for path in files:
+                    target = Path(args.rewrite_dir) / (source.name if source.is_dir() else '') / path.name
+                    count = rewrite_file(path, target, store, args.link_size)
+                    print(f"Rewrote {count} asset fields into {target}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mirror the images referenced by extracted records")
+    parser.add_argument('sources', nargs='+', help="Record files (.json, .jsonl[.zst|.gz]) or directories of JSON")
+    parser.add_argument('--asset-dir', default=str(DEFAULT_ASSET_DIR), help="Content-addressed asset directory")
+    parser.add_argument('--base-url', default=BASE_URL, help="Site relative asset URLs are resolved against")
+    parser.add_argument('--rate', type=float, default=10.0, help="Maximum requests per second")
+    parser.add_argument('--window', type=int, default=20, help="Downloads in flight at once")
+    parser.add_argument('--timeout', type=float, default=30, help="Request timeout in seconds")
+    parser.add_argument('--retries', type=int, default=2, help="Retries on transient failures")
+    parser.add_argument('--size', type=int, action='append',
+                        help="Also make a thumbnail fitting in SIZE x SIZE pixels (repeatable; needs Pillow)")
+    parser.add_argument('--resize-workers', type=int, default=0,
+                        help="Thumbnail processes (0 = all cores)")
+    parser.add_argument('--rewrite-dir', default=None,
+                        help="Write copies of the sources here with asset fields pointing at the local copies")
+    parser.add_argument('--link-size', type=int, default=None,
+                        help="With --rewrite-dir, point at this thumbnail size instead of the original")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+import asyncio
+from collections import namedtuple
+
+import aiohttp
+
+from .ratelimit import TokenBucket
+
+BASE_URL = 'https://slotcatalog.com'
+
+DEFAULT_HEADERS = {
+    "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "accept-language": "en-US,en;q=0.9",
+    "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36",
+}
+
+AJAX_HEADERS = {
+    "accept": "*/*",
+    "x-requested-with": "XMLHttpRequest",
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+Response = namedtuple('Response', ['url', 'status', 'headers', 'text'])
+
+
+class HttpClient:
+    """
+    Pooled keep-alive HTTP client used by every crawl job.
+
+    All requests share one connection pool (capped globally and per host) and
+    one token bucket, so throughput is bounded by `rate` rather than by the
+    round-trip time of each request.
+    """
+
+    def __init__(self, base_url=BASE_URL, rate=2.0, burst=None, concurrency=10,
+                 per_host=None, timeout=30, retries=2, cookie=None):
+        """
+        Args:
+            base_url (str): Scheme and host that relative paths are resolved against
+            rate (float): Maximum requests per second
+            burst (float, optional): Token bucket capacity
+            concurrency (int): Maximum open connections in the pool
+            per_host (int, optional): Maximum open connections per host. Defaults to `concurrency`
+            timeout (float): Total timeout per request in seconds
+            retries (int): Extra attempts on connection errors and 429/5xx responses
+            cookie (str, optional): Cookie header sent with every request
+        """
+        self.base_url = base_url.rstrip('/')
+        self.limiter = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.per_host = per_host or concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.cookie = cookie
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            keepalive_timeout=30,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+        self.session = None
+
+    def url(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return self.base_url + path
+
+    async def request(self, method, path, data=None, headers=None, cookies=None, binary=False):
+        """
+        Send one rate-limited request, retrying transient failures.
+
+        Args:
+            method (str): HTTP method
+            path (str): Absolute URL or path relative to `base_url`
+            data (dict or str, optional): Form body for POST requests
+            headers (dict, optional): Extra request headers
+            cookies (dict, optional): Extra cookies merged into the cookie header
+            binary (bool): Return the body as bytes (e.g. images) instead of text
+
+        Returns:
+            Response: Final response (status may still be an error status)
+        """
+        url = self.url(path)
+        request_headers = dict(headers or {})
+        cookie_parts = [self.cookie] if self.cookie else []
+        cookie_parts += [f"{key}={value}" for key, value in (cookies or {}).items()]
+        if cookie_parts:
+            request_headers['cookie'] = '; '.join(cookie_parts)
+
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            try:
+                async with self.session.request(method, url, data=data, headers=request_headers) as resp:
+                    text = await resp.read() if binary else await resp.text(errors='replace')
+                    response = Response(url, resp.status, dict(resp.headers), text)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            await asyncio.sleep(2 ** attempt)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, data, **kwargs):
+        return await self.request('POST', path, data=data, **kwargs)
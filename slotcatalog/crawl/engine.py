@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+
+async def run_job(job, client, window=10, progress_every=100):
+    """
+    Run every item of a job through a sliding window of concurrent workers.
+
+    Unlike fixed `Promise.all` batches, a worker picks up the next item as soon
+    as its current one finishes, so one slow URL only occupies one slot.
+
+    Args:
+        job (Job): Job definition to run
+        client (HttpClient): Open HTTP client
+        window (int): Number of items in flight at once
+        progress_every (int): Print a progress line every N finished items
+
+    Returns:
+        dict: Counts of 'done', 'skipped' and 'failed' items and elapsed 'seconds'
+    """
+    items = iter(job.items())
+    stats = {'done': 0, 'skipped': 0, 'failed': 0}
+    start = time.monotonic()
+
+    async def worker():
+        for item in items:
+            try:
+                result = await job.fetch(client, item)
+                stats['skipped' if result is False else 'done'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"[{job.name}] Error processing {item}: {str(e)}")
+            finished = stats['done'] + stats['skipped'] + stats['failed']
+            if finished % progress_every == 0:
+                rate = finished / max(time.monotonic() - start, 1e-9)
+                print(f"[{job.name}] {finished} items finished ({rate:.1f}/s)")
+
+    await asyncio.gather(*(worker() for _ in range(window)))
+    stats['seconds'] = round(time.monotonic() - start, 3)
+    print(f"[{job.name}] Finished: {stats}")
+    return stats
@@ -0,0 +1,250 @@
+import hashlib
+import heapq
+import math
+import sqlite3
+import time
+
+PENDING = 'pending'
+FETCHED = 'fetched'
+FAILED = 'failed'
+GONE = 'gone'
+
+# Statuses that mean the page no longer exists and should not be retried
+GONE_STATUSES = {404, 410}
+
+# Change rate (per second) assumed for a page class with no history: once a month
+DEFAULT_CHANGE_RATE = 1 / (30 * 86400)
+
+SCHEMA = """
+-- The rowid keeps the order URLs were added in, which is the fetch order
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT NOT NULL UNIQUE,
+    job TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status INTEGER,
+    fetched_at REAL,
+    next_due REAL NOT NULL DEFAULT 0,
+    sha1 TEXT,
+    page_class TEXT,
+    -- Change history: revisits with a known outcome, how many of them found
+    -- a different page, and the seconds those revisit intervals covered
+    checks INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    observed REAL NOT NULL DEFAULT 0
+);
+
+-- Only pending and failed URLs are ever due, so the index skips the rest
+CREATE INDEX IF NOT EXISTS frontier_due ON frontier (job, next_due)
+    WHERE state IN ('pending', 'failed');
+"""
+
+def staleness(rate, age):
+    """
+    Probability that a page changing as a Poisson process with `rate`
+    changes per second has changed in the `age` seconds since its last fetch.
+    """
+    return 1 - math.exp(-rate * max(age, 0))
+
+
+class Frontier:
+    """
+    Persistent crawl frontier: one row per URL with its state, attempt count,
+    last HTTP status, last fetch time and content hash.
+
+    Every state change is committed immediately, so after a crash the next run
+    resumes from exactly the URLs that were not fetched yet.
+
+    Each revisit also records whether the content hash changed, from which
+    schedule() estimates per-URL change rates to spend a recrawl budget on
+    the pages most likely to be stale.
+    """
+
+    def __init__(self, path, max_attempts=5, backoff=60):
+        """
+        Args:
+            path (str or Path): SQLite database file
+            max_attempts (int): Failed fetches after which a URL is no longer due
+            backoff (float): Seconds before the first retry; doubles per attempt
+        """
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.conn = sqlite3.connect(str(path), isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def add(self, urls, job, page_class=None):
+        """
+        Add URLs as pending. URLs already in the frontier keep their state.
+
+        Args:
+            urls (iterable): URLs (or other item keys) to add
+            job (str): Job name
+            page_class (str, optional): Class whose change rate new URLs start
+                from (e.g. 'new_release'). Defaults to the job name
+
+        Returns:
+            list: The URLs that were new
+        """
+        known = set(url for (url,) in self.conn.execute('SELECT url FROM frontier WHERE job = ?', (job,)))
+        new_urls = [url for url in dict.fromkeys(urls) if url not in known]
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.executemany('INSERT OR IGNORE INTO frontier (url, job, page_class) VALUES (?, ?, ?)',
+                                  ((url, job, page_class or job) for url in new_urls))
+        return new_urls
+
+    def due(self, job, limit=None, now=None):
+        """
+        Next URLs to fetch: pending ones and failed ones whose backoff has
+        passed, oldest first and otherwise in the order they were added.
+
+        Args:
+            job (str): Job name
+            limit (int, optional): Return at most this many URLs
+            now (float, optional): Current time (defaults to time.time())
+
+        Returns:
+            list: URLs in fetch order
+        """
+        rows = self.conn.execute(
+            "SELECT url FROM frontier WHERE job = ? AND state IN ('pending', 'failed') "
+            "AND next_due <= ? AND attempts < ? ORDER BY next_due, rowid LIMIT ?",
+            (job, time.time() if now is None else now, self.max_attempts, -1 if limit is None else limit),
+        )
+        return [url for (url,) in rows]
+
+    def mark_fetched(self, url, status=200, content=None, now=None):
+        """
+        Record a successful fetch. `content` (str or bytes) is hashed so later
+        crawls can tell whether the page changed; without it (e.g. a 304) the
+        previous hash is kept and the page counts as unchanged.
+
+        A revisit of a page fetched before adds one check to its change
+        history, and one change if the hash differs.
+        """
+        now = time.time() if now is None else now
+        sha1 = None
+        if content is not None:
+            raw = content.encode('utf-8') if isinstance(content, str) else content
+            sha1 = hashlib.sha1(raw).hexdigest()
+
+        check, changed, interval = 0, 0, 0.0
+        previous = self.conn.execute('SELECT state, fetched_at, sha1 FROM frontier WHERE url = ?', (url,)).fetchone()
+        # Pending rows with a fetch time were fetched before and reset for a recrawl
+        if previous is not None and previous[0] in (FETCHED, PENDING) and previous[1] is not None:
+            # A first hash after seeding tells nothing about change
+            if sha1 is None or previous[2] is not None:
+                check, changed, interval = 1, int(sha1 is not None and sha1 != previous[2]), now - previous[1]
+
+        self.conn.execute(
+            "UPDATE frontier SET state = 'fetched', status = ?, fetched_at = ?, sha1 = COALESCE(?, sha1), "
+            "checks = checks + ?, changes = changes + ?, observed = observed + ? WHERE url = ?",
+            (status, now, sha1, check, changed, interval, url),
+        )
+
+    def mark_failed(self, url, status=None):
+        """
+        Record a failed fetch and schedule the retry with exponential backoff.
+        """
+        now = time.time()
+        self.conn.execute(
+            "UPDATE frontier SET state = 'failed', status = ?, fetched_at = ?, attempts = attempts + 1, "
+            "next_due = ? + ? * (1 << MIN(attempts, 20)) WHERE url = ?",
+            (status, now, now, self.backoff, url),
+        )
+
+    def mark_gone(self, url, status):
+        """
+        Record that a page no longer exists; it is never due again.
+        """
+        self.conn.execute(
+            "UPDATE frontier SET state = 'gone', status = ?, fetched_at = ?, attempts = attempts + 1 WHERE url = ?",
+            (status, time.time(), url),
+        )
+
+    def reset(self, job, states=(FAILED,)):
+        """
+        Make URLs in the given states due again with a fresh attempt count.
+
+        Returns:
+            int: Number of URLs reset
+        """
+        placeholders = ', '.join('?' for _ in states)
+        cursor = self.conn.execute(
+            f"UPDATE frontier SET state = 'pending', attempts = 0, next_due = 0 "
+            f"WHERE job = ? AND state IN ({placeholders})",
+            (job,) + tuple(states),
+        )
+        return cursor.rowcount
+
+    def class_rates(self, job, default_rate=DEFAULT_CHANGE_RATE):
+        """
+        Change rate (changes per second) of every page class of a job, pooled
+        over the history of its URLs, with one pseudo-change at `default_rate`
+        so classes with little history stay near it.
+
+        Returns:
+            dict: {page_class: rate}
+        """
+        rows = self.conn.execute(
+            'SELECT COALESCE(page_class, job), SUM(changes), SUM(observed) FROM frontier '
+            'WHERE job = ? GROUP BY 1', (job,))
+        return {page_class: (changes + 1) / (observed + 1 / default_rate)
+                for page_class, changes, observed in rows}
+
+    def schedule(self, job, budget, now=None, default_rate=DEFAULT_CHANGE_RATE):
+        """
+        Spend a request budget: URLs that are due (pending or retryable) come
+        first, then fetched pages in order of the probability that they have
+        changed since their last fetch.
+
+        Each page's change rate is the Poisson estimate from its own history
+        with its class rate as a gamma prior worth one change, i.e.
+        (changes + 1) / (observed + 1 / class_rate): a page never revisited
+        gets its class rate, a page with a long history its own.
+
+        Args:
+            job (str): Job name
+            budget (int): Number of URLs to return
+            now (float, optional): Current time (defaults to time.time())
+            default_rate (float): Change rate assumed without any history
+
+        Returns:
+            list: URLs in fetch order
+        """
+        now = time.time() if now is None else now
+        urls = self.due(job, limit=budget, now=now)
+        remaining = budget - len(urls)
+        if remaining <= 0:
+            return urls
+
+        class_rates = self.class_rates(job, default_rate)
+        rows = self.conn.execute(
+            "SELECT url, COALESCE(page_class, job), changes, observed, fetched_at FROM frontier "
+            "WHERE job = ? AND state = 'fetched' AND fetched_at IS NOT NULL", (job,))
+
+        def candidates():
+            for url, page_class, changes, observed, fetched_at in rows:
+                rate = (changes + 1) / (observed + 1 / class_rates.get(page_class, default_rate))
+                yield staleness(rate, now - fetched_at), url
+
+        return urls + [url for _, url in heapq.nlargest(remaining, candidates())]
+
+    def counts(self, job):
+        """
+        Returns:
+            dict: Number of URLs per state
+        """
+        rows = self.conn.execute('SELECT state, COUNT(*) FROM frontier WHERE job = ? GROUP BY state', (job,))
+        return dict(rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,288 @@
+import json
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from .client import AJAX_HEADERS
+from .frontier import FETCHED, GONE_STATUSES
+from .paginate import fetch_all_pages
+from .revalidate import conditional_get
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# A job is a name, a zero-argument callable returning the items to crawl, and
+# an async `fetch(client, item)` that downloads and saves one item. `fetch`
+# returns False when the item was skipped (e.g. already on disk).
+#
+# Every job takes an optional writable PageArchive; pages then go into the
+# pack under their URL (or file name for merged pages) instead of to files.
+Job = namedtuple('Job', ['name', 'items', 'fetch'])
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.part')
+    tmp_path.write_text(text, encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def _save(archive, key, path, text):
+    if archive is not None:
+        archive.put(key, text, name=path.name)
+    else:
+        _write(path, text)
+
+
+def _saved(archive, key, path):
+    return key in archive if archive is not None else path.exists()
+
+
+def _check(response):
+    if response.status != 200:
+        raise RuntimeError(f"HTTP {response.status} for {response.url}")
+    return response.text
+
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def provider_filename(title):
+    """
+    File stem used for a provider page, matching the one detail.js produced.
+    """
+    return re.sub(r'[^a-zA-Z0-9]', '_', title)
+
+
+def provider_list_job(base_dir=BASE_DIR, pages=29, archive=None):
+    """
+    Providers listing pages (list.js), saved as page_{n}.html.
+    """
+    async def fetch(client, page):
+        response = await client.post('/index.php', data={
+            'blck': 'fltrProvBlk', 'ajax': '1', 'lang': 'en', 'p': str(page),
+            'translit': 'Providers', 'sorting': 'PRANK', 'cISO': 'CA',
+        }, headers=AJAX_HEADERS)
+        _save(archive, f'page_{page}.html', base_dir / f'page_{page}.html', _check(response))
+
+    return Job('providers', lambda: range(1, pages + 1), fetch)
+
+
+def provider_pages_job(base_dir=BASE_DIR, overwrite=True, archive=None):
+    """
+    One page per provider in providers.json (detail.js), saved under details/.
+    """
+    output_dir = base_dir / 'details'
+
+    def items():
+        return _load_json(base_dir / 'providers.json')
+
+    async def fetch(client, provider):
+        output_path = output_dir / f"{provider_filename(provider['title'])}.html"
+        if not overwrite and _saved(archive, provider['href'], output_path):
+            return False
+        response = await client.get(provider['href'])
+        _save(archive, provider['href'], output_path, _check(response))
+
+    return Job('provider_pages', items, fetch)
+
+
+def provider_totals(base_dir=BASE_DIR):
+    """
+    "Total Games" per provider slug, from provider_details.json (detail.py).
+
+    Returns:
+        dict: {provider slug: total games}, empty when the file is missing
+    """
+    details_path = base_dir / 'provider_details.json'
+    if not details_path.exists():
+        return {}
+    slugs = {provider_filename(provider['title']): provider['href'].split('/')[-1]
+             for provider in _load_json(base_dir / 'providers.json')}
+    totals = {}
+    for details in _load_json(details_path):
+        total = details.get('Total Games')
+        total = total.get('text') if isinstance(total, dict) else total
+        # Older provider_details.json files have no 'name'; the Website text is the title
+        website = details.get('Website')
+        name = details.get('name') or provider_filename((website.get('text') if isinstance(website, dict)
+                                                         else website) or '')
+        slug = slugs.get(name)
+        if slug and total and str(total).strip().isdigit():
+            totals[slug] = int(total)
+    return totals
+
+
+def provider_games_job(base_dir=BASE_DIR, archive=None, start_page=1):
+    """
+    Paginated game cards for every provider (games.js), saved as
+    games_data/{provider}_games.html.
+
+    The page count comes from the provider's "Total Games" in
+    provider_details.json, or is probed when unknown, and the pages are
+    fetched concurrently (see paginate.fetch_all_pages). Duplicate cards and
+    short pages in the middle of a listing are reported.
+
+    The provider pages under details/ already embed the first page of cards
+    (see `detail.py --games`), so `start_page=2` skips re-downloading it.
+    """
+    output_dir = base_dir / 'games_data'
+    totals = {}
+
+    def items():
+        totals.update(provider_totals(base_dir))
+        return [provider['href'].split('/')[-1] for provider in _load_json(base_dir / 'providers.json')]
+
+    async def fetch(client, provider):
+        async def fetch_page(page):
+            response = await client.post('/index.php', data={
+                'lang': 'en', 'tag': 'BRAND', 'brandtranslit': provider,
+                'blck': 'pLoadMoreBrandGames', 'ajax': '1', 'p': str(page), 'ver': '0',
+            }, headers={**AJAX_HEADERS, 'Referer': client.url(f'/en/soft/{provider}')})
+            return _check(response)
+
+        pages, report = await fetch_all_pages(fetch_page, total=totals.get(provider), start_page=start_page)
+        if report['duplicates'] or report['gaps']:
+            print(f"[provider_games] {provider}: {len(report['duplicates'])} duplicate cards, "
+                  f"short pages {report['gaps']}")
+        filename = f'{provider}_games.html'
+        _save(archive, filename, output_dir / filename, ''.join(pages))
+
+    return Job('provider_games', items, fetch)
+
+
+def game_details_job(base_dir=BASE_DIR, urls_file='game_urls.json', overwrite=False, archive=None,
+                     frontier=None, limit=None, validators=None, revalidate=False, budget=None):
+    """
+    Game detail pages (game_detail.js), saved as game_details/{slug}.html.
+    Pages already on disk are skipped unless `overwrite` is set.
+
+    With a Frontier, the URLs in `urls_file` are added to it once (pages
+    already saved count as fetched) and only the next `limit` due URLs are
+    crawled; each result is recorded there, so an interrupted crawl resumes
+    without checking the output directory again.
+
+    With a ValidatorCache, the ETag / Last-Modified of every saved page is
+    kept, and `revalidate` recrawls saved pages with conditional requests.
+    A page that comes back 304 (or identical) is not rewritten, so the
+    incremental parsers keep their cached records for it.
+
+    With a Frontier and a `budget`, a run makes at most `budget` requests:
+    new and retryable URLs first, then the saved pages most likely to have
+    changed given their change history (see Frontier.schedule), recrawled
+    conditionally when validators are kept.
+    """
+    output_dir = base_dir / 'game_details'
+    recrawl = revalidate or (budget is not None and not overwrite)
+
+    def items():
+        urls = _load_json(base_dir / urls_file)
+        if frontier is None:
+            return urls
+        for url in frontier.add(urls, 'game_details'):
+            if _saved(archive, url, output_dir / f"{url.split('/')[-1]}.html"):
+                frontier.mark_fetched(url, status=None)
+        if budget is not None:
+            print(f"[game_details] Frontier: {frontier.counts('game_details')}")
+            return frontier.schedule('game_details', budget)
+        if overwrite or revalidate:
+            frontier.reset('game_details', states=(FETCHED,))
+        print(f"[game_details] Frontier: {frontier.counts('game_details')}")
+        return frontier.due('game_details', limit=limit)
+
+    async def fetch(client, url):
+        output_path = output_dir / f"{url.split('/')[-1]}.html"
+        saved = _saved(archive, url, output_path)
+        if frontier is None and not (overwrite or revalidate) and saved:
+            return False
+        try:
+            if validators is not None and recrawl and saved:
+                response, changed = await conditional_get(client, url, validators)
+            else:
+                response, changed = await client.get(url), True
+        except Exception:
+            if frontier is not None:
+                frontier.mark_failed(url)
+            raise
+        if frontier is not None:
+            if response.status in GONE_STATUSES:
+                frontier.mark_gone(url, response.status)
+                return False
+            if response.status not in (200, 304):
+                frontier.mark_failed(url, response.status)
+
+        if response.status == 304 or not changed:
+            # The saved copy is current: keep it (and its mtime) untouched
+            if response.status == 200:
+                validators.store(url, response)
+            if frontier is not None:
+                frontier.mark_fetched(url, response.status)
+            return False
+
+        _save(archive, url, output_path, _check(response))
+        if validators is not None:
+            validators.store(url, response)
+        if frontier is not None:
+            frontier.mark_fetched(url, response.status, response.text)
+
+    return Job('game_details', items, fetch)
+
+
+def best_slots_job(base_dir=BASE_DIR, pages=2, archive=None, frontier=None, budget=None):
+    """
+    Top games per country (best.js), saved as games_data/best_slots_{ISO}.html.
+    The country is selected through the `ucISO` cookie.
+
+    With a Frontier (keyed by country code), every fetch is recorded there,
+    building the change history of each country's rankings. With a `budget`
+    as well, only that many countries are fetched per run: those never
+    fetched, then those whose rankings most likely changed since their last
+    fetch (see Frontier.schedule).
+    """
+    output_dir = base_dir / 'games_data'
+
+    def items():
+        with open(base_dir / 'countries.txt', 'r', encoding='utf-8') as f:
+            countries = [line.strip() for line in f if line.strip()]
+        if frontier is None:
+            return countries
+        for country in frontier.add(countries, 'best_slots'):
+            filename = f'best_slots_{country}.html'
+            if _saved(archive, filename, output_dir / filename):
+                frontier.mark_fetched(country, status=None)
+        print(f"[best_slots] Frontier: {frontier.counts('best_slots')}")
+        if budget is None:
+            return countries
+        return frontier.schedule('best_slots', budget)
+
+    async def fetch(client, country):
+        parts = []
+        for page in range(1, pages + 1):
+            try:
+                response = await client.get(
+                    f'/index.php?ajax=1&lang=en&p={page}&translit=The-Best-Slots&ajax=1&blck=top_games_page',
+                    headers={**AJAX_HEADERS, 'Referer': client.url('/en/The-Best-Slots')},
+                    cookies={'ucISO': country},
+                )
+            except Exception:
+                if frontier is not None:
+                    frontier.mark_failed(country)
+                raise
+            if frontier is not None and response.status != 200:
+                frontier.mark_failed(country, response.status)
+            parts.append(_check(response))
+        filename = f'best_slots_{country}.html'
+        _save(archive, filename, output_dir / filename, ''.join(parts))
+        if frontier is not None:
+            frontier.mark_fetched(country, 200, ''.join(parts))
+
+    return Job('best_slots', items, fetch)
+
+
+JOBS = {
+    'providers': provider_list_job,
+    'provider_pages': provider_pages_job,
+    'provider_games': provider_games_job,
+    'game_details': game_details_job,
+    'best_slots': best_slots_job,
+}
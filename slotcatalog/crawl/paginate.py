@@ -0,0 +1,111 @@
+import asyncio
+import math
+import re
+from collections import Counter
+
+try:
+    from ..parsers import SLOT_CARD_TAG
+except ImportError:
+    # Imported as the top-level crawl package, with slotcatalog/ on sys.path
+    from parsers import SLOT_CARD_TAG
+
+# Game URL of each card, from its name link
+CARD_URL = re.compile(r'<a href="([^"]+)" class="slotCardName')
+
+
+def card_urls(html):
+    return CARD_URL.findall(html)
+
+
+async def fetch_all_pages(fetch_page, total=None, start_page=1, max_pages=1000):
+    """
+    Fetch every page of a paginated card listing, concurrently where possible.
+
+    The first page gives the page size. With a known `total` the page count
+    follows directly; otherwise it is found by exponential probing and a
+    binary search for the last page. The remaining pages are then fetched
+    together, so a provider costs a few round-trips instead of one per page.
+    Concurrency and pacing are left to the client's rate limiter.
+
+    Args:
+        fetch_page (callable): async fetch_page(page) returning the page HTML
+        total (int, optional): Expected number of cards (e.g. "Total Games")
+        start_page (int): First page to fetch
+        max_pages (int): Upper bound on the page number
+
+    Returns:
+        tuple: (pages, report) where pages is the HTML of every non-empty page
+        in order and report holds the page count, card count, duplicate URLs
+        and gaps (non-final pages that came back short or empty)
+    """
+    fetched = {}
+
+    async def get(page):
+        if page not in fetched:
+            fetched[page] = await fetch_page(page)
+        return fetched[page]
+
+    async def get_many(pages):
+        await asyncio.gather(*(get(page) for page in pages if page not in fetched))
+
+    def size(page):
+        return len(SLOT_CARD_TAG.findall(fetched[page]))
+
+    await get(start_page)
+    page_size = size(start_page)
+    if page_size == 0:
+        return [], {'pages': 0, 'cards': 0, 'duplicates': [], 'gaps': []}
+
+    if total:
+        # Cards before start_page are assumed to fill whole pages
+        last = max(start_page, min(max_pages, math.ceil(total / page_size)))
+        await get_many(range(start_page + 1, last + 1))
+        # The listing grew since "Total Games" was recorded: continue page by page
+        while size(last) == page_size and last < max_pages:
+            await get(last + 1)
+            if size(last + 1) == 0:
+                break
+            last += 1
+    else:
+        # Exponential probe for a page past the end, then binary search for the last full page
+        full, short, step = start_page, None, 1
+        while short is None and full < max_pages:
+            page = min(start_page + step, max_pages)
+            await get(page)
+            if size(page) == page_size:
+                full = page
+            else:
+                short = page
+            step *= 2
+        while short is not None and short - full > 1:
+            middle = (full + short) // 2
+            await get(middle)
+            if size(middle) == page_size:
+                full = middle
+            else:
+                short = middle
+        last = short if short is not None and size(short) else full
+        await get_many(range(start_page + 1, last + 1))
+
+    # "Total Games" may overstate the listing
+    while last > start_page and size(last) == 0:
+        last -= 1
+
+    gaps = [page for page in range(start_page, last) if size(page) < page_size]
+    if gaps:
+        # Retry short pages once before reporting them
+        for page in gaps:
+            del fetched[page]
+        await get_many(gaps)
+        gaps = [page for page in gaps if size(page) < page_size]
+
+    pages = [fetched[page] for page in range(start_page, last + 1)]
+    urls = [url for html in pages for url in card_urls(html)]
+    duplicates = sorted(url for url, count in Counter(urls).items() if count > 1)
+    report = {
+        'pages': len(pages),
+        'cards': sum(len(SLOT_CARD_TAG.findall(html)) for html in pages),
+        'duplicates': duplicates,
+        'gaps': gaps,
+    }
+    return [html for html in pages if SLOT_CARD_TAG.search(html)], report
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every request of a crawl.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so short
+    bursts are allowed while the long-run request rate stays bounded.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): Tokens added per second (requests per second)
+            capacity (float, optional): Maximum burst size. Defaults to `rate`
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1):
+        """
+        Wait until `tokens` tokens are available and consume them.
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
@@ -0,0 +1,113 @@
+import hashlib
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    sha1 TEXT
+) WITHOUT ROWID;
+"""
+
+
+def body_digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _header(headers, name):
+    """
+    Case-insensitive lookup in a Response.headers dict.
+    """
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ValidatorCache:
+    """
+    ETag / Last-Modified of every saved page, kept in a small SQLite file next
+    to the pages, so a recrawl can ask the server whether a page changed
+    instead of downloading it again.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str or Path): SQLite file, e.g. game_details/.validators.db
+        """
+        self.conn = sqlite3.connect(str(path), isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def get(self, url):
+        """
+        Returns:
+            tuple: (etag, last_modified, sha1), or None if the URL was never saved
+        """
+        return self.conn.execute('SELECT etag, last_modified, sha1 FROM validators WHERE url = ?',
+                                 (url,)).fetchone()
+
+    def conditional_headers(self, url):
+        """
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers for a recrawl of `url`
+        """
+        cached = self.get(url)
+        if cached is None:
+            return {}
+        etag, last_modified, _ = cached
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def store(self, url, response):
+        """
+        Remember the validators of a saved 200 response and the hash of its body.
+        """
+        self.conn.execute(
+            'INSERT OR REPLACE INTO validators (url, etag, last_modified, sha1) VALUES (?, ?, ?, ?)',
+            (url, _header(response.headers, 'ETag'), _header(response.headers, 'Last-Modified'),
+             body_digest(response.text)),
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def conditional_get(client, url, cache, **kwargs):
+    """
+    GET a page with the validators of the saved copy. Call cache.store once
+    a 200 response has been saved.
+
+    Args:
+        client (HttpClient): Open HTTP client
+        url (str): Page URL
+        cache (ValidatorCache): Validators of the saved pages
+        **kwargs: Passed to client.get
+
+    Returns:
+        tuple: (response, changed). changed is False for a 304, and for a 200
+        whose body is identical to the saved copy, in which case the saved
+        page (and everything parsed from it) can be kept as is
+    """
+    headers = {**kwargs.pop('headers', {}), **cache.conditional_headers(url)}
+    response = await client.get(url, headers=headers, **kwargs)
+    if response.status == 304:
+        return response, False
+    if response.status != 200:
+        return response, True
+    cached = cache.get(url)
+    return response, cached is None or cached[2] != body_digest(response.text)
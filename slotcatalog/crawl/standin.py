@@ -0,0 +1,91 @@
+"""
+Local stand-in for slotcatalog.com game pages, for testing recrawls.
+
+Serves game_details/{slug}.html at /en/slots/{slug} with an ETag and a
+Last-Modified header, and answers conditional requests with 304 when the
+file is unchanged. Edit or touch a file to make the next recrawl see a 200.
+With --assets, files under that directory are also served at /userfiles/...
+for testing the asset mirror (see assets.py).
+
+Usage:
+    python -m slotcatalog.crawl.standin path/to/game_details --port 8080
+    python -m slotcatalog.crawl game_details --base-url http://127.0.0.1:8080 --revalidate
+"""
+import argparse
+import hashlib
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+from aiohttp import web
+
+# app[STATS]: responses served, by status
+STATS = web.AppKey('stats', dict)
+
+
+def make_app(pages_dir, assets_dir=None):
+    """
+    Args:
+        pages_dir (str or Path): Directory of {slug}.html files
+        assets_dir (str or Path, optional): Directory served at /userfiles/
+
+    Returns:
+        aiohttp.web.Application: App with app[STATS] counting 200/304/404 responses
+    """
+    pages_dir = Path(pages_dir)
+    stats = {200: 0, 304: 0, 404: 0}
+
+    async def game_page(request):
+        path = pages_dir / f"{request.match_info['slug']}.html"
+        if not path.is_file():
+            stats[404] += 1
+            raise web.HTTPNotFound()
+        body = path.read_bytes()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        mtime = int(path.stat().st_mtime)
+        headers = {'ETag': etag, 'Last-Modified': formatdate(mtime, usegmt=True)}
+
+        if_none_match = request.headers.get('If-None-Match')
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(',')]
+        elif if_modified_since is not None:
+            try:
+                not_modified = mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        if not_modified:
+            stats[304] += 1
+            return web.Response(status=304, headers=headers)
+        stats[200] += 1
+        return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
+
+    async def asset(request):
+        root = Path(assets_dir).resolve()
+        path = (root / request.match_info['path']).resolve()
+        if root not in path.parents or not path.is_file():
+            stats[404] += 1
+            raise web.HTTPNotFound()
+        stats[200] += 1
+        content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        return web.Response(body=path.read_bytes(), content_type=content_type)
+
+    app = web.Application()
+    app[STATS] = stats
+    app.router.add_get('/en/slots/{slug}', game_page)
+    if assets_dir is not None:
+        app.router.add_get('/userfiles/{path:.+}', asset)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved game pages with ETag/304 support")
+    parser.add_argument('pages_dir', help="Directory of {slug}.html game pages")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--assets', default=None, help="Directory of images to serve at /userfiles/")
+    args = parser.parse_args()
+    web.run_app(make_app(args.pages_dir, args.assets), host=args.host, port=args.port)
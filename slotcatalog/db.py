@@ -0,0 +1,368 @@
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from jsonl import iter_records
+from normalize import normalize_record, parse_int, provider_key
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_DB = BASE_DIR / 'slotcatalog.db'
+BATCH_SIZE = 1000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS providers (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    founded INTEGER,
+    total_games INTEGER,
+    provider_rank INTEGER,
+    website TEXT,
+    logo TEXT,
+    attributes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    name TEXT,
+    title TEXT,
+    provider_id INTEGER REFERENCES providers(id),
+    rtp REAL,
+    max_win REAL,
+    volatility INTEGER,
+    volatility_label TEXT,
+    min_bet REAL,
+    max_bet REAL,
+    hit_frequency REAL,
+    reels INTEGER,
+    rows INTEGER,
+    lines INTEGER,
+    release_date TEXT,
+    themes TEXT,
+    features TEXT,
+    thumbnail TEXT,
+    attributes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rankings (
+    country TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    slotrank INTEGER,
+    PRIMARY KEY (country, rank)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS games_provider ON games(provider_id);
+CREATE INDEX IF NOT EXISTS games_rtp ON games(rtp);
+CREATE INDEX IF NOT EXISTS games_release_date ON games(release_date);
+CREATE INDEX IF NOT EXISTS rankings_game ON rankings(game_id, rank);
+CREATE INDEX IF NOT EXISTS providers_name ON providers(name);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(name, title, provider, themes, features);
+CREATE VIRTUAL TABLE IF NOT EXISTS providers_fts USING fts5(name);
+'''
+
+GAME_COLUMNS = (
+    'url', 'name', 'title', 'provider_id', 'rtp', 'max_win', 'volatility', 'volatility_label',
+    'min_bet', 'max_bet', 'hit_frequency', 'reels', 'rows', 'lines', 'release_date',
+    'themes', 'features', 'thumbnail', 'attributes',
+)
+
+
+def connect(db_path=DEFAULT_DB):
+    """
+    Open the catalog database in WAL mode with the schema in place.
+    """
+    conn = sqlite3.connect(str(db_path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _text(value):
+    return value.get('text') if isinstance(value, dict) else value
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ProviderIds:
+    """
+    In-memory provider key -> id map, creating providers on first sight.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.ids = dict(conn.execute('SELECT key, id FROM providers'))
+
+    def get(self, name):
+        if not name:
+            return None
+        key = provider_key(name)
+        if key not in self.ids:
+            cursor = self.conn.execute('INSERT INTO providers (key, name) VALUES (?, ?)', (key, name))
+            self.ids[key] = cursor.lastrowid
+        return self.ids[key]
+
+
+def load_providers(conn, records):
+    """
+    Upsert provider records from provider_details.json.
+
+    Returns:
+        int: Number of providers loaded
+    """
+    def rows():
+        for record in records:
+            rank_label = next((key for key in record if key.startswith('Provider Rank')), None)
+            website = record.get('Website')
+            # Older provider_details.json files have no 'name'; the website link text is the brand
+            name = record.get('name', '').replace('_', ' ') or _text(website)
+            if not name:
+                continue
+            yield (
+                provider_key(name), name,
+                parse_int(_text(record.get('Founded'))),
+                parse_int(_text(record.get('Total Games'))),
+                parse_int(_text(record.get(rank_label))) if rank_label else None,
+                website.get('href') if isinstance(website, dict) else website,
+                record.get('Logo'),
+                json.dumps(record, ensure_ascii=False),
+            )
+
+    count = 0
+    for batch in _batches(rows()):
+        conn.executemany('''
+            INSERT INTO providers (key, name, founded, total_games, provider_rank, website, logo, attributes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                name = excluded.name, founded = excluded.founded, total_games = excluded.total_games,
+                provider_rank = excluded.provider_rank, website = excluded.website,
+                logo = excluded.logo, attributes = excluded.attributes
+        ''', batch)
+        count += len(batch)
+    return count
+
+
+def _game_row(record, providers):
+    row = normalize_record(record)
+    row['provider_id'] = providers.get(row.pop('provider'))
+    row['release_date'] = row['release_date'].isoformat() if row['release_date'] else None
+    row['themes'] = ', '.join(row['themes']) or None
+    row['features'] = ', '.join(row['features']) or None
+    row['attributes'] = json.dumps(dict(row['attributes']), ensure_ascii=False) if row['attributes'] else None
+    return tuple(row[column] for column in GAME_COLUMNS)
+
+
+def load_games(conn, records, prefer_new=True):
+    """
+    Upsert game records (provider cards, game-detail pages or ranking entries)
+    keyed by URL.
+
+    Args:
+        conn (sqlite3.Connection): Open catalog
+        records (iterable): Raw game records
+        prefer_new (bool): New non-null values replace stored ones. When False
+            they only fill columns that are still null
+
+    Returns:
+        int: Number of records loaded
+    """
+    providers = ProviderIds(conn)
+    placeholders = ', '.join('?' for _ in GAME_COLUMNS)
+    if prefer_new:
+        updates = ', '.join(f'{c} = COALESCE(excluded.{c}, {c})' for c in GAME_COLUMNS[1:])
+    else:
+        updates = ', '.join(f'{c} = COALESCE({c}, excluded.{c})' for c in GAME_COLUMNS[1:])
+    sql = (f"INSERT INTO games ({', '.join(GAME_COLUMNS)}) VALUES ({placeholders}) "
+           f"ON CONFLICT(url) DO UPDATE SET {updates}")
+
+    rows = (_game_row(record, providers) for record in records if record.get('url'))
+    count = 0
+    for batch in _batches(rows):
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def load_rankings(conn, rankings):
+    """
+    Replace per-country rankings from best.py's all_games_by_country.json.
+    Ranked games missing from the catalog are added from the ranking entry.
+
+    Returns:
+        int: Number of ranking rows loaded
+    """
+    entries = []
+    for country, games in rankings.items():
+        for position, game in enumerate(games, 1):
+            if game.get('game_url'):
+                entries.append((country, position, game))
+
+    # Only the game's own fields; rank and page URLs belong to the ranking row
+    load_games(conn, ({'url': game['game_url'], 'name': game.get('name'), 'provider': game.get('provider'),
+                       'thumbnail': game.get('image_url')}
+                      for _, _, game in entries), prefer_new=False)
+    game_ids = dict(conn.execute('SELECT url, id FROM games'))
+
+    conn.executemany('DELETE FROM rankings WHERE country = ?', [(country,) for country in rankings])
+    rows = ((country, position, game_ids[game['game_url']], game.get('rank'))
+            for country, position, game in entries)
+    count = 0
+    for batch in _batches(rows):
+        conn.executemany('INSERT OR REPLACE INTO rankings (country, rank, game_id, slotrank) VALUES (?, ?, ?, ?)', batch)
+        count += len(batch)
+    return count
+
+
+def rebuild_search_index(conn):
+    """
+    Rebuild the FTS5 indexes over game names, themes and features and over
+    provider names.
+    """
+    conn.execute('DELETE FROM games_fts')
+    conn.execute('''
+        INSERT INTO games_fts (rowid, name, title, provider, themes, features)
+        SELECT g.id, g.name, g.title, p.name, g.themes, g.features
+        FROM games g LEFT JOIN providers p ON p.id = g.provider_id
+    ''')
+    conn.execute('DELETE FROM providers_fts')
+    conn.execute('INSERT INTO providers_fts (rowid, name) SELECT id, name FROM providers')
+    conn.execute("INSERT INTO games_fts (games_fts) VALUES ('optimize')")
+
+
+def build_database(db_path=DEFAULT_DB, providers=None, games=None, details=None, rankings=None):
+    """
+    Bulk-load every available dataset into the SQLite catalog in one transaction.
+
+    Args:
+        db_path (str): Database file
+        providers (str, optional): provider_details.json
+        games (list, optional): Provider game sources (games.py output: JSON Lines, JSON or directory)
+        details (list, optional): Game-detail sources (game_detail.py output)
+        rankings (str, optional): all_games_by_country.json from best.py
+    """
+    start = time.perf_counter()
+    conn = connect(db_path)
+    with conn:
+        if providers:
+            with open(providers, 'r', encoding='utf-8') as f:
+                print(f"Loaded {load_providers(conn, json.load(f))} providers")
+        for source in games or []:
+            print(f"Loaded {load_games(conn, iter_records(source))} provider games from {source}")
+        for source in details or []:
+            print(f"Loaded {load_games(conn, iter_records(source))} game details from {source}")
+        if rankings:
+            with open(rankings, 'r', encoding='utf-8') as f:
+                print(f"Loaded {load_rankings(conn, json.load(f))} ranking rows")
+        rebuild_search_index(conn)
+    conn.execute('ANALYZE')
+    conn.close()
+    print(f"Built {db_path} in {time.perf_counter() - start:.1f}s")
+
+
+def query_games(conn, provider=None, min_rtp=None, max_rtp=None, volatility=None,
+                released_after=None, search=None, country=None, limit=50):
+    """
+    Filter games by indexed columns and full-text search.
+
+    Args:
+        provider (str, optional): Provider name in any spelling
+        min_rtp (float, optional): Minimum RTP in percent
+        max_rtp (float, optional): Maximum RTP in percent
+        volatility (str, optional): Volatility label, e.g. HIGH
+        released_after (str, optional): ISO date
+        search (str, optional): FTS5 query, e.g. 'features:Megaways' or 'book*'
+        country (str, optional): Only games ranked in this country, in rank order
+        limit (int): Maximum rows
+
+    Returns:
+        list: Row dicts
+    """
+    sql = '''SELECT g.name, p.name AS provider, g.rtp, g.volatility_label AS volatility, g.max_win,
+                    g.release_date, g.url{rank}
+             FROM games g LEFT JOIN providers p ON p.id = g.provider_id{join}
+             WHERE 1 = 1'''
+    params = []
+    rank, join, order = '', '', ' ORDER BY g.name'
+    if country:
+        rank, join, order = ', r.rank', ' JOIN rankings r ON r.game_id = g.id AND r.country = ?', ' ORDER BY r.rank'
+        params.append(country)
+    sql = sql.format(rank=rank, join=join)
+    if provider:
+        sql += ' AND p.key = ?'
+        params.append(provider_key(provider))
+    if min_rtp is not None:
+        sql += ' AND g.rtp >= ?'
+        params.append(min_rtp)
+    if max_rtp is not None:
+        sql += ' AND g.rtp <= ?'
+        params.append(max_rtp)
+    if volatility:
+        sql += ' AND g.volatility_label = ?'
+        params.append(volatility.upper())
+    if released_after:
+        sql += ' AND g.release_date >= ?'
+        params.append(released_after)
+    if search:
+        sql += ' AND g.id IN (SELECT rowid FROM games_fts WHERE games_fts MATCH ?)'
+        params.append(search)
+    sql += order + ' LIMIT ?'
+    params.append(limit)
+
+    conn.row_factory = sqlite3.Row
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query the SQLite game catalog")
+    parser.add_argument('--db', default=str(DEFAULT_DB), help="Database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Bulk-load datasets into the database")
+    build.add_argument('--providers', default=str(BASE_DIR / 'provider_details.json'))
+    build.add_argument('--games', nargs='*', default=[], help="games.py output (JSON Lines, JSON or directory)")
+    build.add_argument('--details', nargs='*', default=[], help="game_detail.py output (JSON Lines, JSON or directory)")
+    build.add_argument('--rankings', default=None, help="all_games_by_country.json")
+
+    query = commands.add_parser('query', help="Look up games")
+    query.add_argument('--provider')
+    query.add_argument('--min-rtp', type=float)
+    query.add_argument('--max-rtp', type=float)
+    query.add_argument('--volatility')
+    query.add_argument('--released-after')
+    query.add_argument('--search', help="FTS5 query over name, title, provider, themes and features")
+    query.add_argument('--country', help="Only games ranked in this country, in rank order")
+    query.add_argument('--limit', type=int, default=50)
+    query.add_argument('--json', action='store_true', help="Print JSON Lines instead of a table")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        providers = args.providers if Path(args.providers).exists() else None
+        build_database(args.db, providers=providers, games=args.games, details=args.details, rankings=args.rankings)
+    else:
+        conn = sqlite3.connect(args.db)
+        start = time.perf_counter()
+        rows = query_games(conn, provider=args.provider, min_rtp=args.min_rtp, max_rtp=args.max_rtp,
+                           volatility=args.volatility, released_after=args.released_after,
+                           search=args.search, country=args.country, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in rows:
+            if args.json:
+                print(json.dumps(row, ensure_ascii=False))
+            else:
+                print('\t'.join('' if value is None else str(value) for value in row.values()))
+        print(f"{len(rows)} games in {elapsed:.1f} ms")
@@ -0,0 +1,148 @@
+import argparse
+import math
+import zlib
+
+import numpy as np
+
+from resolve import normalize_name
+
+# Signature length and LSH banding: 16 bands of 8 rows put the 50% candidate
+# probability at a Jaccard similarity of about (1/16) ** (1/8) = 0.71
+NUM_PERM = 128
+BANDS = 16
+# Candidate pairs must have at least this estimated Jaccard similarity
+THRESHOLD = 0.6
+# Buckets larger than this are shared by unrelated games (e.g. records with
+# almost no attributes) and are skipped
+MAX_BUCKET = 200
+
+
+def record_tokens(row):
+    """
+    Feature set of one normalized catalog row (see normalize.normalize_record):
+    its math-model attributes plus word and character shingles of its name.
+    The provider is left out so republished games match across brands.
+    """
+    tokens = set()
+    for column in ('rtp', 'reels', 'rows', 'lines', 'volatility'):
+        if row.get(column) is not None:
+            tokens.add(f'{column}:{row[column]}')
+    if row.get('max_win'):
+        # Max win is quoted with varying precision; compare on a log scale
+        tokens.add(f'max_win:{round(math.log10(row["max_win"]) * 4)}')
+    for column in ('features', 'themes'):
+        for value in row.get(column) or []:
+            tokens.add(f'{column}:{value.strip().lower()}')
+
+    name = normalize_name(row.get('name') or row.get('title'), row.get('provider'))
+    words = name.split()
+    tokens.update(f'word:{word}' for word in words)
+    compact = name.replace(' ', '')
+    tokens.update(f'name:{compact[i:i + 3]}' for i in range(max(1, len(compact) - 2)))
+    return tokens
+
+
+class MinHasher:
+    """
+    MinHash signatures with NUM_PERM multiply-shift hash functions applied to
+    32-bit token hashes, vectorized over all tokens of a record.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens):
+        """
+        Returns:
+            numpy.ndarray: uint32 signature; all-max for an empty token set
+        """
+        if not tokens:
+            return np.full(len(self.a), np.iinfo(np.uint32).max, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens),
+                             dtype=np.uint64, count=len(tokens))
+        with np.errstate(over='ignore'):
+            permuted = (hashes[:, None] * self.a + self.b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def lsh_candidates(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """
+    Pairs of rows falling in the same bucket of at least one band.
+
+    Args:
+        signatures (numpy.ndarray): n x NUM_PERM signature matrix
+
+    Returns:
+        set: (i, j) index pairs with i < j
+    """
+    rows_per_band = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        buckets = {}
+        for index, key in enumerate(chunk.view(f'V{chunk.itemsize * rows_per_band}').ravel()):
+            buckets.setdefault(key.tobytes(), []).append(index)
+        for members in buckets.values():
+            if 1 < len(members) <= max_bucket:
+                pairs.update((members[i], members[j])
+                             for i in range(len(members)) for j in range(i + 1, len(members)))
+    return pairs
+
+
+def find_clusters(rows, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """
+    Group near-duplicate catalog rows: LSH proposes candidate pairs, pairs
+    whose estimated Jaccard similarity reaches `threshold` are joined, and
+    connected groups become clusters.
+
+    Args:
+        rows (list): Normalized catalog rows
+        threshold (float): Minimum estimated Jaccard similarity of a pair
+
+    Returns:
+        list: Cluster id per row (the index of its first member), None for
+        rows without a near duplicate
+    """
+    if not rows:
+        return []
+    hasher = MinHasher(num_perm)
+    signatures = np.vstack([hasher.signature(record_tokens(row)) for row in rows])
+
+    parent = list(range(len(rows)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in lsh_candidates(signatures, bands):
+        if (signatures[i] == signatures[j]).mean() >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    roots = [find(i) for i in range(len(rows))]
+    sizes = {}
+    for root in roots:
+        sizes[root] = sizes.get(root, 0) + 1
+    return [root if sizes[root] > 1 else None for root in roots]
+
+
+if __name__ == "__main__":
+    from catalog import load_catalog
+
+    parser = argparse.ArgumentParser(description="List clusters of near-duplicate games in the catalog")
+    parser.add_argument('catalog', help="Catalog built by catalog.py (with --clusters)")
+    parser.add_argument('-n', '--limit', type=int, default=20, help="Number of largest clusters to print")
+    args = parser.parse_args()
+
+    frame = load_catalog(args.catalog, columns=['name', 'provider', 'url', 'cluster_id'])
+    clustered = frame.dropna(subset=['cluster_id'])
+    sizes = clustered.groupby('cluster_id').size().sort_values(ascending=False)
+    print(f"{len(clustered)} of {len(frame)} games in {len(sizes)} clusters")
+    for cluster_id in sizes.index[:args.limit]:
+        members = clustered[clustered['cluster_id'] == cluster_id]
+        print(f"Cluster {int(cluster_id)}: " + ', '.join(f"{row.name} ({row.provider})" for row in members.itertuples()))
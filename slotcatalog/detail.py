@@ -1,70 +1,215 @@
 import os
 import json
-from bs4 import BeautifulSoup
+import argparse
+from functools import partial
 
-def parse_provider_details():
-    details_dir = "slotcatalog/details"
-    all_provider_details = []
+from archive import is_archive, list_pages, page_name, read_page
+from games import extract_slot_cards
+import instrument
+from instrument import count, count_output, stage
+from jsonl import JsonlWriter, write_json_array
+from records import ProviderGameCard, format_for, from_dicts, write_records
+from manifest import Manifest, extractor_version, incremental_map
+from parallel import print_error_summary
+from parsers import BACKENDS, parse_html
+
+def extract_provider_page(html_content, filename, backend=None):
+    """
+    Extract everything a provider page carries from a single parse: the
+    attributes table, the logo and the embedded game cards.
+
+    Args:
+        html_content (str): Provider page HTML
+        filename (str): Page file name, e.g. 'Playtech.html'
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+
+    Returns:
+        dict: {'details': provider details or None, 'games': game cards}
+    """
+    soup = parse_html(html_content, backend)
+    name = filename.split('.')[0].replace('_games', '')
+
+    # The page's slotCard blocks are the first page of the provider's games
+    games = extract_slot_cards(soup)
+    for game in games:
+        game['provider'] = name
+
+    return {'details': extract_provider_details(soup, name), 'games': games}
+
+def extract_provider_details(soup, name):
+    """
+    Extract the provider attributes table and logo from a parsed provider page.
+
+    Args:
+        soup: Document returned by parsers.parse_html
+        name (str): Provider name stored with the details
+
+    Returns:
+        dict: Provider details, or None if the page has no attributes table
+    """
+    # Find the provider attributes table
+    attr_div = soup.find('div', class_='provFormalAttr')
+    if not attr_div:
+        return None
+        
+    table = attr_div.find('table')
+    if not table:
+        return None
+        
+    # Get provider logo image URL if present
+    logo_div = soup.find('div', class_='provider-page-scr')
+    logo_img = logo_div.find('img') if logo_div else None
     
-    # Iterate through all HTML files in details directory
-    for filename in os.listdir(details_dir):
-        if filename.endswith(".html"):
-            with open(os.path.join(details_dir, filename), 'r', encoding='utf-8') as f:
-                html_content = f.read()
-                
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Find the provider attributes table
-            attr_div = soup.find('div', class_='provFormalAttr')
-            if not attr_div:
-                continue
-                
-            table = attr_div.find('table')
-            if not table:
-                continue
-                
-            provider_details = {}
+    provider_details = {}
+    
+    # Extract each row's key-value pair
+    for row in table.find_all('tr'):
+        # Get the header text (key)
+        header = row.find('th', class_='propLeft')
+        if not header:
+            continue
+        key = header.text.strip().rstrip(':')
+        
+        # Get the value
+        value_cell = row.find('td', class_='propRight')
+        if not value_cell:
+            continue
             
-            # Extract each row's key-value pair
-            for row in table.find_all('tr'):
-                # Get the header text (key)
-                header = row.find('th', class_='propLeft')
-                if not header:
-                    continue
-                key = header.text.strip().rstrip(':')
-                
-                # Get the value
-                value_cell = row.find('td', class_='propRight')
-                if not value_cell:
-                    continue
-                    
-                # If there's a link, get both the link text and href
-                value = value_cell.find('a')
-                if value:
-                    link_text = value.text.strip()
-                    link_href = value.get('href', '')
-                    value = {
-                        'text': link_text,
-                        'href': link_href
-                    }
-                else:
-                    value = value_cell.text.strip()
-                
-                # Get provider logo image URL if present
-                logo_img = soup.find('div', class_='provider-page-scr').find('img')
-                if logo_img:
-                    provider_details['Logo'] = logo_img.get('src', '')
-                provider_details[key] = value
-                provider_details['name'] = filename.split('.')[0].replace('_games', '')
-            if provider_details:
-                all_provider_details.append(provider_details)
-                
-    return all_provider_details
-
-def save_provider_details():
-    details = parse_provider_details()
-    with open('provider_details.json', 'w', encoding='utf-8') as f:
-        json.dump(details, f, indent=2, ensure_ascii=False)
+        # If there's a link, get both the link text and href
+        value = value_cell.find('a')
+        if value:
+            link_text = value.text.strip()
+            link_href = value.get('href', '')
+            value = {
+                'text': link_text,
+                'href': link_href
+            }
+        else:
+            value = value_cell.text.strip()
+        
+        if logo_img:
+            provider_details['Logo'] = logo_img.get('src', '')
+        provider_details[key] = value
+        provider_details['name'] = name
+    return provider_details or None
+
+def parse_provider_page(file_path, backend=None):
+    """
+    Read one provider page and extract its details and game cards.
+
+    Args:
+        file_path (str or ArchivePage): A details/*.html provider page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+
+    Returns:
+        dict: {'details': provider details or None, 'games': game cards}
+    """
+    return extract_provider_page(read_page(file_path), page_name(file_path), backend)
+
+def parse_provider_file(file_path, backend=None):
+    """
+    Extract the provider attributes table from one provider page.
+
+    Args:
+        file_path (str or ArchivePage): A details/*.html provider page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+
+    Returns:
+        dict: Provider details, or None if the page has no attributes table
+    """
+    return parse_provider_page(file_path, backend)['details']
+
+def parse_provider_pages(workers=1, backend=None, incremental=True, source=None):
+    """
+    Parse every provider page in the details directory, collecting the
+    provider details and the game cards embedded in the pages.
+
+    Args:
+        workers (int): Number of parser processes. 1 parses serially, 0 uses all cores
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        incremental (bool): Reuse cached records for pages unchanged since the last run
+        source (str, optional): Directory or .pack archive of provider pages.
+            Defaults to the details directory
+
+    Returns:
+        tuple: (provider details, one dict per page with an attributes table;
+        game cards from every page)
+    """
+    details_dir = source or "slotcatalog/details"
+    all_provider_details = []
+    all_games = []
+    errors = []
+    
+    # Iterate through all HTML pages in the details directory or archive
+    if is_archive(details_dir):
+        file_paths = list_pages(details_dir)
+    else:
+        file_paths = [os.path.join(details_dir, filename)
+                      for filename in os.listdir(details_dir) if filename.endswith(".html")]
+    manifest = None
+    if incremental:
+        manifest = Manifest('provider_pages', extractor_version(
+            extract_provider_page, extract_provider_details, extract_slot_cards))
+    results = incremental_map(partial(parse_provider_page, backend=backend), file_paths, manifest, workers=workers)
+    for file_path, page, error in results:
+        if error is not None:
+            errors.append((file_path, error))
+            continue
+        if page['details']:
+            all_provider_details.append(page['details'])
+        all_games.extend(page['games'])
+    
+    print_error_summary(errors)
+    return all_provider_details, all_games
+
+def parse_provider_details(workers=1, backend=None, incremental=True, source=None):
+    """
+    Parse every provider page in the details directory.
+
+    Returns:
+        list: Provider details, one dict per page with an attributes table
+    """
+    return parse_provider_pages(workers=workers, backend=backend, incremental=incremental, source=source)[0]
+
+def save_provider_details(workers=1, backend=None, incremental=True, source=None, games_path=None):
+    """
+    Write provider_details.json and, when `games_path` is given, the game cards
+    embedded in the provider pages (.json array or .jsonl[.zst|.gz]).
+    """
+    with stage('parse'):
+        details, games = parse_provider_pages(workers=workers, backend=backend, incremental=incremental, source=source)
+    count('records', len(details))
+    with stage('write_json'):
+        with open('provider_details.json', 'w', encoding='utf-8') as f:
+            json.dump(details, f, indent=2, ensure_ascii=False)
+        count_output('provider_details.json')
+        if games_path:
+            if format_for(games_path) == 'msgpack':
+                write_records(from_dicts(ProviderGameCard, games), games_path)
+            elif '.jsonl' in os.path.basename(games_path):
+                with JsonlWriter(games_path) as writer:
+                    writer.write_many(games)
+            else:
+                with open(games_path, 'w', encoding='utf-8') as f:
+                    write_json_array(games, f)
+            count('game_records', len(games))
+            count_output(games_path)
+            print(f"Saved {len(games)} games from provider pages to {games_path}")
 
 if __name__ == "__main__":
-    save_provider_details()
+    parser = argparse.ArgumentParser(description="Extract provider details from details/*.html")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parser processes (1 = serial, 0 = all cores)")
+    parser.add_argument('--parser', choices=BACKENDS, default=None,
+                        help="HTML parser backend (defaults to the fastest installed)")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-parse every page instead of only new or changed ones")
+    parser.add_argument('--source', default=None,
+                        help="Directory or .pack archive of provider pages (defaults to slotcatalog/details)")
+    parser.add_argument('--games', default=None,
+                        help="Also save the game cards embedded in the pages to this .json, .jsonl or .msgpack file")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('detail', args)
+    save_provider_details(workers=args.workers, backend=args.parser, incremental=not args.full,
+                          source=args.source, games_path=args.games)
@@ -1,15 +1,25 @@
 import os
 import json
-from bs4 import BeautifulSoup
 import re
 from pathlib import Path
 import csv
+import argparse
 
-def extract_game_data(html_content, filename):
+from functools import partial
+
+from archive import list_pages, read_page
+import instrument
+from instrument import count, count_output, stage
+from jsonl import JsonlWriter, collect_fields, jsonl_to_csv, write_csv
+from manifest import Manifest, extractor_version, incremental_map
+from parallel import print_error_summary
+from parsers import BACKENDS, parse_html
+
+def extract_game_data(html_content, filename, backend=None):
     """
     Extract game data from HTML content
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = parse_html(html_content, backend)
     game_data = {}
     
     # Extract game title
@@ -59,46 +69,88 @@ def extract_game_data(html_content, filename):
     
     return game_data
 
-def process_game_files():
+def parse_game_file(html_file, backend=None):
+    """
+    Read one game HTML file and extract its data.
+
+    Args:
+        html_file (Path or ArchivePage): The game HTML page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+
+    Returns:
+        dict: Extracted game data
+    """
+    html_content = read_page(html_file)
+    return extract_game_data(html_content, html_file.name, backend)
+
+
+def process_game_files(workers=1, backend=None, incremental=True, jsonl_path=None, source=None):
     """
     Process all game HTML files and convert to JSON
+
+    Args:
+        workers (int): Number of parser processes. 1 parses serially, 0 uses all cores
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        incremental (bool): Only re-parse pages that are new or changed since the last run
+        jsonl_path (str, optional): Streaming mode. Append every game to this JSON Lines
+            file (.zst/.gz to compress) instead of writing one JSON file per game
+        source (str, optional): Directory or .pack archive of game pages.
+            Defaults to game_details
     """
     # Define paths
-    input_dir = Path('game_details')
+    input_dir = Path(source or 'game_details')
     output_dir = Path('game_json')
     
     # Create output directory if it doesn't exist
-    output_dir.mkdir(exist_ok=True)
+    writer = JsonlWriter(jsonl_path) if jsonl_path else None
+    if not writer:
+        output_dir.mkdir(exist_ok=True)
     
     # Get list of all HTML files
-    html_files = list(input_dir.glob('*.html'))
+    html_files = list_pages(input_dir)
     print(f"Found {len(html_files)} HTML files to process")
     
-    # Process each file
-    for i, html_file in enumerate(html_files):
+    errors = []
+    
+    manifest = Manifest('game_details', extractor_version(extract_game_data, parse_game_file)) if incremental else None
+    
+    # Parse files (in a process pool when workers != 1) and save results in order
+    results = incremental_map(partial(parse_game_file, backend=backend), html_files, manifest, workers=workers)
+    for i, (html_file, game_data, error) in enumerate(results):
+        filename = html_file.name
+        if error is not None:
+            errors.append((html_file, error))
+            continue
+        
+        count('records')
+        if writer:
+            writer.write(game_data)
+            continue
+        
         try:
-            filename = html_file.name
-            print(f"Processing {i+1}/{len(html_files)}: {filename}")
-            
-            # Read HTML content
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Extract game data
-            game_data = extract_game_data(html_content, filename)
-            
             # Save as JSON
             json_filename = filename.replace('.html', '.json')
             output_path = output_dir / json_filename
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(game_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"Saved: {json_filename}")
+            # Unchanged pages keep their existing JSON
+            if manifest and html_file in manifest.hits and output_path.exists():
+                continue
             
+            with stage('write_json'), open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(game_data, f, indent=2, ensure_ascii=False)
+            count_output(output_path)
         except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
+            errors.append((html_file, str(e)))
+            continue
+        
+        print(f"Processed {i+1}/{len(html_files)}: {filename}")
+    
+    if writer:
+        writer.close()
+        count_output(jsonl_path)
+        print(f"Streamed {writer.count} games to {jsonl_path}")
     
+    print_error_summary(errors)
     print("All game files have been processed.")
 
 
@@ -106,6 +158,9 @@ def merge_json_to_csv(json_dir='game_json', output_file='all_games.csv'):
     """
     Merge all JSON game files into a single CSV file
     
+    Only one game is held in memory at a time: a first pass collects the
+    union of field names, a second pass streams the rows.
+    
     Args:
         json_dir (str): Directory containing JSON game files
         output_file (str): Name of the output CSV file
@@ -124,41 +179,62 @@ def merge_json_to_csv(json_dir='game_json', output_file='all_games.csv'):
         print("No JSON files found to merge")
         return
     
-    # Read the first file to get all possible fields
-    with open(json_files[0], 'r', encoding='utf-8') as f:
-        first_game = json.load(f)
-    
-    # Create a set of all field names
-    all_fields = set(first_game.keys())
-    
-    # Read all files to collect all possible fields
-    all_games = []
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                game_data = json.load(f)
-                all_games.append(game_data)
-                all_fields.update(game_data.keys())
-        except Exception as e:
-            print(f"Error reading {json_file.name}: {str(e)}")
+    def iter_games():
+        for json_file in json_files:
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    yield json.load(f)
+            except Exception as e:
+                print(f"Error reading {json_file.name}: {str(e)}")
     
     # Convert set to sorted list for consistent column order
-    fieldnames = sorted(list(all_fields))
+    fieldnames = sorted(collect_fields(iter_games()))
     
     # Write to CSV
     try:
-        with open(output_file, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for game in all_games:
-                writer.writerow(game)
-        
-        print(f"Successfully merged {len(all_games)} games into {output_file}")
+        count = write_csv(iter_games(), output_file, fieldnames)
+        print(f"Successfully merged {count} games into {output_file}")
+    except Exception as e:
+        print(f"Error writing to CSV file: {str(e)}")
+
+
+def merge_jsonl_to_csv(jsonl_path, output_file='all_games.csv'):
+    """
+    Build the games CSV straight from a JSON Lines file written in streaming
+    mode, in bounded memory.
+    
+    Args:
+        jsonl_path (str): JSON Lines file produced by process_game_files(jsonl_path=...)
+        output_file (str): Name of the output CSV file
+    """
+    try:
+        count = jsonl_to_csv(jsonl_path, output_file)
+        print(f"Successfully merged {count} games into {output_file}")
     except Exception as e:
         print(f"Error writing to CSV file: {str(e)}")
 
 
 if __name__ == "__main__":
-    process_game_files()
-    merge_json_to_csv()
+    parser = argparse.ArgumentParser(description="Parse game detail pages and merge them into a CSV")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parser processes (1 = serial, 0 = all cores)")
+    parser.add_argument('--parser', choices=BACKENDS, default=None,
+                        help="HTML parser backend (defaults to the fastest installed)")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-parse every page instead of only new or changed ones")
+    parser.add_argument('--jsonl', default=None,
+                        help="Stream games to this JSON Lines file (.zst/.gz to compress) instead of game_json/")
+    parser.add_argument('--source', default=None,
+                        help="Directory or .pack archive of game pages (defaults to game_details)")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('game_detail', args)
+    
+    with stage('parse'):
+        process_game_files(workers=args.workers, backend=args.parser, incremental=not args.full,
+                           jsonl_path=args.jsonl, source=args.source)
+    with stage('csv'):
+        if args.jsonl:
+            merge_jsonl_to_csv(args.jsonl)
+        else:
+            merge_json_to_csv()
@@ -1,22 +1,39 @@
 import os
 import json
 import sys
+import argparse
 
-def find_missing_game_details():
+from archive import PageArchive
+from crawl.frontier import Frontier
+
+def find_missing_game_details(frontier_path=None, limit=None):
+    """
+    Bring the crawl frontier up to date with game_urls.json and list the game
+    URLs that still need fetching.
+
+    URLs are added to the frontier once; at that point pages already in
+    game_details/ or game_details.pack are recorded as fetched. Later runs
+    only query the frontier, so they never list the directory again.
+
+    Args:
+        frontier_path (str, optional): Frontier database. Defaults to frontier.db
+        limit (int, optional): Return at most this many URLs
+
+    Returns:
+        list: Due game URLs (pending, or failed and ready for a retry)
+    """
     # Define paths
     script_dir = os.path.dirname(os.path.abspath(__file__))
     game_urls_path = os.path.join(script_dir, 'game_urls.json')
     game_details_dir = os.path.join(script_dir, 'game_details')
-    
-    # Check if directories and files exist
+    game_details_pack = os.path.join(script_dir, 'game_details.pack')
+    frontier_path = frontier_path or os.path.join(script_dir, 'frontier.db')
+
+    # Check if files exist
     if not os.path.exists(game_urls_path):
         print(f"Error: game_urls.json not found at {game_urls_path}")
         sys.exit(1)
-    
-    if not os.path.exists(game_details_dir):
-        print(f"Error: game_details directory not found at {game_details_dir}")
-        sys.exit(1)
-    
+
     # Load game URLs from JSON file
     try:
         with open(game_urls_path, 'r', encoding='utf-8') as f:
@@ -25,38 +42,47 @@ def find_missing_game_details():
     except Exception as e:
         print(f"Error loading game_urls.json: {e}")
         sys.exit(1)
-    
-    # Get list of existing HTML files
-    existing_html_files = set()
-    for filename in os.listdir(game_details_dir):
-        if filename.endswith('.html'):
-            existing_html_files.add(filename)
-    
-    print(f"Found {len(existing_html_files)} HTML files in game_details directory")
-    
-    # Find missing game details
-    missing_urls = []
-    for url in game_urls:
-        # Extract game name from URL for filename
-        game_name = url.split('/')[-1]
-        expected_html_file = f"{game_name}.html"
-        
-        if expected_html_file not in existing_html_files:
-            missing_urls.append(url)
-    
-    print(f"Found {len(missing_urls)} game URLs without corresponding HTML files")
-    
-    # Output missing URLs
+
+    with Frontier(frontier_path) as frontier:
+        new_urls = frontier.add(game_urls, 'game_details')
+        print(f"Added {len(new_urls)} new game URLs to {frontier_path}")
+
+        if new_urls:
+            # Pages saved before the URL was tracked count as fetched
+            existing_html_files = set()
+            if os.path.exists(game_details_dir):
+                existing_html_files = {filename for filename in os.listdir(game_details_dir)
+                                       if filename.endswith('.html')}
+            archived_urls = set()
+            if os.path.exists(game_details_pack):
+                with PageArchive(game_details_pack) as archive:
+                    archived_urls = set(archive.urls())
+
+            for url in new_urls:
+                if f"{url.split('/')[-1]}.html" in existing_html_files or url in archived_urls:
+                    frontier.mark_fetched(url, status=None)
+
+        print(f"Frontier: {frontier.counts('game_details')}")
+        missing_urls = frontier.due('game_details', limit=limit)
+
+    print(f"Found {len(missing_urls)} game URLs due for fetching")
+
+    # Output missing URLs for game_detail.js
     if missing_urls:
         output_file = os.path.join(script_dir, 'missing_game_urls.json')
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(missing_urls, f, indent=2)
         print(f"Missing game URLs saved to {output_file}")
     else:
-        print("All game URLs have corresponding HTML files")
-    
+        print("All game URLs have been fetched")
+
     return missing_urls
 
 if __name__ == "__main__":
-    missing_urls = find_missing_game_details()
+    parser = argparse.ArgumentParser(description="List game detail URLs that still need fetching")
+    parser.add_argument('--frontier', default=None, help="Frontier database (defaults to frontier.db)")
+    parser.add_argument('--limit', type=int, default=None, help="List at most this many URLs")
+    args = parser.parse_args()
+
+    missing_urls = find_missing_game_details(frontier_path=args.frontier, limit=args.limit)
     print(f"Total missing URLs: {len(missing_urls)}")
@@ -1,21 +1,49 @@
 import os
 import re
-from bs4 import BeautifulSoup
+import mmap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import json
 import csv
+import argparse
+from functools import partial
 
-def extract_game_data(html_content):
+from archive import ArchivePage, is_archive, list_pages, read_page
+import instrument
+from instrument import count, count_output, stage
+from jsonl import JsonlWriter, jsonl_to_csv, write_json_array
+from manifest import Manifest, extractor_version, incremental_map
+from parallel import default_workers
+from parsers import BACKENDS, SLOT_CARD_PATTERN, parse_html
+
+# Opening tag of every game card (see parsers.SLOT_CARD_PATTERN), matched on
+# the raw bytes; cards are parsed one chunk of them at a time
+SLOT_CARD_TAG = re.compile(SLOT_CARD_PATTERN.encode('ascii'))
+
+def extract_game_data(html_content, backend=None):
     """
     Extract game data from HTML content containing slotCard elements.
     
     Args:
         html_content (str): HTML content to parse
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        
+    Returns:
+        list: List of dictionaries containing game data
+    """
+    return extract_slot_cards(parse_html(html_content, backend))
+
+def extract_slot_cards(soup):
+    """
+    Extract game data from the slotCard elements of an already parsed page.
+    
+    Args:
+        soup: Document returned by parsers.parse_html
         
     Returns:
         list: List of dictionaries containing game data
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
     slot_cards = soup.find_all('div', class_='slotCard')
     
     games_data = []
@@ -57,15 +85,135 @@ def extract_game_data(html_content):
     
     return games_data
 
-def process_game_files(directory_path='games_data'):
+def iter_card_chunks(file_path, cards_per_chunk=32):
+    """
+    Split a provider's games page into HTML fragments of `cards_per_chunk`
+    slotCards each, cut at the card markers, without building a tree of the
+    whole page. Files are scanned through mmap, so only one chunk is in
+    memory at a time; archive pages are read whole and sliced.
+    
+    Args:
+        file_path (Path or ArchivePage): The provider's games HTML page
+        cards_per_chunk (int): Cards per fragment
+        
+    Yields:
+        str: HTML fragment holding up to `cards_per_chunk` complete cards
+    """
+    if isinstance(file_path, ArchivePage):
+        data = read_page(file_path).encode('utf-8')
+    else:
+        f = open(file_path, 'rb')
+        if os.fstat(f.fileno()).st_size == 0:
+            f.close()
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    def decode(chunk):
+        # Same newlines as a text-mode read
+        return chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n').decode('utf-8')
+    
+    try:
+        cards = SLOT_CARD_TAG.finditer(data)
+        first = next(cards, None)
+        if first is None:
+            return
+        start, in_chunk = first.start(), 1
+        for card in cards:
+            if in_chunk == cards_per_chunk:
+                yield decode(data[start:card.start()])
+                start, in_chunk = card.start(), 0
+            in_chunk += 1
+        yield decode(data[start:])
+    finally:
+        if not isinstance(file_path, ArchivePage):
+            data.close()
+            f.close()
+
+def iter_game_data(file_path, backend=None, cards_per_chunk=32, workers=1):
+    """
+    Stream the games of a provider's games page chunk by chunk (see
+    iter_card_chunks), so peak memory follows the chunk size rather than the
+    size of the provider's catalog.
+    
+    Args:
+        file_path (Path or ArchivePage): The provider's games HTML page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        cards_per_chunk (int): Cards parsed per fragment
+        workers (int): Parse chunks in this many processes (0 = all cores),
+            keeping a bounded number of chunks in flight
+        
+    Yields:
+        dict: Game data, in page order
+    """
+    chunks = iter_card_chunks(file_path, cards_per_chunk)
+    extract = partial(extract_game_data, backend=backend)
+    if workers == 0:
+        workers = default_workers()
+    if workers <= 1:
+        for chunk in chunks:
+            yield from extract(chunk)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(extract, chunk))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def iter_provider_games(file_path, backend=None, workers=1):
+    """
+    Stream the games of one {provider}_games.html file (see iter_game_data),
+    each tagged with the provider name taken from the file name.
+    
+    Args:
+        file_path (Path or ArchivePage): The provider's games HTML page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        workers (int): Chunk parser processes (0 = all cores)
+        
+    Yields:
+        dict: Game data, in page order
+    """
+    # Extract provider name from the file name
+    provider_name = file_path.stem.replace('_games', '')
+    for game in iter_game_data(file_path, backend, workers=workers):
+        game['provider'] = provider_name
+        yield game
+
+def parse_games_file(file_path, backend=None):
+    """
+    Extract the games from one {provider}_games.html file and tag each with
+    the provider name taken from the file name.
+    
+    Args:
+        file_path (Path or ArchivePage): The provider's games HTML page
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        
+    Returns:
+        list: List of dictionaries containing game data
+    """
+    return list(iter_provider_games(file_path, backend))
+
+def process_game_files(directory_path='games_data', backend=None, incremental=True, jsonl_path=None, workers=1):
     """
     Process all HTML files in the specified directory and extract game data.
     
     Args:
-        directory_path (str): Path to directory containing HTML files
+        directory_path (str): Path to directory containing HTML files, or to a
+            .pack archive of them (JSON files then go to the directory of the same name)
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        incremental (bool): Only re-parse files that are new or changed since the last run
+        jsonl_path (str, optional): Streaming mode. Append every game to this JSON Lines
+            file (.zst/.gz to compress) as soon as its chunk is parsed, instead of
+            writing per-provider JSON files and collecting the games in memory.
+            Only the manifest keeps a provider's games until its page is done,
+            so with incremental=False nothing beyond the chunks in flight is held
+        workers (int): Parser processes (1 = serial, 0 = all cores). Pages are
+            parsed in parallel, or in streaming mode the chunks of each page
         
     Returns:
-        list: Combined list of game data from all files
+        list: Combined list of game data from all files (empty in streaming mode)
     """
     base_dir = Path(__file__).parent
     games_dir = base_dir / directory_path
@@ -76,72 +224,141 @@ def process_game_files(directory_path='games_data'):
         print(f"Directory not found: {games_dir}")
         return all_games
     
-    for file_path in games_dir.glob('*.html'):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                html_content = file.read()
-                games = extract_game_data(html_content)
-                # Extract provider name from the file name
-                provider_name = file_path.stem
-                
-                # Add provider name to each game
-                for game in games:
-                    game['provider'] = provider_name.replace('_games', '')
-                
-                # Save games to a JSON file named after the provider
-                json_file_path = file_path.with_suffix('.json')
-                try:
-                    with open(json_file_path, 'w', encoding='utf-8') as json_file:
-                        json.dump(games, json_file, indent=4, ensure_ascii=False)
-                    print(f"Saved {len(games)} games to {json_file_path.name}")
-                except Exception as e:
-                    print(f"Error saving to JSON file {json_file_path.name}: {str(e)}")
-                all_games.extend(games)
-                print(f"Processed {file_path.name}: {len(games)} games found")
-        except Exception as e:
-            print(f"Error processing {file_path.name}: {str(e)}")
+    manifest = Manifest('provider_games', extractor_version(extract_game_data, extract_slot_cards, iter_card_chunks, iter_provider_games)) if incremental else None
+    writer = JsonlWriter(jsonl_path) if jsonl_path else None
+    
+    output_dir = games_dir.with_suffix('') if is_archive(games_dir) else games_dir
+    if not writer:
+        output_dir.mkdir(exist_ok=True)
+    
+    if writer:
+        stream_game_files(list_pages(games_dir), writer, manifest, backend, workers)
+        writer.close()
+        count_output(jsonl_path)
+        print(f"Streamed {writer.count} games to {jsonl_path}")
+        return all_games
+    
+    results = incremental_map(partial(parse_games_file, backend=backend), list_pages(games_dir), manifest, workers=workers)
+    for file_path, games, error in results:
+        if error is not None:
+            print(f"Error processing {file_path.name}: {error}")
+            continue
+        
+        count('records', len(games))
+        # Save games to a JSON file named after the provider
+        json_file_path = output_dir / (file_path.stem + '.json')
+        if not (manifest and file_path in manifest.hits and json_file_path.exists()):
+            try:
+                with stage('write_json'), open(json_file_path, 'w', encoding='utf-8') as json_file:
+                    json.dump(games, json_file, indent=4, ensure_ascii=False)
+                count_output(json_file_path)
+                print(f"Saved {len(games)} games to {json_file_path.name}")
+            except Exception as e:
+                print(f"Error saving to JSON file {json_file_path.name}: {str(e)}")
+        all_games.extend(games)
+        print(f"Processed {file_path.name}: {len(games)} games found")
     
     return all_games
 
+def stream_game_files(file_paths, writer, manifest=None, backend=None, workers=1):
+    """
+    Write the games of every page to a JSON Lines writer as each chunk is
+    parsed (see iter_provider_games). Unchanged pages are written from the
+    manifest instead.
+    
+    Args:
+        file_paths (list): Provider games pages, in output order
+        writer (JsonlWriter): Destination
+        manifest (Manifest, optional): Cache to consult and update
+        backend (str, optional): Parser backend (see parsers.BACKENDS)
+        workers (int): Chunk parser processes per page (0 = all cores)
+    """
+    file_paths = list(file_paths)
+    if manifest:
+        cached, stale = manifest.split(file_paths)
+        manifest.hits = set(cached)
+        print(f"{len(cached)} files unchanged, {len(stale)} to parse")
+        count('files_cached', len(cached))
+        manifest.prune(file_paths)
+    
+    for file_path in file_paths:
+        if manifest and file_path in manifest.hits:
+            games = manifest.records(file_path)
+            writer.write_many(games)
+            found = len(games)
+        else:
+            # Kept only to cache the page's games in the manifest
+            games = [] if manifest else None
+            found = 0
+            try:
+                for game in iter_provider_games(file_path, backend, workers):
+                    writer.write(game)
+                    found += 1
+                    if games is not None:
+                        games.append(game)
+            except Exception as e:
+                print(f"Error processing {file_path.name}: {str(e)}")
+                continue
+            if manifest:
+                manifest.update(file_path, games)
+        count('records', found)
+        print(f"Processed {file_path.name}: {found} games found")
+
 
 def combine_json_files():
     base_dir = Path(__file__).parent
     games_dir = base_dir / 'games'
     output_file = base_dir / 'games_combined.json'
     
-    all_games = []
-    
     if not games_dir.exists():
         print(f"Directory not found: {games_dir}")
         return
     
-    # Process each JSON file in the games directory
-    for json_file_path in games_dir.glob('*.json'):
-        try:
-            with open(json_file_path, 'r', encoding='utf-8') as file:
-                games = json.load(file)
-                all_games.extend(games)
-                print(f"Added {len(games)} games from {json_file_path.name}")
-        except Exception as e:
-            print(f"Error processing {json_file_path.name}: {str(e)}")
+    def iter_games():
+        # Only one provider's games are held in memory at a time
+        for json_file_path in games_dir.glob('*.json'):
+            try:
+                with open(json_file_path, 'r', encoding='utf-8') as file:
+                    games = json.load(file)
+            except Exception as e:
+                print(f"Error processing {json_file_path.name}: {str(e)}")
+                continue
+            print(f"Added {len(games)} games from {json_file_path.name}")
+            yield from games
     
-    # Save the combined data to a new JSON file
+    # Stream the combined data into a new JSON file
     try:
         with open(output_file, 'w', encoding='utf-8') as file:
-            json.dump(all_games, file, indent=4, ensure_ascii=False)
-        print(f"Successfully combined {len(all_games)} games into {output_file.name}")
+            count = write_json_array(iter_games(), file, indent=4)
+        print(f"Successfully combined {count} games into {output_file.name}")
     except Exception as e:
         print(f"Error saving combined JSON file: {str(e)}")
 
-def convert_json_to_csv():
+def convert_json_to_csv(source=None):
+    """
+    Convert the combined games to CSV with 'name' and 'provider' first.
+    
+    Args:
+        source (str, optional): Input file. A JSON Lines file (.jsonl, optionally
+            .zst/.gz compressed) is converted in bounded memory; the default
+            games_combined.json array is loaded whole
+    """
     base_dir = Path(__file__).parent
-    json_file = base_dir / 'games_combined.json'
+    json_file = Path(source) if source else base_dir / 'games_combined.json'
     csv_file = base_dir / 'games_combined.csv'
     
     if not json_file.exists():
         print(f"JSON file not found: {json_file}")
         return
     
+    if '.jsonl' in json_file.name:
+        try:
+            count = jsonl_to_csv(json_file, csv_file, leading=('name', 'provider'))
+            print(f"Successfully converted {count} games to CSV: {csv_file.name}")
+        except Exception as e:
+            print(f"Error converting JSON Lines to CSV: {str(e)}")
+        return
+    
     try:
         # Read the JSON data
         with open(json_file, 'r', encoding='utf-8') as file:
@@ -182,7 +399,31 @@ def convert_json_to_csv():
 
 
 if __name__ == "__main__":
-    games = process_game_files()
+    parser = argparse.ArgumentParser(description="Extract provider games from games_data/*.html")
+    parser.add_argument('--jsonl', default=None,
+                        help="Stream games to this JSON Lines file (.zst/.gz to compress) and build the CSV from it")
+    parser.add_argument('--source', default='games_data',
+                        help="Directory or .pack archive of provider games pages, relative to this script")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parser processes (1 = serial, 0 = all cores); with --jsonl they parse the chunks of each page")
+    parser.add_argument('--parser', choices=BACKENDS, default=None,
+                        help="HTML parser backend (defaults to the fastest installed)")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-parse every page instead of only new or changed ones")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('games', args)
+    
+    if args.jsonl:
+        with stage('parse'):
+            process_game_files(args.source, backend=args.parser, incremental=not args.full,
+                               jsonl_path=args.jsonl, workers=args.workers)
+        with stage('csv'):
+            convert_json_to_csv(source=args.jsonl)
+    else:
+        with stage('parse'):
+            games = process_game_files(args.source, backend=args.parser, incremental=not args.full,
+                                       workers=args.workers)
     # print(f"Total games extracted: {len(games)}")
     
     # # Print sample data
@@ -0,0 +1,273 @@
+"""
+Run instrumentation shared by the pipeline scripts.
+
+A script calls start() once (normally through add_arguments() and
+start_from_args()); from then on stage() timings, count() totals, input and
+output byte counts and per-file parse latencies from parallel.parallel_map
+are collected, and a JSON run report is written when the process exits.
+Without start() every call here is a no-op.
+
+    with stage('parse'):
+        ...
+    count('records', len(games))
+    count_output(output_file)
+"""
+import atexit
+import cProfile
+import heapq
+import io
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Upper bounds (ms) of the per-file latency histogram buckets; the last one is open
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_run = None
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """
+    Peak resident set size so far, in MB, of this process (RUSAGE_SELF) or of
+    its largest finished child (RUSAGE_CHILDREN, e.g. parser pool workers).
+    """
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError):
+        return None
+
+
+class Run:
+    """
+    Measurements of one script run.
+    """
+
+    def __init__(self, script, report_path, profile=0):
+        """
+        Args:
+            script (str): Script name, used in the report and profile file names
+            report_path (str): JSON report written by finish()
+            profile (int): Re-run this many of the slowest files under cProfile
+                and tracemalloc at the end of the run (0 disables profiling)
+        """
+        self.script = script
+        self.report_path = report_path
+        self.profile = profile
+        self.started = datetime.now(timezone.utc)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.stages = {}
+        self.stack = []
+        self.counters = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latencies = []
+        self.cpu_per_file = 0.0
+        # Min-heap of (seconds, sequence, func, item) for the slowest files
+        self.slowest = []
+
+    @contextmanager
+    def stage(self, name):
+        self.stack.append(name)
+        key = '/'.join(self.stack)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            totals = self.stages.setdefault(key, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            totals['calls'] += 1
+            totals['wall_s'] += time.perf_counter() - wall
+            totals['cpu_s'] += time.process_time() - cpu
+            self.stack.pop()
+
+    def file(self, func, item, seconds, cpu_seconds):
+        self.latencies.append(seconds)
+        self.cpu_per_file += cpu_seconds
+        size = _file_size(item)
+        if size is not None:
+            self.bytes_in += size
+        if self.profile:
+            entry = (seconds, len(self.latencies), func, item)
+            if len(self.slowest) < self.profile:
+                heapq.heappush(self.slowest, entry)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def latency_summary(self):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+
+        def quantile(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+        histogram = {}
+        bucket = 0
+        for seconds in ordered:
+            while bucket < len(LATENCY_BUCKETS_MS) and seconds * 1000 > LATENCY_BUCKETS_MS[bucket]:
+                bucket += 1
+            label = f'<={LATENCY_BUCKETS_MS[bucket]}ms' if bucket < len(LATENCY_BUCKETS_MS) else f'>{LATENCY_BUCKETS_MS[-1]}ms'
+            histogram[label] = histogram.get(label, 0) + 1
+        return {
+            'files': len(ordered),
+            'total_s': round(sum(ordered), 4),
+            'cpu_s': round(self.cpu_per_file, 4),
+            'p50_ms': quantile(0.5),
+            'p90_ms': quantile(0.9),
+            'p99_ms': quantile(0.99),
+            'max_ms': round(ordered[-1] * 1000, 3),
+            'histogram': histogram,
+        }
+
+    def profile_slowest(self):
+        """
+        Re-run the slowest files one by one under cProfile and tracemalloc and
+        dump a .prof file plus a text summary next to the report.
+        """
+        base = os.path.splitext(self.report_path)[0]
+        profiles = []
+        for rank, (seconds, _, func, item) in enumerate(sorted(self.slowest, reverse=True), 1):
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            try:
+                profiler.runcall(func, item)
+            except Exception as e:
+                print(f"Error profiling {item}: {str(e)}")
+            snapshot = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            prof_path = f'{base}.slowest-{rank}.prof'
+            profiler.dump_stats(prof_path)
+            text = io.StringIO()
+            text.write(f"{item}: {seconds * 1000:.1f} ms in the run\n\n")
+            pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(25)
+            text.write("Top allocations:\n")
+            for stat in snapshot.statistics('lineno')[:15]:
+                text.write(f"  {stat}\n")
+            with open(f'{base}.slowest-{rank}.txt', 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+            profiles.append({'file': str(item), 'ms': round(seconds * 1000, 3), 'prof': prof_path,
+                             'traced_peak_kb': round(traced_peak / 1024, 1)})
+        return profiles
+
+    def report(self):
+        return {
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'started': self.started.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'wall_s': round(time.perf_counter() - self.wall_start, 4),
+            'cpu_s': round(time.process_time() - self.cpu_start, 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'peak_child_rss_mb': round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'counters': self.counters,
+            'stages': {name: {'calls': totals['calls'], 'wall_s': round(totals['wall_s'], 4),
+                              'cpu_s': round(totals['cpu_s'], 4)}
+                       for name, totals in self.stages.items()},
+            'file_latency': self.latency_summary(),
+        }
+
+    def finish(self):
+        report = self.report()
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.slowest:
+            report['profiles'] = self.profile_slowest()
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Run report saved to {self.report_path} ({report['wall_s']}s wall, "
+              f"{report['cpu_s']}s CPU, peak RSS {report['peak_rss_mb']} MB)")
+
+
+def start(script, report_path=None, profile=0):
+    """
+    Start collecting measurements for this process; the report is written
+    at exit.
+
+    Args:
+        script (str): Script name
+        report_path (str, optional): Report file. Defaults to <script>_report.json
+        profile (int): Number of slowest files to profile (0 disables profiling)
+    """
+    global _run
+    _run = Run(script, report_path or f'{script}_report.json', profile)
+    atexit.register(_run.finish)
+    return _run
+
+
+def add_arguments(parser):
+    """
+    Add --report and --profile to a script's argument parser.
+    """
+    parser.add_argument('--report', default=None,
+                        help="Write a JSON run report (stage timings, file latencies, bytes, peak RSS) here")
+    parser.add_argument('--profile', type=int, nargs='?', const=5, default=0, metavar='N',
+                        help="Profile the N slowest files (default 5) with cProfile and tracemalloc; implies --report")
+
+
+def start_from_args(script, args):
+    """
+    start() if --report or --profile was given.
+    """
+    if args.report or args.profile:
+        return start(script, args.report, args.profile)
+    return None
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a stage of the run (wall and CPU). Stages may nest; nested stages
+    are reported as 'outer/inner' and repeated stages accumulate.
+    """
+    if _run is None:
+        yield
+        return
+    with _run.stage(name):
+        yield
+
+
+def count(name, n=1):
+    if _run is not None:
+        _run.counters[name] = _run.counters.get(name, 0) + n
+
+
+def count_input(path):
+    """
+    Add the size of a file read outside parallel_map to the bytes read.
+    """
+    if _run is not None:
+        _run.bytes_in += _file_size(path) or 0
+
+
+def count_output(path):
+    """
+    Add the size of a written file to the bytes written.
+    """
+    if _run is not None:
+        _run.bytes_out += _file_size(path) or 0
+
+
+def record_file(func, item, seconds, cpu_seconds):
+    """
+    Record the parse of one file (called by parallel.parallel_map).
+    """
+    if _run is not None:
+        _run.file(func, item, seconds, cpu_seconds)
@@ -0,0 +1,187 @@
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def open_text(path, mode='r'):
+    """
+    Open a text file for reading or writing, compressing transparently when
+    the name ends in .zst (zstandard) or .gz (gzip).
+
+    Args:
+        path (str or Path): File path
+        mode (str): 'r', 'w' or 'a'
+
+    Returns:
+        A text file object
+    """
+    path = str(path)
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed; use a plain .jsonl or .jsonl.gz path")
+        raw = open(path, mode + 'b')
+        if mode == 'r':
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JsonlWriter:
+    """
+    Append records to a JSON Lines file, one compact JSON object per line.
+
+    Usage:
+        with JsonlWriter('games.jsonl.zst') as writer:
+            writer.write(record)
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.file = open_text(path, 'a' if append else 'w')
+        self.count = 0
+
+    def write(self, record):
+        if orjson is not None:
+            self.file.write(orjson.dumps(record).decode('utf-8'))
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+        self.file.write('\n')
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_jsonl(path):
+    """
+    Stream records from a JSON Lines file.
+
+    Yields:
+        dict: One record per non-empty line
+    """
+    with open_text(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+def collect_fields(records):
+    """
+    Schema pass: the union of keys across all records, in first-seen order.
+    """
+    fields = {}
+    for record in records:
+        for key in record:
+            fields[key] = None
+    return list(fields)
+
+
+def write_csv(records, csv_path, fieldnames):
+    """
+    Write records to CSV one row at a time.
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def jsonl_to_csv(jsonl_path, csv_path, leading=()):
+    """
+    Convert a JSON Lines file to CSV in bounded memory: one pass to collect
+    the column names, a second pass to stream the rows.
+
+    Args:
+        jsonl_path (str or Path): Input JSON Lines file
+        csv_path (str or Path): Output CSV file
+        leading (tuple): Columns to put first; the rest are sorted
+
+    Returns:
+        int: Number of rows written
+    """
+    fields = set(collect_fields(read_jsonl(jsonl_path)))
+    fieldnames = list(leading) + sorted(fields - set(leading))
+    return write_csv(read_jsonl(jsonl_path), csv_path, fieldnames)
+
+
+def jsonl_to_json(jsonl_path, json_path, indent=4):
+    """
+    Stream a JSON Lines file into a single JSON array without loading it.
+
+    Returns:
+        int: Number of records written
+    """
+    with open(json_path, 'w', encoding='utf-8') as f:
+        return write_json_array(read_jsonl(jsonl_path), f, indent=indent)
+
+
+def write_json_array(records, f, indent=4):
+    """
+    Write records to an open file as one JSON array, element by element.
+    The layout matches json.dump(records, f, indent=indent).
+
+    Returns:
+        int: Number of records written
+    """
+    pad = ' ' * indent
+    count = 0
+    f.write('[')
+    for record in records:
+        f.write(',\n' if count else '\n')
+        text = json.dumps(record, indent=indent, ensure_ascii=False)
+        f.write(pad + text.replace('\n', '\n' + pad))
+        count += 1
+    f.write('\n]' if count else ']')
+    return count
+
+
+def iter_records(source):
+    """
+    Stream raw records from a JSON Lines file (.jsonl, .jsonl.zst, .jsonl.gz),
+    a JSON array file, or a directory of per-game/per-provider JSON files.
+    """
+    source = Path(source)
+    if source.is_dir():
+        for json_file in sorted(source.glob('*.json')):
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            yield from data if isinstance(data, list) else [data]
+    elif '.jsonl' in source.name:
+        yield from read_jsonl(source)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data if isinstance(data, list) else [data]
@@ -0,0 +1,216 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import parsers
+from archive import ArchivePage, page_name
+from instrument import count
+from parallel import parallel_map
+
+CACHE_DIR = Path(__file__).parent / '.cache'
+
+
+def extractor_version(*extractors):
+    """
+    Fingerprint the source code of the given extractor functions (plus the
+    parser backends they run on), so editing any of them invalidates every
+    cached entry produced by the old code.
+
+    Args:
+        *extractors: Functions or modules whose source defines the output
+
+    Returns:
+        str: Short hex digest
+    """
+    digest = hashlib.sha1()
+    for obj in extractors + (parsers,):
+        digest.update(inspect.getsource(obj).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def file_digest(file_path):
+    """
+    Returns:
+        str: SHA-1 hex digest of the file's bytes
+    """
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    key TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime INTEGER,
+    sha1 TEXT,
+    version TEXT,
+    records TEXT
+);
+"""
+
+
+class Manifest:
+    """
+    Per-stage record of every input file's size, mtime and content hash,
+    together with the extractor version and the records it produced.
+
+    A file whose size and mtime are unchanged is trusted without reading it;
+    otherwise its hash decides whether the cached records are still valid.
+    Pages from a PageArchive carry their hash, which is compared directly.
+
+    Entries live in a small SQLite file and are written as each file is
+    parsed, so only the records of the file at hand are ever held in memory
+    and an interrupted run keeps what it already parsed.
+    """
+
+    def __init__(self, name, version, cache_dir=CACHE_DIR):
+        """
+        Args:
+            name (str): Stage name, used as the manifest file name
+            version (str): Current extractor version (see extractor_version)
+            cache_dir (Path): Directory holding manifest files
+        """
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.path = cache_dir / f'manifest_{name}.db'
+        self.version = version
+        # Files served from the cache by the last split()
+        self.hits = set()
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    @staticmethod
+    def key(file_path):
+        return page_name(file_path)
+
+    def is_current(self, file_path):
+        """
+        True if the file is unchanged since it was last parsed by the current
+        extractor version, so its cached records are still valid.
+        """
+        key = self.key(file_path)
+        entry = self.conn.execute('SELECT size, mtime, sha1, version FROM files WHERE key = ?', (key,)).fetchone()
+        if entry is None or entry[3] != self.version:
+            return False
+        size, mtime, sha1, _ = entry
+
+        if isinstance(file_path, ArchivePage):
+            return sha1 == file_path.sha1
+
+        stat = os.stat(file_path)
+        if size == stat.st_size and mtime == stat.st_mtime_ns:
+            return True
+
+        # Touched, rewritten or last seen in an archive: only the content decides
+        if size in (None, stat.st_size) and sha1 == file_digest(file_path):
+            self.conn.execute('UPDATE files SET size = ?, mtime = ? WHERE key = ?',
+                              (stat.st_size, stat.st_mtime_ns, key))
+            return True
+        return False
+
+    def records(self, file_path):
+        """
+        Returns:
+            The cached records of a file (check is_current first)
+        """
+        row = self.conn.execute('SELECT records FROM files WHERE key = ?', (self.key(file_path),)).fetchone()
+        return json.loads(row[0])
+
+    def lookup(self, file_path):
+        """
+        Return the cached records for a file if it is unchanged since it was
+        last parsed by the current extractor version.
+
+        Returns:
+            tuple: (hit, records). records is only meaningful when hit is True
+        """
+        if self.is_current(file_path):
+            return True, self.records(file_path)
+        return False, None
+
+    def update(self, file_path, records):
+        """
+        Record freshly extracted records for a file.
+        """
+        if isinstance(file_path, ArchivePage):
+            size, mtime, sha1 = None, None, file_path.sha1
+        else:
+            stat = os.stat(file_path)
+            size, mtime, sha1 = stat.st_size, stat.st_mtime_ns, file_digest(file_path)
+        self.conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)',
+                          (self.key(file_path), size, mtime, sha1, self.version,
+                           json.dumps(records, ensure_ascii=False)))
+
+    def split(self, file_paths):
+        """
+        Partition input files into those with valid cached records and those
+        that need parsing, without loading any records.
+
+        Returns:
+            tuple: (cached, stale) lists of file paths, in input order
+        """
+        cached = []
+        stale = []
+        for file_path in file_paths:
+            (cached if self.is_current(file_path) else stale).append(file_path)
+        return cached, stale
+
+    def prune(self, file_paths):
+        """
+        Drop entries for files that no longer exist in the input set.
+        """
+        keep = {self.key(file_path) for file_path in file_paths}
+        gone = [(key,) for key, in self.conn.execute('SELECT key FROM files') if key not in keep]
+        self.conn.executemany('DELETE FROM files WHERE key = ?', gone)
+
+    def close(self):
+        self.conn.close()
+
+
+def incremental_map(func, file_paths, manifest=None, workers=1):
+    """
+    Like parallel.parallel_map, but only files that are new or changed since
+    the last run are parsed; the rest reuse the records in the manifest.
+
+    Results stream out in input order: a cached file is yielded as soon as
+    the files before it are, and a parsed one as soon as the pool returns
+    it, when its records are also written to the manifest. Nothing is
+    buffered beyond what parallel_map holds.
+
+    Args:
+        func (callable): Picklable function taking a file path and returning records
+        file_paths (list): Input files, in output order
+        manifest (Manifest, optional): Cache to consult. None parses everything
+        workers (int): Number of parser processes for the stale files
+
+    Yields:
+        tuple: (file_path, records, error) in input order
+    """
+    file_paths = list(file_paths)
+    if manifest is None:
+        yield from parallel_map(func, file_paths, workers=workers)
+        return
+
+    cached, stale = manifest.split(file_paths)
+    manifest.hits = set(cached)
+    print(f"{len(cached)} files unchanged, {len(stale)} to parse")
+    count('files_cached', len(cached))
+    manifest.prune(file_paths)
+
+    parsed = parallel_map(func, stale, workers=workers)
+    for file_path in file_paths:
+        if file_path in manifest.hits:
+            yield file_path, manifest.records(file_path), None
+            continue
+        file_path, records, error = next(parsed)
+        if error is None:
+            manifest.update(file_path, records)
+        yield file_path, records, error
@@ -0,0 +1,178 @@
+import json
+import re
+from datetime import datetime
+
+# Page labels (lower-cased) mapped to catalog columns. Card records from
+# games.extract_game_data and detail records from game_detail.extract_game_data
+# use different wording for the same attribute.
+LABELS = {
+    'rtp': 'rtp',
+    'max win': 'max_win',
+    'max. win': 'max_win',
+    'max win (x bet)': 'max_win',
+    'volatility': 'volatility',
+    'variance': 'volatility',
+    'min bet': 'min_bet',
+    'max bet': 'max_bet',
+    'hit frequency': 'hit_frequency',
+    'hit rate': 'hit_frequency',
+    'reels': 'reels',
+    'rows': 'rows',
+    'layout': 'layout',
+    'lines': 'lines',
+    'paylines': 'lines',
+    'betways': 'lines',
+    'bet ways': 'lines',
+    'ways': 'lines',
+    'release date': 'release_date',
+    'release': 'release_date',
+    'provider': 'provider',
+    'theme': 'themes',
+    'themes': 'themes',
+    'feature': 'features',
+    'features': 'features',
+}
+
+# Ordinal volatility scale; anything else (N/A, ADJUSTED) is null
+VOLATILITY = {
+    'LOW': 1,
+    'LOW-MED': 2,
+    'MED': 3,
+    'MEDIUM': 3,
+    'MED-HIGH': 4,
+    'MEDIUM-HIGH': 4,
+    'HIGH': 5,
+    'VERY HIGH': 6,
+}
+
+# Catalog columns, in output order
+COLUMNS = (
+    'url', 'name', 'title', 'provider', 'rtp', 'max_win', 'volatility', 'volatility_label',
+    'min_bet', 'max_bet', 'hit_frequency', 'reels', 'rows', 'lines', 'release_date',
+    'themes', 'features', 'thumbnail', 'attributes', 'cluster_id',
+)
+
+NUMBER = re.compile(r'\d+(?:\.\d+)?')
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y-%m', '%Y', '%B %d, %Y', '%d %B %Y')
+
+
+def parse_number(value):
+    """
+    First number in a label value: "96.5%" -> 96.5, "5000x Bet" -> 5000.0,
+    "x5000" -> 5000.0. Returns None for "N/A", "%" and other non-numeric values.
+    For ranges like "94% - 96%" the first figure is taken.
+    """
+    if value is None:
+        return None
+    match = NUMBER.search(str(value).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def parse_int(value):
+    number = parse_number(value)
+    return int(number) if number is not None else None
+
+
+def parse_date(value):
+    if not value:
+        return None
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_volatility(value):
+    """
+    Returns:
+        tuple: (ordinal or None, upper-cased label or None)
+    """
+    if not value or str(value).strip().upper() in ('N/A', ''):
+        return None, None
+    label = str(value).strip().upper()
+    return VOLATILITY.get(label), label
+
+
+def parse_list(value):
+    if not value:
+        return []
+    return [item.strip() for item in re.split(r'[,;]', str(value)) if item.strip()]
+
+
+def parse_layout(value):
+    """
+    "5-3", "5x3" or "5 x 3" -> (5, 3)
+    """
+    numbers = NUMBER.findall(str(value or ''))
+    if len(numbers) >= 2:
+        return int(float(numbers[0])), int(float(numbers[1]))
+    return None, None
+
+
+def normalize_record(record):
+    """
+    Convert one raw game record (card or detail page) to typed catalog columns.
+    Labels without a catalog column are kept as strings in 'attributes'.
+
+    Args:
+        record (dict): Raw record with page labels as keys
+
+    Returns:
+        dict: Row with one value per column in COLUMNS
+    """
+    row = {column: None for column in COLUMNS}
+    row['themes'] = []
+    row['features'] = []
+    attributes = {}
+
+    for key, value in record.items():
+        if key in ('url', 'name', 'title', 'thumbnail'):
+            row[key] = value
+            continue
+        column = LABELS.get(key.strip().lower().replace('_', ' '))
+        if column is None:
+            if value not in (None, ''):
+                attributes[key] = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+        elif column in ('rtp', 'max_win', 'min_bet', 'max_bet', 'hit_frequency'):
+            row[column] = parse_number(value)
+        elif column in ('reels', 'rows', 'lines'):
+            row[column] = parse_int(value)
+        elif column == 'layout':
+            reels, rows = parse_layout(value)
+            row['reels'] = row['reels'] or reels
+            row['rows'] = row['rows'] or rows
+        elif column == 'volatility':
+            row['volatility'], row['volatility_label'] = parse_volatility(value)
+        elif column == 'release_date':
+            row['release_date'] = parse_date(value)
+        elif column in ('themes', 'features'):
+            row[column] = parse_list(value)
+        elif column == 'provider':
+            row['provider'] = value.get('text') if isinstance(value, dict) else value
+
+    row['attributes'] = list(attributes.items())
+    return row
+
+
+def merge_rows(base, override):
+    """
+    Combine two rows for the same game; non-empty values in `override` win.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        if key == 'attributes':
+            merged[key] = list({**dict(base.get(key) or []), **dict(value or [])}.items())
+        elif value not in (None, [], ''):
+            merged[key] = value
+    return merged
+
+
+def provider_key(name):
+    """
+    Join key for provider names, which appear as "Pragmatic Play" (rankings),
+    "Pragmatic-Play" (games_data file names) and "Pragmatic_Play" (details).
+    """
+    return re.sub(r'[^a-z0-9]', '', str(name or '').lower())
@@ -0,0 +1,79 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from instrument import record_file
+
+
+def _call(func, item):
+    """
+    Run func(item) and return (result, error, wall seconds, CPU seconds) so
+    one bad file never aborts the whole pool map.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        result, error = func(item), None
+    except Exception as e:
+        result, error = None, str(e)
+    return result, error, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def default_workers():
+    """
+    Number of worker processes to use when --workers is 0.
+    """
+    return os.cpu_count() or 1
+
+
+def parallel_map(func, items, workers=1, chunksize=None):
+    """
+    Apply `func` to every item, optionally across a process pool, and stream
+    the results back in input order.
+
+    Args:
+        func (callable): Module-level (picklable) function taking one item
+        items (iterable): Items to process, e.g. file paths
+        workers (int): Number of worker processes. 1 runs in-process, 0 uses all cores
+        chunksize (int, optional): Items sent to a worker at a time. Defaults to
+            splitting the input into about four chunks per worker
+
+    Yields:
+        tuple: (item, result, error) where error is None on success and the
+        error message otherwise
+    """
+    items = list(items)
+    if workers == 0:
+        workers = default_workers()
+
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            result, error, seconds, cpu_seconds = _call(func, item)
+            record_file(func, item, seconds, cpu_seconds)
+            yield item, result, error
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        outcomes = executor.map(partial(_call, func), items, chunksize=chunksize)
+        for item, (result, error, seconds, cpu_seconds) in zip(items, outcomes):
+            record_file(func, item, seconds, cpu_seconds)
+            yield item, result, error
+
+
+def print_error_summary(errors, label='files'):
+    """
+    Print the per-item errors gathered during a run.
+
+    Args:
+        errors (list): (item, message) pairs
+        label (str): What the items are, used in the summary line
+    """
+    if not errors:
+        return
+    print(f"{len(errors)} {label} failed:")
+    for item, message in errors:
+        name = getattr(item, 'name', None) or os.path.basename(str(item))
+        print(f"  {name}: {message}")
@@ -0,0 +1,278 @@
+import os
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+# Fastest first, as measured by bench.py on the checked-in corpus: lxml is
+# about 1.5x faster than selectolax there, and both are over 10x faster than
+# bs4. The extractors only use a small subset of the BeautifulSoup API (find,
+# find_all, text, get_text, get, attrs, [attr]); the lxml and selectolax
+# backends wrap their native trees in that same subset, while the bs4
+# backend returns the soup itself.
+BACKENDS = ('lxml', 'selectolax', 'bs4')
+
+# bs4 leaves the contents of these tags out of .text, so the C backends drop
+# them from the tree before any text is read.
+IGNORED_TAGS = ('script', 'style', 'template')
+
+# Opening tag of a game card: any <div> whose class list includes slotCard,
+# the same divs find_all('div', class_='slotCard') matches. Pages are cut
+# into cards and cards counted on this pattern without building a tree.
+SLOT_CARD_PATTERN = r"""<(?i:div)\b[^>]*?\s(?i:class)\s*=\s*(["'])(?:[^"'>]*\s)?slotCard(?:\s[^"'>]*)?\1"""
+SLOT_CARD_TAG = re.compile(SLOT_CARD_PATTERN)
+
+
+def available_backends():
+    """
+    Returns:
+        list: Backend names that can be used in this environment, fastest first
+    """
+    installed = {'lxml': lxml is not None, 'selectolax': LexborHTMLParser is not None, 'bs4': True}
+    return [backend for backend in BACKENDS if installed[backend]]
+
+
+def default_backend():
+    """
+    Backend used when none is given: $SLOTCATALOG_PARSER if set, otherwise
+    the fastest one installed.
+    """
+    backend = os.environ.get('SLOTCATALOG_PARSER')
+    if backend:
+        return resolve_backend(backend)
+    return available_backends()[0]
+
+
+def resolve_backend(backend=None):
+    """
+    Validate a backend name, falling back to bs4 when the requested C parser
+    is not installed.
+    """
+    if backend is None:
+        return default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    if backend not in available_backends():
+        return 'bs4'
+    return backend
+
+
+def parse_html(html_content, backend=None):
+    """
+    Parse an HTML document with the chosen backend.
+
+    Args:
+        html_content (str): HTML to parse
+        backend (str, optional): 'lxml', 'selectolax' or 'bs4'. Defaults to default_backend()
+
+    Returns:
+        A document supporting the BeautifulSoup subset used by the extractors
+    """
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        tree = LexborHTMLParser(html_content)
+        tree.strip_tags(list(IGNORED_TAGS))
+        return LexborNode(tree.root) if tree.root is not None else EmptyNode()
+    if backend == 'lxml':
+        if not html_content.strip():
+            return EmptyNode()
+        root = lxml.html.document_fromstring(html_content)
+        etree.strip_elements(root, *IGNORED_TAGS, with_tail=False)
+        return LxmlNode(root)
+    return BeautifulSoup(html_content, 'html.parser')
+
+
+def _css_selector(name, attrs, class_, id):
+    selector = name or '*'
+    if class_:
+        selector += '.' + class_
+    if id:
+        selector += '#' + id
+    for key, value in (attrs or {}).items():
+        selector += f'[{key}="{value}"]'
+    return selector
+
+
+@lru_cache(maxsize=None)
+def _xpath(name, attrs, class_, id):
+    conditions = []
+    if class_:
+        conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {class_} ')")
+    if id:
+        conditions.append(f"@id='{id}'")
+    for key, value in attrs:
+        conditions.append(f"@{key}='{value}'")
+    predicate = f"[{' and '.join(conditions)}]" if conditions else ''
+    return etree.XPath(f".//{name or '*'}{predicate}")
+
+
+class EmptyNode:
+    """
+    Stand-in document for empty input: finds nothing and has no text.
+    """
+    attrs = {}
+    text = ''
+
+    def find(self, name=None, attrs=None, class_=None, id=None):
+        return None
+
+    def find_all(self, name=None, attrs=None, class_=None, id=None):
+        return []
+
+    def get_text(self):
+        return ''
+
+    def get(self, key, default=None):
+        return default
+
+
+class LexborNode:
+    """
+    selectolax (lexbor) node exposing the BeautifulSoup subset.
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def find_all(self, name=None, attrs=None, class_=None, id=None):
+        # css() also matches the node itself; BeautifulSoup only searches descendants
+        selector = _css_selector(name, attrs, class_, id)
+        return [LexborNode(match) for match in self.node.css(selector) if match != self.node]
+
+    def find(self, name=None, attrs=None, class_=None, id=None):
+        selector = _css_selector(name, attrs, class_, id)
+        for match in self.node.css(selector):
+            if match != self.node:
+                return LexborNode(match)
+        return None
+
+    @property
+    def text(self):
+        return self.node.text(deep=True)
+
+    def get_text(self):
+        return self.node.text(deep=True)
+
+    @property
+    def attrs(self):
+        return self.node.attributes
+
+    def get(self, key, default=None):
+        attributes = self.node.attributes
+        if key not in attributes:
+            return default
+        # Valueless attributes come back as None; bs4 reports them as ''
+        return attributes[key] or ''
+
+    def __getitem__(self, key):
+        return self.node.attributes[key]
+
+
+class LxmlNode:
+    """
+    lxml.html element exposing the BeautifulSoup subset.
+    """
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def find_all(self, name=None, attrs=None, class_=None, id=None):
+        xpath = _xpath(name, tuple(sorted((attrs or {}).items())), class_, id)
+        return [LxmlNode(match) for match in xpath(self.element)]
+
+    def find(self, name=None, attrs=None, class_=None, id=None):
+        xpath = _xpath(name, tuple(sorted((attrs or {}).items())), class_, id)
+        for match in xpath(self.element):
+            return LxmlNode(match)
+        return None
+
+    @property
+    def text(self):
+        return self.element.text_content()
+
+    def get_text(self):
+        return self.element.text_content()
+
+    @property
+    def attrs(self):
+        return self.element.attrib
+
+    def get(self, key, default=None):
+        return self.element.get(key, default)
+
+    def __getitem__(self, key):
+        return self.element.attrib[key]
+
+
+def check_parity(html_files, backends=None):
+    """
+    Run every extractor over the given files with each backend and report any
+    file whose records differ from the bs4 reference.
+
+    Args:
+        html_files (list): Paths of HTML files to check
+        backends (list, optional): Backends to compare against bs4. Defaults to all available
+
+    Returns:
+        list: (backend, file_path, extractor) triples that did not match
+    """
+    import best
+    import detail
+    import games
+
+    backends = [b for b in (backends or available_backends()) if b != 'bs4']
+    mismatches = []
+
+    def extract(file_path, html_content, backend):
+        records = {
+            'provider': detail.parse_provider_file(file_path, backend=backend),
+            'provider_games': games.extract_game_data(html_content, backend=backend),
+            'best_slots': best.extract_games_from_html(parse_html(html_content, backend)),
+        }
+        if os.path.basename(file_path).startswith('best_slots'):
+            records['countries'] = best.extract_countries_from_html(file_path, backend=backend)
+        return records
+
+    for file_path in html_files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        reference = extract(file_path, html_content, 'bs4')
+        for backend in backends:
+            records = extract(file_path, html_content, backend)
+            for extractor, expected in reference.items():
+                if records[extractor] != expected:
+                    mismatches.append((backend, file_path, extractor))
+    return mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Check that all parser backends extract identical records")
+    parser.add_argument('files', nargs='*', help="HTML files to check (defaults to details/*.html and games_data/best_slots.html)")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    html_files = args.files or sorted(glob.glob(os.path.join(base_dir, 'details', '*.html'))) + [
+        os.path.join(base_dir, 'games_data', 'best_slots.html')]
+
+    print(f"Backends available: {', '.join(available_backends())}")
+    mismatches = check_parity(html_files)
+    for backend, file_path, extractor in mismatches:
+        print(f"MISMATCH [{backend}] {extractor}: {os.path.basename(file_path)}")
+    print(f"Checked {len(html_files)} files: {len(mismatches)} mismatches")
+    raise SystemExit(1 if mismatches else 0)
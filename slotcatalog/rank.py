@@ -1,10 +1,18 @@
+import argparse
 import json
 import os
 
-def extract_game_info():
+import instrument
+from instrument import count, count_input, count_output, stage
+
+def extract_game_info(catalog_path=None):
     """
     Extract name and image_url from all games in the all_games_by_country.json file
     and output two JSON files: one with name and image_url, and another with just names.
+    
+    Args:
+        catalog_path (str, optional): Typed game catalog (see catalog.py). When given,
+            each simplified game also carries its provider, RTP and volatility.
     """
     # Path to the input file
     input_file = 'slotcatalog/all_games_by_country.json'
@@ -20,8 +28,19 @@ def extract_game_info():
     
     try:
         # Read the input JSON file
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with stage('load'), open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
+        count_input(input_file)
+        
+        # Typed attributes by game name, read straight from the catalog
+        catalog_by_name = {}
+        if catalog_path:
+            from catalog import load_catalog
+            with stage('load_catalog'):
+                catalog = load_catalog(catalog_path, columns=['name', 'provider', 'rtp', 'volatility'])
+                catalog = catalog.drop_duplicates('name').set_index('name')
+                catalog_by_name = catalog.astype(object).where(catalog.notna(), None).to_dict(orient='index')
+            count_input(catalog_path)
         
         # Create dictionaries to store the simplified data
         simplified_data = {}
@@ -38,18 +57,23 @@ def extract_game_info():
                     "name": game.get("name", ""),
                     "image_url": game.get("image_url", "")
                 }
+                simplified_game.update(catalog_by_name.get(simplified_game["name"], {}))
                 simplified_data[country].append(simplified_game)
                 
                 # Extract only name for names-only data
                 names_only_data[country].append(game.get("name", ""))
+            count('records', len(games))
         
-        # Write the simplified data to the output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(simplified_data, f, indent=4, ensure_ascii=False)
-        
-        # Write the names-only data to the second output file
-        with open(names_only_file, 'w', encoding='utf-8') as f:
-            json.dump(names_only_data, f, indent=4, ensure_ascii=False)
+        with stage('write_json'):
+            # Write the simplified data to the output file
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(simplified_data, f, indent=4, ensure_ascii=False)
+            
+            # Write the names-only data to the second output file
+            with open(names_only_file, 'w', encoding='utf-8') as f:
+                json.dump(names_only_data, f, indent=4, ensure_ascii=False)
+        count_output(output_file)
+        count_output(names_only_file)
         
         print(f"Successfully extracted game info to {output_file}")
         print(f"Successfully extracted game names to {names_only_file}")
@@ -75,21 +99,11 @@ def unique_rank():
         # Dictionary to store unique rankings
         unique_rankings = {}
         
-        # Convert each country's game list to a tuple for hashability
+        # Convert each country's game list to a tuple for hashability, so
+        # identical rankings land on the same dict key in one lookup
+        # (see rankings.py for near-duplicate and similarity analysis)
         for country, games in data.items():
-            games_tuple = tuple(games)
-            
-            # Check if this game list already exists
-            found = False
-            for existing_key, existing_countries in unique_rankings.items():
-                if games_tuple == existing_key:
-                    existing_countries.append(country)
-                    found = True
-                    break
-            
-            # If not found, add as a new unique ranking
-            if not found:
-                unique_rankings[games_tuple] = [country]
+            unique_rankings.setdefault(tuple(games), []).append(country)
         
         # Print the results
         print(f"Number of unique rankings: {len(unique_rankings)}")
@@ -108,4 +122,11 @@ def unique_rank():
     
 
 if __name__ == "__main__":
-    extract_game_info()
+    parser = argparse.ArgumentParser(description="Extract simplified game lists from all_games_by_country.json")
+    parser.add_argument('--catalog', default='slotcatalog/games_catalog.parquet',
+                        help="Typed game catalog written by catalog.py")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('rank', args)
+    # Join the typed catalog when it has been built
+    extract_game_info(catalog_path=args.catalog if os.path.exists(args.catalog) else None)
@@ -0,0 +1,259 @@
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Rank given to games a country does not list: tied below everything it does
+UNRANKED = np.iinfo(np.int32).max
+
+# Size of the block of order signs kendall_tau builds at a time
+TAU_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def game_key(game):
+    """
+    Identity of a ranked game: its URL when present, otherwise its name.
+    """
+    return game.get('game_url') or game.get('name')
+
+
+def load_rankings(json_file_path):
+    """
+    Load {country: [game, ...]} as written by best.py.
+    """
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def encode_rankings(rankings):
+    """
+    Encode every country's ranking as a row of integer game ids over one
+    shared vocabulary.
+
+    Args:
+        rankings (dict): {country: [game dict or game name, ...]} in rank order.
+            Keys may be any label, e.g. "AR@2026-10-18" for daily snapshots
+
+    Returns:
+        tuple: (countries, vocabulary, ids) where ids is an int32 array of
+        shape (countries, longest ranking) padded with -1
+    """
+    countries = list(rankings)
+    vocabulary = {}
+    rows = []
+    for country in countries:
+        row = []
+        for game in rankings[country]:
+            key = game_key(game) if isinstance(game, dict) else game
+            row.append(vocabulary.setdefault(key, len(vocabulary)))
+        rows.append(row)
+
+    width = max((len(row) for row in rows), default=0)
+    ids = np.full((len(rows), width), -1, dtype=np.int32)
+    for i, row in enumerate(rows):
+        ids[i, :len(row)] = row
+    return countries, list(vocabulary), ids
+
+
+def rank_matrix(ids, vocabulary_size):
+    """
+    Position of every game in every country (1-based), UNRANKED when absent.
+
+    Returns:
+        numpy.ndarray: int32 array of shape (countries, games)
+    """
+    ranks = np.full((ids.shape[0], vocabulary_size), UNRANKED, dtype=np.int32)
+    rows, positions = np.nonzero(ids >= 0)
+    # If a game is listed twice keep its best position
+    order = np.argsort(-positions, kind='stable')
+    ranks[rows[order], ids[rows, positions][order]] = positions[order] + 1
+    return ranks
+
+
+def duplicate_groups(countries, ids):
+    """
+    Group countries whose rankings are exactly identical, by hashing each
+    encoded row once instead of comparing every pair.
+
+    Returns:
+        list: Lists of countries sharing a ranking, largest group first
+    """
+    groups = {}
+    for country, row in zip(countries, ids):
+        groups.setdefault(row.tobytes(), []).append(country)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def topk_overlap(ids, vocabulary_size, k=10):
+    """
+    Share of top-k games two countries have in common, for every pair,
+    relative to the shorter of the two lists when one has fewer than k games.
+
+    Returns:
+        numpy.ndarray: float32 array of shape (countries, countries) in [0, 1]
+    """
+    top = ids[:, :k]
+    membership = np.zeros((ids.shape[0], vocabulary_size), dtype=np.float32)
+    rows, cols = np.nonzero(top >= 0)
+    membership[rows, top[rows, cols]] = 1
+    lengths = membership.sum(axis=1)
+    shorter = np.minimum.outer(lengths, lengths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(shorter > 0, (membership @ membership.T) / shorter, np.float32(0)).astype(np.float32)
+
+
+def kendall_tau(ranks, block=None):
+    """
+    Pairwise Kendall tau-b between all countries over the shared vocabulary,
+    with unlisted games tied at the bottom.
+
+    Each country's ranking becomes a vector of pairwise order signs; the
+    concordant-minus-discordant count for every pair of countries is then one
+    matrix product, accumulated over blocks of game pairs to bound memory.
+
+    Args:
+        ranks (numpy.ndarray): Output of rank_matrix
+        block (int, optional): Games per block; memory is O(countries * block * games).
+            Defaults to what keeps a block of signs within TAU_BLOCK_BYTES
+
+    Returns:
+        numpy.ndarray: float64 array of shape (countries, countries) in [-1, 1]
+    """
+    n_countries, n_games = ranks.shape
+    # Only games listed somewhere can be ordered
+    ranks = ranks[:, (ranks != UNRANKED).any(axis=0)].astype(np.float32)
+    n_games = ranks.shape[1]
+    if block is None:
+        block = max(1, TAU_BLOCK_BYTES // (4 * max(1, n_countries * n_games)))
+    numerator = np.zeros((n_countries, n_countries), dtype=np.float64)
+    untied = np.zeros(n_countries, dtype=np.float64)
+
+    for start in range(0, n_games - 1, block):
+        stop = min(start + block, n_games - 1)
+        # Signs for pairs (i, j) with i in this block and j > i, written in place
+        widths = n_games - 1 - np.arange(start, stop)
+        signs = np.empty((n_countries, int(widths.sum())), dtype=np.float32)
+        offset = 0
+        for i, width in zip(range(start, stop), widths.tolist()):
+            out = signs[:, offset:offset + width]
+            np.subtract(ranks[:, i:i + 1], ranks[:, i + 1:], out=out)
+            np.sign(out, out=out)
+            offset += width
+        numerator += signs @ signs.T
+        untied += np.count_nonzero(signs, axis=1)
+
+    denominator = np.sqrt(np.outer(untied, untied))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = np.where(denominator > 0, numerator / denominator, 0.0)
+    np.fill_diagonal(tau, 1.0)
+    return tau
+
+
+def cluster_regions(similarity, threshold=0.5):
+    """
+    Average-linkage agglomerative clustering of countries into ranking regions.
+    Clusters are merged while their mean pairwise similarity is at least
+    `threshold`.
+
+    Args:
+        similarity (numpy.ndarray): Symmetric (countries, countries) similarity matrix
+        threshold (float): Minimum average similarity to merge two clusters
+
+    Returns:
+        numpy.ndarray: Region label per country (0 = largest region)
+    """
+    n = similarity.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int32)
+    sums = similarity.astype(np.float64).copy()
+    sizes = np.ones(n, dtype=np.float64)
+    active = np.ones(n, dtype=bool)
+    labels = np.arange(n)
+
+    while active.sum() > 1:
+        average = sums / np.outer(sizes, sizes)
+        np.fill_diagonal(average, -np.inf)
+        average[~active, :] = -np.inf
+        average[:, ~active] = -np.inf
+        a, b = np.unravel_index(np.argmax(average), average.shape)
+        if average[a, b] < threshold:
+            break
+        # Merge b into a; summed similarities make average linkage exact
+        sums[a, :] += sums[b, :]
+        sums[:, a] += sums[:, b]
+        sizes[a] += sizes[b]
+        active[b] = False
+        labels[labels == b] = a
+
+    # Renumber so region 0 is the largest
+    unique, counts = np.unique(labels, return_counts=True)
+    order = unique[np.argsort(-counts, kind='stable')]
+    remap = {old: new for new, old in enumerate(order)}
+    return np.array([remap[label] for label in labels], dtype=np.int32)
+
+
+def analyze(rankings, k=10, threshold=0.5, metric='tau'):
+    """
+    Run the full analysis over a {country: ranking} mapping.
+
+    Args:
+        rankings (dict): {country: [game, ...]}
+        k (int): Depth for the top-k overlap matrix
+        threshold (float): Similarity needed to join a region
+        metric (str): 'tau' or 'overlap', the similarity used for regions
+
+    Returns:
+        dict: countries, duplicate groups, tau and overlap matrices, region labels
+    """
+    countries, vocabulary, ids = encode_rankings(rankings)
+    ranks = rank_matrix(ids, len(vocabulary))
+    tau = kendall_tau(ranks)
+    overlap = topk_overlap(ids, len(vocabulary), k)
+    regions = cluster_regions(tau if metric == 'tau' else overlap, threshold)
+    return {
+        'countries': countries,
+        'vocabulary': vocabulary,
+        'duplicates': duplicate_groups(countries, ids),
+        'tau': tau,
+        'overlap': overlap,
+        'regions': regions,
+    }
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Compare per-country best-slot rankings")
+    parser.add_argument('input', nargs='?', default=str(base_dir / 'games_data' / 'all_games_by_country.json'),
+                        help="Rankings JSON written by best.py")
+    parser.add_argument('-k', '--top-k', type=int, default=10, help="Depth for top-k overlap")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Similarity needed to join a region")
+    parser.add_argument('--metric', choices=('tau', 'overlap'), default='tau', help="Similarity used for regions")
+    parser.add_argument('-o', '--output', default=None, help="Write the analysis to this JSON file")
+    args = parser.parse_args()
+
+    result = analyze(load_rankings(args.input), k=args.top_k, threshold=args.threshold, metric=args.metric)
+    countries = result['countries']
+
+    print(f"Number of unique rankings: {len(result['duplicates'])}")
+    for i, group in enumerate(result['duplicates'], 1):
+        if len(group) > 1:
+            print(f"Ranking {i} shared by {len(group)} countries: {', '.join(group)}")
+
+    regions = {}
+    for country, region in zip(countries, result['regions']):
+        regions.setdefault(int(region), []).append(country)
+    print(f"\n{len(regions)} ranking regions (threshold {args.threshold}, {args.metric}):")
+    for region, members in regions.items():
+        print(f"Region {region} ({len(members)} countries): {', '.join(members)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'countries': countries,
+                'duplicates': result['duplicates'],
+                'regions': {str(region): members for region, members in regions.items()},
+                'kendall_tau': np.round(result['tau'], 4).tolist(),
+                f'top_{args.top_k}_overlap': np.round(result['overlap'], 4).tolist(),
+            }, f, ensure_ascii=False)
+        print(f"Analysis saved to {args.output}")
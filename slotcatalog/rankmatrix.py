@@ -0,0 +1,241 @@
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ranks are stored as int16 with 0 meaning "not listed in this country"
+UNLISTED = 0
+
+
+class RankMatrix:
+    """
+    Games x countries matrix of list positions, with the provider and
+    SlotRank of every game as side columns.
+
+    Games and countries are mapped to integer ids once; the positions are
+    kept both as a dense int16 matrix (a few MB even for thousands of games
+    and hundreds of countries) and as the COO triplets it was filled from.
+    """
+
+    def __init__(self, games, countries, game_index, country_index, positions, providers, slotranks):
+        """
+        Args:
+            games (list): Game names, indexed by game id
+            countries (list): Country codes, indexed by country id
+            game_index (numpy.ndarray): Game id of every listing
+            country_index (numpy.ndarray): Country id of every listing
+            positions (numpy.ndarray): 1-based position of every listing
+            providers (list): Provider per game id (None if unknown)
+            slotranks (numpy.ndarray): SlotRank per game id (-1 if unknown)
+        """
+        self.games = games
+        self.countries = countries
+        self.game_index = game_index
+        self.country_index = country_index
+        self.positions = positions
+        self.providers = providers
+        self.slotranks = slotranks
+        self.ranks = np.zeros((len(games), len(countries)), dtype=np.int16)
+        # A game listed twice in one country keeps its later position
+        self.ranks[game_index, country_index] = positions
+
+    @property
+    def listed(self):
+        return self.ranks != UNLISTED
+
+    def mean_rank(self):
+        """
+        Returns:
+            numpy.ndarray: Mean position per game over the countries listing it (NaN if none)
+        """
+        counts = self.listed.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, self.ranks.sum(axis=1, dtype=np.int64) / counts, np.nan)
+
+    def country_count(self):
+        """
+        Returns:
+            numpy.ndarray: Number of countries listing each game
+        """
+        return self.listed.sum(axis=1)
+
+    def top_n_count(self, n=10):
+        """
+        Returns:
+            numpy.ndarray: Number of countries where each game is in the top `n`
+        """
+        return (self.listed & (self.ranks <= n)).sum(axis=1)
+
+    def region_top(self, regions, n=10):
+        """
+        Top `n` games of every region: the games with the best mean position
+        over the region's countries, counting unlisted as one past the bottom.
+
+        Args:
+            regions (dict or sequence): {country: region} or a region label per country
+            n (int): Games per region
+
+        Returns:
+            dict: {region: [(game, mean position), ...]} best first; empty for
+            regions whose countries list no games
+        """
+        if isinstance(regions, dict):
+            labels = np.array([regions.get(country) for country in self.countries], dtype=object)
+        else:
+            labels = np.asarray(regions, dtype=object)
+        floor = int(self.ranks.max(initial=0)) + 1
+        penalized = np.where(self.listed, self.ranks, floor).astype(np.float32)
+
+        result = {}
+        for region in dict.fromkeys(labels.tolist()):
+            if region is None:
+                continue
+            columns = labels == region
+            # With nothing listed every game would tie at the floor
+            if not self.listed[:, columns].any():
+                result[region] = []
+                continue
+            scores = penalized[:, columns].mean(axis=1)
+            k = min(n, len(scores))
+            if k == 0:
+                result[region] = []
+                continue
+            best = np.argpartition(scores, k - 1)[:k]
+            best = best[np.argsort(scores[best], kind='stable')]
+            result[region] = [(self.games[i], round(float(scores[i]), 2)) for i in best]
+        return result
+
+    def summary(self, n=10):
+        """
+        Per-game aggregates, computed column-wise over the whole matrix.
+
+        Returns:
+            pandas.DataFrame: Game Name, provider, SlotRank, countries listing the
+            game, mean rank, best rank and top-`n` country count, by mean rank
+        """
+        best = np.where(self.listed, self.ranks, np.iinfo(np.int16).max).min(axis=1, initial=np.iinfo(np.int16).max)
+        frame = pd.DataFrame({
+            'Game Name': self.games,
+            'provider': self.providers,
+            'SlotRank': pd.array(self.slotranks, dtype='Int16'),
+            'countries': self.country_count(),
+            'mean_rank': np.round(self.mean_rank(), 2),
+            'best_rank': pd.array(best, dtype='Int16'),
+            f'top_{n}_countries': self.top_n_count(n),
+        })
+        frame['SlotRank'] = frame['SlotRank'].mask(self.slotranks < 0)
+        frame['best_rank'] = frame['best_rank'].mask(frame['countries'] == 0)
+        return frame.sort_values(['mean_rank', 'Game Name'], kind='stable').reset_index(drop=True)
+
+    def to_frame(self):
+        """
+        Returns:
+            pandas.DataFrame: 'Game Name', 'provider', 'SlotRank', then one
+            nullable Int16 column per country listing at least one game
+        """
+        # Countries without a single listed game had no column in the old CSV
+        has_games = self.listed.any(axis=0)
+        countries = [country for country, keep in zip(self.countries, has_games) if keep]
+        ranks = pd.DataFrame(self.ranks[:, has_games], columns=countries).astype('Int16')
+        ranks = ranks.mask(ranks == UNLISTED)
+        side = pd.DataFrame({
+            'Game Name': self.games,
+            'provider': self.providers,
+            'SlotRank': pd.array(np.where(self.slotranks >= 0, self.slotranks, 0), dtype='Int16'),
+        })
+        side['SlotRank'] = side['SlotRank'].mask(self.slotranks < 0)
+        return pd.concat([side, ranks], axis=1)
+
+    def export(self, path, frame=None):
+        """
+        Write the matrix as CSV, Parquet or XLSX, chosen by the file extension.
+
+        Args:
+            path (str): Output file
+            frame (pandas.DataFrame, optional): Frame to write instead of to_frame(),
+                e.g. with extra joined columns
+        """
+        frame = self.to_frame() if frame is None else frame
+        path = str(path)
+        if path.endswith('.parquet'):
+            frame.to_parquet(path, index=False)
+        elif path.endswith('.xlsx'):
+            frame.to_excel(path, index=False, sheet_name='Rankings')
+        else:
+            frame.to_csv(path, index=False, encoding='utf-8')
+        return path
+
+
+def build_rank_matrix(rankings):
+    """
+    Build a RankMatrix from {country: [game, ...]} as written by best.py.
+    Games are identified by name, in order of first appearance.
+
+    Returns:
+        RankMatrix: The filled matrix
+    """
+    countries = list(rankings)
+    vocabulary = {}
+    providers = []
+    slotranks = []
+    game_index = []
+    country_index = []
+    positions = []
+
+    for country_id, games in enumerate(rankings.values()):
+        for position, game in enumerate(games, 1):
+            name = game.get('name')
+            if not name:
+                continue
+            game_id = vocabulary.setdefault(name, len(vocabulary))
+            if game_id == len(providers):
+                providers.append(game.get('provider'))
+                slotranks.append(game.get('rank', -1))
+            game_index.append(game_id)
+            country_index.append(country_id)
+            positions.append(position)
+
+    return RankMatrix(
+        list(vocabulary),
+        countries,
+        np.array(game_index, dtype=np.int32),
+        np.array(country_index, dtype=np.int32),
+        np.array(positions, dtype=np.int16),
+        providers,
+        np.array(slotranks, dtype=np.int16),
+    )
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Build the game x country rank matrix and its aggregates")
+    parser.add_argument('input', nargs='?', default=str(base_dir / 'games_data' / 'all_games_by_country.json'),
+                        help="Rankings JSON written by best.py")
+    parser.add_argument('-o', '--output', default=None, help="Rank matrix output (.csv, .parquet or .xlsx)")
+    parser.add_argument('--summary', default=None, help="Per-game aggregates output (.csv, .parquet or .xlsx)")
+    parser.add_argument('-n', '--top-n', type=int, default=10, help="Depth for top-N counts and region lists")
+    parser.add_argument('--regions', action='store_true',
+                        help="Print the top-N games of every ranking region (see rankings.py)")
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    matrix = build_rank_matrix(data)
+    print(f"{len(matrix.games)} games x {len(matrix.countries)} countries, {len(matrix.positions)} listings")
+
+    if args.output:
+        print(f"Rank matrix saved to {matrix.export(args.output)}")
+    summary = matrix.summary(args.top_n)
+    if args.summary:
+        matrix.export(args.summary, frame=summary)
+        print(f"Summary saved to {args.summary}")
+    else:
+        print(summary.head(args.top_n).to_string(index=False))
+
+    if args.regions:
+        from rankings import analyze
+        labels = analyze(data)['regions']
+        for region, games in matrix.region_top(labels.tolist(), args.top_n).items():
+            print(f"Region {region}: " + ', '.join(f"{name} ({score})" for name, score in games))
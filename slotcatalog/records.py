@@ -0,0 +1,410 @@
+"""
+Typed records for the scraped games and providers.
+
+The extractors produce dicts keyed by the labels printed on the pages
+('RTP', 'Max Win', ...). The classes here hold the same data in slotted
+dataclasses with one attribute per known label, so a large batch costs a
+fraction of the memory of the dicts, and encode to compact JSON or
+MessagePack with orjson/msgspec instead of the json module:
+
+    cards = from_dicts(ProviderGameCard, games)
+    write_records(cards, 'provider_games.msgpack')
+    cards = read_records(ProviderGameCard, 'provider_games.msgpack')
+    games = to_dicts(cards)  # the extractor output again
+
+Labels map to the catalog column names of normalize.LABELS wherever one
+exists. Labels a class does not know are kept in its `extra` dict, so
+to_dict() always gives back a dict equal to the original record. Its keys
+come in attribute order, then `extra`: the extractor's own order for game
+cards, but not always for provider pages, whose labels vary in order.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+from normalize import LABELS as COLUMN_LABELS
+
+# A provider page property: plain text or {'text', 'href'}
+Property = Union[str, dict, None]
+
+
+def _label_map(*labels, **renamed):
+    """
+    Page label -> attribute name: the catalog column from normalize.LABELS
+    where there is one, else the label in snake case; `renamed` overrides.
+    """
+    mapping = {}
+    for label in labels:
+        key = label.strip().lower()
+        mapping[label] = COLUMN_LABELS.get(key) or key.replace(' ', '_').replace('.', '')
+    mapping.update({label: name for name, label in renamed.items()})
+    return mapping
+
+
+class Record:
+    """
+    Conversion between a page dict and a typed record; subclasses are
+    slotted dataclasses declaring LABELS (page label -> attribute) and an
+    `extra` dict (None when empty) for everything else.
+    """
+    __slots__ = ()
+    LABELS: ClassVar[dict] = {}
+    ATTRIBUTES: ClassVar[dict] = {}
+    # Labels that carry a qualifier after a fixed start, e.g. 'Provider Rank (CN)';
+    # the full label is kept in '<attribute>_label'
+    PREFIXES: ClassVar[tuple] = ()
+
+    # Attributes with few distinct values, interned so equal values share one string
+    SHARED: ClassVar[tuple] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.ATTRIBUTES = {attribute: label for label, attribute in cls.LABELS.items()}
+
+    def __post_init__(self):
+        for attribute in self.SHARED:
+            value = getattr(self, attribute)
+            if type(value) is str:
+                setattr(self, attribute, sys.intern(value))
+
+    @classmethod
+    def from_dict(cls, raw):
+        values = {}
+        extra = {}
+        for label, value in raw.items():
+            attribute = cls.LABELS.get(label)
+            prefixed = None
+            if attribute is None:
+                prefixed = next((prefix for prefix in cls.PREFIXES if label.startswith(prefix)), None)
+                attribute = cls.LABELS.get(prefixed)
+            if attribute is None or attribute in values:
+                extra[label] = value
+                continue
+            values[attribute] = value
+            if prefixed is not None:
+                values[f'{attribute}_label'] = label
+        return cls(extra=extra or None, **values)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The record keyed by page labels, equal to the extractor's output
+        """
+        raw = {}
+        for attribute, label in self.ATTRIBUTES.items():
+            value = getattr(self, attribute)
+            if value is not None:
+                if label in self.PREFIXES:
+                    label = getattr(self, f'{attribute}_label') or label
+                raw[label] = value
+        if self.extra:
+            raw.update(self.extra)
+        return raw
+
+
+@dataclass(slots=True)
+class BestSlotEntry(Record):
+    """
+    One game of a country's best slots ranking (best.extract_games_from_html).
+    """
+    LABELS: ClassVar[dict] = _label_map('name', 'game_url', 'image_url', 'provider', 'rank')
+    SHARED: ClassVar[tuple] = ('provider',)
+
+    name: Optional[str] = None
+    game_url: Optional[str] = None
+    image_url: Optional[str] = None
+    provider: Optional[str] = None
+    rank: Optional[int] = None
+    extra: Optional[dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class ProviderGameCard(Record):
+    """
+    A game card from a provider's game list (games.extract_game_data and
+    detail.extract_provider_page).
+    """
+    # In the order the card lists them
+    LABELS: ClassVar[dict] = _label_map(
+        'name', 'thumbnail', 'url', 'RTP', 'Max Win', 'Min bet', 'Volatility', 'Hit Frequency',
+        'Betways', 'Release Date', 'Devices', 'provider')
+    SHARED: ClassVar[tuple] = ('provider', 'rtp', 'max_win', 'min_bet', 'volatility', 'lines',
+                               'hit_frequency', 'release_date', 'devices')
+
+    name: Optional[str] = None
+    thumbnail: Optional[str] = None
+    url: Optional[str] = None
+    rtp: Optional[str] = None
+    max_win: Optional[str] = None
+    min_bet: Optional[str] = None
+    volatility: Optional[str] = None
+    hit_frequency: Optional[str] = None
+    lines: Optional[str] = None
+    release_date: Optional[str] = None
+    devices: Optional[str] = None
+    provider: Optional[str] = None
+    extra: Optional[dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class GameDetail(Record):
+    """
+    The properties table of a game page (game_detail.extract_game_data).
+    """
+    LABELS: ClassVar[dict] = _label_map(
+        'title', 'name', 'url', 'Provider', 'RTP', 'Max Win', 'Min Bet', 'Max Bet', 'Volatility',
+        'Hit Frequency', 'Reels', 'Rows', 'Layout', 'Paylines', 'Release Date', 'Theme', 'Features')
+
+    title: Optional[str] = None
+    name: Optional[str] = None
+    url: Optional[str] = None
+    provider: Property = None
+    rtp: Property = None
+    max_win: Property = None
+    min_bet: Property = None
+    max_bet: Property = None
+    volatility: Property = None
+    hit_frequency: Property = None
+    reels: Property = None
+    rows: Property = None
+    layout: Property = None
+    lines: Property = None
+    release_date: Property = None
+    themes: Property = None
+    features: Property = None
+    extra: Optional[dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class ProviderDetail(Record):
+    """
+    The summary of a provider page (detail.extract_provider_page); the
+    per-type game counts are kept in `extra`.
+    """
+    LABELS: ClassVar[dict] = _label_map(
+        'Logo', 'Provider Rank', 'name', 'Founded', 'Website', 'Total Games', 'Video Slots', 'Licenses')
+    # The rank is labelled with the country it is for, e.g. 'Provider Rank (CN)'
+    PREFIXES: ClassVar[tuple] = ('Provider Rank',)
+
+    logo: Optional[str] = None
+    provider_rank: Property = None
+    provider_rank_label: Optional[str] = None
+    name: Optional[str] = None
+    founded: Property = None
+    website: Property = None
+    total_games: Property = None
+    video_slots: Property = None
+    licenses: Property = None
+    extra: Optional[dict[str, Any]] = None
+
+
+# Record class per kind of output, as named on the command line
+KINDS = {
+    'best': BestSlotEntry,
+    'card': ProviderGameCard,
+    'game': GameDetail,
+    'provider': ProviderDetail,
+}
+
+FORMATS = ('json', 'msgpack')
+
+
+def from_dicts(cls, raws):
+    return [cls.from_dict(raw) for raw in raws]
+
+
+def to_dicts(records):
+    return [record.to_dict() for record in records]
+
+
+def format_for(path):
+    return 'msgpack' if str(path).endswith(('.msgpack', '.mpk')) else 'json'
+
+
+def encode(records, format='json'):
+    """
+    Serialize typed records (a list, or a dict of lists such as the rankings
+    by country) by attribute name.
+
+    Args:
+        records: Records to encode
+        format (str): 'json' (compact) or 'msgpack'
+
+    Returns:
+        bytes: Encoded data
+    """
+    if format == 'msgpack':
+        if msgspec is None:
+            raise RuntimeError("msgspec is not installed; use the json format")
+        return msgspec.msgpack.encode(records)
+    if orjson is not None:
+        return orjson.dumps(records)
+    if msgspec is not None:
+        return msgspec.json.encode(records)
+    return json.dumps(_plain(records), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _plain(records):
+    if isinstance(records, dict):
+        return {key: _plain(value) for key, value in records.items()}
+    return [{item.name: getattr(record, item.name) for item in fields(record)} for record in records]
+
+
+def decode(cls, data, format='json', by_key=False):
+    """
+    Inverse of encode().
+
+    Args:
+        cls (type): Record class
+        data (bytes): Encoded records
+        format (str): 'json' or 'msgpack'
+        by_key (bool): The data is a dict of lists (e.g. rankings by country)
+
+    Returns:
+        list or dict: Typed records
+    """
+    target = dict[str, list[cls]] if by_key else list[cls]
+    if format == 'msgpack':
+        if msgspec is None:
+            raise RuntimeError("msgspec is not installed; use the json format")
+        return msgspec.msgpack.decode(data, type=target)
+    if msgspec is not None:
+        return msgspec.json.decode(data, type=target)
+    loaded = orjson.loads(data) if orjson is not None else json.loads(data)
+    if by_key:
+        return {key: [cls(**values) for values in group] for key, group in loaded.items()}
+    return [cls(**values) for values in loaded]
+
+
+def write_records(records, path, format=None):
+    """
+    Write typed records to `path`; .msgpack/.mpk files are MessagePack,
+    anything else compact JSON.
+    """
+    with open(path, 'wb') as f:
+        f.write(encode(records, format or format_for(path)))
+
+
+def read_records(cls, path, format=None, by_key=False):
+    with open(path, 'rb') as f:
+        return decode(cls, f.read(), format or format_for(path), by_key)
+
+
+def _load_raw(path):
+    """
+    Label-keyed records from a .json array, a {key: [records]} .json file
+    or a JSON Lines file.
+    """
+    if '.jsonl' in str(path):
+        from jsonl import read_jsonl
+        return list(read_jsonl(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _convert(cls, raw):
+    if isinstance(raw, dict):
+        return {key: from_dicts(cls, group) for key, group in raw.items()}
+    return from_dicts(cls, raw)
+
+
+def _restore(records):
+    if isinstance(records, dict):
+        return {key: to_dicts(group) for key, group in records.items()}
+    return to_dicts(records)
+
+
+def benchmark(cls, raw, repeat=3):
+    """
+    Compare the label-keyed dicts written with json (indent=4, as the
+    scripts do) against typed records in compact JSON and MessagePack:
+    traced memory of the loaded records and the best encode/decode time.
+
+    Returns:
+        dict: Measurements per representation
+    """
+    by_key = isinstance(raw, dict)
+    text = json.dumps(raw, indent=4, ensure_ascii=False)
+
+    def best_of(func):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return round(min(times) * 1000, 2)
+
+    def traced(func):
+        tracemalloc.start()
+        value = func()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del value
+        return round(size / (1024 * 1024), 2)
+
+    results = {'dicts+json': {
+        'memory_mb': traced(lambda: json.loads(text)),
+        'encode_ms': best_of(lambda: json.dumps(raw, indent=4, ensure_ascii=False)),
+        'decode_ms': best_of(lambda: json.loads(text)),
+        'bytes': len(text.encode('utf-8')),
+    }}
+    records = _convert(cls, raw)
+    for format in FORMATS:
+        if format == 'msgpack' and msgspec is None:
+            continue
+        data = encode(records, format)
+        results[f'records+{format}'] = {
+            'memory_mb': traced(lambda: decode(cls, data, format, by_key)),
+            'encode_ms': best_of(lambda: encode(records, format)),
+            'decode_ms': best_of(lambda: decode(cls, data, format, by_key)),
+            'bytes': len(data),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert scraped JSON output to typed compact JSON or MessagePack")
+    parser.add_argument('kind', choices=KINDS, help="Kind of records in the input")
+    parser.add_argument('input', help="Input file: .json, .jsonl[.zst|.gz], .msgpack or compact records JSON")
+    parser.add_argument('output', nargs='?', default=None,
+                        help="Output file: .msgpack for MessagePack, .json for label-keyed JSON with --labels, "
+                             "else compact records JSON")
+    parser.add_argument('--labels', action='store_true',
+                        help="Input/output is typed records; write the label-keyed JSON the scripts produce")
+    parser.add_argument('--by-key', action='store_true',
+                        help="Typed input is a dict of lists (e.g. rankings by country)")
+    parser.add_argument('--bench', action='store_true', help="Measure memory and encode/decode time instead")
+    args = parser.parse_args()
+
+    cls = KINDS[args.kind]
+    try:
+        if args.bench:
+            for name, result in benchmark(cls, _load_raw(args.input)).items():
+                print(f"{name:16} {result['memory_mb']:8.2f} MB  encode {result['encode_ms']:8.2f} ms  "
+                      f"decode {result['decode_ms']:8.2f} ms  {result['bytes']:>10} bytes")
+        elif args.labels:
+            records = read_records(cls, args.input, by_key=args.by_key)
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(_restore(records), f, indent=4, ensure_ascii=False)
+            print(f"Saved label-keyed records to {args.output}")
+        else:
+            records = _convert(cls, _load_raw(args.input))
+            write_records(records, args.output)
+            print(f"Saved {len(records)} {'groups of ' if isinstance(records, dict) else ''}"
+                  f"{cls.__name__} records to {args.output}")
+    except Exception as e:
+        print(f"Error converting {args.input}: {str(e)}")
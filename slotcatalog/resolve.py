@@ -0,0 +1,291 @@
+import argparse
+import json
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from jsonl import iter_records
+from normalize import provider_key
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_REGISTRY = BASE_DIR / 'game_ids.json'
+
+# Trailing words that do not distinguish one game from another
+NOISE_WORDS = {'slot', 'slots', 'online', 'game'}
+
+# Minimum score for a fuzzy match
+THRESHOLD = 0.8
+# Trigrams shared by more catalog names than this are too common to block on
+MAX_BLOCK = 2000
+
+
+def normalize_name(name, provider=None):
+    """
+    Comparable form of a game name: ASCII, lower case, punctuation removed,
+    and a trailing provider name or noise word dropped, so "Crazy Monkey 2
+    (Igrosoft) Slot" and "crazy-monkey-2" compare equal.
+    """
+    text = unicodedata.normalize('NFKD', str(name or '')).encode('ascii', 'ignore').decode('ascii').lower()
+    text = text.replace('&', ' and ').replace("'", '')
+    tokens = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    while len(tokens) > 1 and tokens[-1] in NOISE_WORDS:
+        tokens.pop()
+    if provider:
+        provider_tokens = normalize_name(provider).split()
+        if provider_tokens and len(tokens) > len(provider_tokens) and tokens[-len(provider_tokens):] == provider_tokens:
+            tokens = tokens[:-len(provider_tokens)]
+            while len(tokens) > 1 and tokens[-1] in NOISE_WORDS:
+                tokens.pop()
+    return ' '.join(tokens)
+
+
+def url_slug(url):
+    """
+    "/en/slots/Book-of-Dead" -> "book-of-dead"
+    """
+    if not url:
+        return None
+    return url.split('?')[0].split('#')[0].rstrip('/').split('/')[-1].lower() or None
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """
+    Dice coefficient of two trigram sets.
+    """
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class GameIndex:
+    """
+    Catalog records indexed for matching: exact lookups by URL slug and by
+    normalized name, and a trigram blocking index so a fuzzy match only
+    scores the few catalog names sharing the most trigrams with the query.
+    """
+
+    def __init__(self, records):
+        """
+        Args:
+            records (iterable): Catalog records with 'url', 'name' (or 'title')
+                and optionally 'provider'
+        """
+        self.slugs = []
+        self.names = []
+        self.providers = []
+        self.grams = []
+        self.by_slug = {}
+        self.by_name = defaultdict(list)
+        self.blocks = defaultdict(list)
+
+        for record in records:
+            slug = url_slug(record.get('url'))
+            if slug is None or slug in self.by_slug:
+                continue
+            provider = record.get('provider')
+            provider = provider.get('text') if isinstance(provider, dict) else provider
+            name = normalize_name(record.get('name') or record.get('title'), provider)
+            grams = trigrams(name)
+
+            entry = len(self.slugs)
+            self.slugs.append(slug)
+            self.names.append(name)
+            self.providers.append(provider_key(provider) if provider else None)
+            self.grams.append(grams)
+            self.by_slug[slug] = entry
+            self.by_name[name].append(entry)
+            for gram in grams:
+                self.blocks[gram].append(entry)
+
+    def __len__(self):
+        return len(self.slugs)
+
+    def candidates(self, grams, limit=20):
+        """
+        Catalog entries sharing the most trigrams with the query, skipping
+        trigrams so common that they would put most of the catalog in the block.
+        """
+        counts = Counter()
+        for gram in grams:
+            postings = self.blocks.get(gram)
+            if postings and len(postings) <= MAX_BLOCK:
+                counts.update(postings)
+        return [entry for entry, _ in counts.most_common(limit)]
+
+    def match(self, name=None, url=None, provider=None):
+        """
+        Find the catalog entry for a game seen in another dataset.
+
+        Returns:
+            tuple: (entry, score, method) with method 'slug', 'name' or
+            'fuzzy'; entry is None when nothing scores above THRESHOLD
+        """
+        slug = url_slug(url)
+        if slug in self.by_slug:
+            return self.by_slug[slug], 1.0, 'slug'
+
+        normalized = normalize_name(name, provider)
+        provider = provider_key(provider) if provider else None
+        if not normalized:
+            return None, 0.0, None
+
+        def provider_score(entry):
+            if not provider or not self.providers[entry]:
+                return 0.0
+            return 0.1 if self.providers[entry] == provider else -0.2
+
+        exact = self.by_name.get(normalized)
+        if exact:
+            entry = max(exact, key=provider_score)
+            if provider_score(entry) >= 0:
+                return entry, 1.0, 'name'
+
+        grams = trigrams(normalized)
+        best, best_score = None, 0.0
+        for entry in self.candidates(grams):
+            score = similarity(grams, self.grams[entry]) + provider_score(entry)
+            if score > best_score:
+                best, best_score = entry, score
+        if best_score >= THRESHOLD:
+            return best, round(min(best_score, 1.0), 3), 'fuzzy'
+        return None, round(best_score, 3), None
+
+
+class GameRegistry:
+    """
+    Stable integer ids for games, shared by every dataset. Ids are keyed by
+    URL slug and never reused; names resolved without a URL are remembered as
+    aliases so later runs look them up directly.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY):
+        self.path = Path(path)
+        self.next_id = 1
+        self.slugs = {}
+        self.aliases = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.next_id = data.get('next_id', 1)
+            self.slugs = data.get('slugs', {})
+            self.aliases = data.get('aliases', {})
+
+    def id_for_slug(self, slug):
+        if slug not in self.slugs:
+            self.slugs[slug] = self.next_id
+            self.next_id += 1
+        return self.slugs[slug]
+
+    @staticmethod
+    def alias_key(name, provider=None):
+        return f"{normalize_name(name, provider)}|{provider_key(provider) if provider else ''}"
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'next_id': self.next_id, 'slugs': self.slugs, 'aliases': self.aliases},
+                      f, ensure_ascii=False, indent=1, sort_keys=True)
+        tmp_path.replace(self.path)
+
+
+def resolve_rankings(rankings, index, registry):
+    """
+    Game id of every ranking entry (best.py output).
+
+    Args:
+        rankings (dict): {country: [game dict, ...]}
+        index (GameIndex): Catalog index
+        registry (GameRegistry): Stable ids, updated in place
+
+    Returns:
+        tuple: (ids, unmatched) where ids is {country: [game id or None, ...]}
+        in rank order and unmatched lists every entry (per country) that found
+        no match
+    """
+    resolved = {}
+    # Best fuzzy score of keys that found no match
+    scores = {}
+    unmatched = []
+    ids = {}
+    for country, games in rankings.items():
+        row = []
+        for game in games:
+            name, url, provider = game.get('name'), game.get('game_url'), game.get('provider')
+            key = (name, url, provider)
+            if key not in resolved:
+                alias = registry.alias_key(name, provider)
+                if url_slug(url) in registry.slugs:
+                    resolved[key] = registry.slugs[url_slug(url)]
+                elif alias in registry.aliases:
+                    resolved[key] = registry.aliases[alias]
+                else:
+                    entry, score, method = index.match(name, url, provider)
+                    if entry is not None:
+                        resolved[key] = registry.id_for_slug(index.slugs[entry])
+                        if method != 'slug':
+                            registry.aliases[alias] = resolved[key]
+                    elif url_slug(url):
+                        # Not crawled yet: the slug still gives it a stable id
+                        resolved[key] = registry.id_for_slug(url_slug(url))
+                    else:
+                        resolved[key] = None
+                        scores[key] = score
+            if resolved[key] is None:
+                # One entry per occurrence, so the counts match the rankings
+                unmatched.append({'country': country, 'name': name, 'provider': provider,
+                                  'best_score': scores[key]})
+            row.append(resolved[key])
+        ids[country] = row
+    return ids, unmatched
+
+
+def build_game_ids(catalog_sources, rankings_path=None, registry_path=DEFAULT_REGISTRY):
+    """
+    Give every catalog game a stable id and resolve the rankings against the
+    catalog, saving the shared registry.
+
+    Returns:
+        tuple: (registry, ranking ids or None, unmatched ranking entries)
+    """
+    registry = GameRegistry(registry_path)
+    index = GameIndex(record for source in catalog_sources for record in iter_records(source))
+    for slug in index.slugs:
+        registry.id_for_slug(slug)
+    print(f"Indexed {len(index)} catalog games")
+
+    ranking_ids, unmatched = None, []
+    if rankings_path:
+        with open(rankings_path, 'r', encoding='utf-8') as f:
+            ranking_ids, unmatched = resolve_rankings(json.load(f), index, registry)
+    registry.save()
+    return registry, ranking_ids, unmatched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve games across datasets to stable ids")
+    parser.add_argument('catalog', nargs='+',
+                        help="Catalog records (games.py / game_detail.py output: .jsonl, JSON or directory)")
+    parser.add_argument('--rankings', default=None, help="all_games_by_country.json written by best.py")
+    parser.add_argument('--registry', default=str(DEFAULT_REGISTRY), help="Stable id registry")
+    parser.add_argument('-o', '--output', default=None, help="Write {country: [game id, ...]} here")
+    parser.add_argument('--unmatched', default=None, help="Write unmatched ranking entries here")
+    args = parser.parse_args()
+
+    registry, ranking_ids, unmatched = build_game_ids(args.catalog, args.rankings, args.registry)
+    print(f"{len(registry.slugs)} games and {len(registry.aliases)} aliases in {args.registry}")
+    if ranking_ids is not None:
+        total = sum(len(row) for row in ranking_ids.values())
+        matched = sum(game_id is not None for row in ranking_ids.values() for game_id in row)
+        print(f"Resolved {matched}/{total} ranking entries")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(ranking_ids, f)
+        if args.unmatched:
+            with open(args.unmatched, 'w', encoding='utf-8') as f:
+                json.dump(unmatched, f, indent=2, ensure_ascii=False)
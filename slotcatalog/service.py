@@ -0,0 +1,289 @@
+"""
+Long-running parse service.
+
+Keeps the extractors imported (and, with --workers, a warm process pool)
+so pages can be handed over one at a time without paying interpreter and
+parser start-up per batch. Requests and responses are JSON Lines, read from
+stdin and written to stdout, or exchanged over a Unix socket with --socket:
+
+    {"id": 1, "kind": "game_detail", "path": "game_details/Book-of-Dead.html"}
+    {"id": 2, "kind": "best_slots", "html": "<html>...", "filename": "best_slots_DE.html"}
+
+    {"id": 1, "ok": true, "records": {...}, "ms": 4.1}
+    {"id": 2, "ok": false, "error": "..."}
+
+Kinds are those in EXTRACTORS plus "ping". Responses carry the request id
+and may come back out of order when more than one worker is running.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from parallel import default_workers
+
+# Modules imported once per worker, ahead of the first request
+MODULES = ('parsers', 'games', 'detail', 'game_detail', 'best')
+
+
+def _provider(html, filename, backend=None):
+    from detail import extract_provider_page
+    return extract_provider_page(html, filename, backend)
+
+
+def _provider_games(html, filename, backend=None):
+    from games import extract_game_data
+    return extract_game_data(html, backend)
+
+
+def _game_detail(html, filename, backend=None):
+    from game_detail import extract_game_data
+    return extract_game_data(html, filename, backend)
+
+
+def _best_slots(html, filename, backend=None):
+    from best import extract_games_from_html
+    from parsers import parse_html
+    return extract_games_from_html(parse_html(html, backend))
+
+
+# kind -> extract(html, filename, backend)
+EXTRACTORS = {
+    'provider': _provider,
+    'provider_games': _provider_games,
+    'game_detail': _game_detail,
+    'best_slots': _best_slots,
+}
+
+
+def warm_up():
+    """
+    Import the extractors and the HTML parsers behind them; used as the
+    worker pool initializer.
+    """
+    for module in MODULES:
+        importlib.import_module(module)
+
+
+def handle(request, backend=None):
+    """
+    Serve one request in this process.
+
+    Args:
+        request (dict): {'id', 'kind', 'html' or 'path', optional 'filename' and 'backend'}
+        backend (str, optional): Parser backend when the request names none
+
+    Returns:
+        dict: Response with 'ok' and either 'records' or 'error'
+    """
+    start = time.perf_counter()
+    response = {'id': request.get('id')}
+    try:
+        kind = request.get('kind')
+        if kind == 'ping':
+            response.update(ok=True, records=None, pid=os.getpid())
+            return response
+        if kind not in EXTRACTORS:
+            raise ValueError(f"Unknown kind {kind!r} (expected one of {', '.join(EXTRACTORS)})")
+        extract = EXTRACTORS[kind]
+        path = request.get('path')
+        if request.get('html') is not None:
+            html = request['html']
+        elif path:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        else:
+            raise ValueError("Request needs 'html' or 'path'")
+        filename = request.get('filename') or (os.path.basename(path) if path else '')
+        records = extract(html, filename, request.get('backend') or backend)
+        response.update(ok=True, records=records)
+    except Exception as e:
+        response.update(ok=False, error=str(e))
+    response['ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return response
+
+
+class ParseService:
+    """
+    Dispatches requests to this process (one worker) or to a warm process pool.
+    """
+
+    def __init__(self, workers=1, backend=None):
+        if workers == 0:
+            workers = default_workers()
+        self.backend = backend
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+            # Start every worker now rather than on the first requests
+            for future in [self.pool.submit(handle, {'kind': 'ping'}) for _ in range(workers)]:
+                future.result()
+        else:
+            warm_up()
+
+    def submit(self, request):
+        """
+        Returns:
+            concurrent.futures.Future: Resolves to the response dict
+        """
+        if self.pool is not None:
+            return self.pool.submit(handle, request, self.backend)
+        future = Future()
+        future.set_result(handle(request, self.backend))
+        return future
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def _parse_line(line):
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        return request, None
+    except ValueError as e:
+        return None, {'id': None, 'ok': False, 'error': f"Bad request: {str(e)}"}
+
+
+def _encode(response):
+    return json.dumps(response, ensure_ascii=False) + '\n'
+
+
+def serve_stdio(service, infile=sys.stdin, outfile=sys.stdout):
+    """
+    Answer JSON Lines requests from `infile` on `outfile` until EOF.
+    """
+    lock = threading.Lock()
+    pending = []
+
+    def write(response):
+        with lock:
+            outfile.write(_encode(response))
+            outfile.flush()
+
+    for line in infile:
+        if not line.strip():
+            continue
+        request, error = _parse_line(line)
+        if error:
+            write(error)
+            continue
+        future = service.submit(request)
+        future.add_done_callback(lambda done: write(done.result()))
+        pending.append(future)
+        pending = [future for future in pending if not future.done()]
+    for future in pending:
+        future.result()
+
+
+async def serve_socket(service, path):
+    """
+    Answer JSON Lines requests on a Unix socket; every connection may keep
+    many requests in flight.
+    """
+    async def connection(reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(request):
+            response = await asyncio.wrap_future(service.submit(request))
+            async with lock:
+                writer.write(_encode(response).encode('utf-8'))
+                await writer.drain()
+
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            request, error = _parse_line(line)
+            if error:
+                async with lock:
+                    writer.write(_encode(error).encode('utf-8'))
+                continue
+            task = asyncio.create_task(answer(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(connection, path=path, limit=64 * 1024 * 1024)
+    print(f"Parse service listening on {path}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+class ParseClient:
+    """
+    Blocking client for a service started with --socket.
+
+        with ParseClient('/tmp/slotcatalog.sock') as client:
+            game = client.parse('game_detail', path='game_details/Book-of-Dead.html')
+    """
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.reader = self.sock.makefile('r', encoding='utf-8')
+        self.next_id = 0
+
+    def request(self, request):
+        """
+        Send one request and wait for its response.
+        """
+        self.next_id += 1
+        request = dict(request, id=self.next_id)
+        self.sock.sendall(_encode(request).encode('utf-8'))
+        return json.loads(self.reader.readline())
+
+    def parse(self, kind, html=None, path=None, filename=None):
+        """
+        Returns:
+            The extracted records; raises RuntimeError if the service failed
+        """
+        response = self.request({'kind': kind, 'html': html, 'path': path, 'filename': filename})
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['records']
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    from parsers import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Serve HTML extraction requests as JSON Lines")
+    parser.add_argument('--socket', default=None, help="Listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Parser processes (1 = in this process, 0 = all cores)")
+    parser.add_argument('--parser', choices=BACKENDS, default=None,
+                        help="HTML parser backend (defaults to the fastest installed)")
+    args = parser.parse_args()
+
+    service = ParseService(workers=args.workers, backend=args.parser)
+    try:
+        if args.socket:
+            asyncio.run(serve_socket(service, args.socket))
+        else:
+            serve_stdio(service)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -0,0 +1,372 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from rankings import game_key
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_DB = BASE_DIR / 'games_data' / 'ranking_history.db'
+
+# A day's rankings are stored twice, both compactly:
+#  - snapshots points every (day, country) at a content-addressed ranking in
+#    `lists`, so countries and days with identical top lists share one copy;
+#  - rank_events holds only the positions that changed against the country's
+#    previous snapshot (rank NULL when a game dropped out), keyed so that one
+#    game's history in one country is a single index range.
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS countries (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS lists (
+    id INTEGER PRIMARY KEY,
+    sha1 TEXT NOT NULL UNIQUE,
+    games BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    day TEXT NOT NULL,
+    country_id INTEGER NOT NULL REFERENCES countries(id),
+    list_id INTEGER NOT NULL REFERENCES lists(id),
+    PRIMARY KEY (country_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rank_events (
+    country_id INTEGER NOT NULL,
+    game_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    rank INTEGER,
+    PRIMARY KEY (country_id, game_id, day)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS snapshots_day ON snapshots(day);
+CREATE INDEX IF NOT EXISTS rank_events_day ON rank_events(day);
+'''
+
+
+def connect(db_path=DEFAULT_DB):
+    """
+    Open the ranking history database in WAL mode with the schema in place.
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _ids(conn, table, column, values, extra=None):
+    """
+    Integer ids for `values`, inserting the missing ones.
+    """
+    known = dict(conn.execute(f'SELECT {column}, id FROM {table}'))
+    for value in values:
+        if value not in known:
+            if extra:
+                cursor = conn.execute(f'INSERT INTO {table} ({column}, name) VALUES (?, ?)', (value, extra.get(value)))
+            else:
+                cursor = conn.execute(f'INSERT INTO {table} ({column}) VALUES (?)', (value,))
+            known[value] = cursor.lastrowid
+    return known
+
+
+def _list_id(conn, game_ids):
+    """
+    Id of the stored ranking with these game ids, storing it if it is new.
+    """
+    blob = np.asarray(game_ids, dtype='<i4').tobytes()
+    sha1 = hashlib.sha1(blob).hexdigest()
+    row = conn.execute('SELECT id FROM lists WHERE sha1 = ?', (sha1,)).fetchone()
+    if row:
+        return row[0]
+    return conn.execute('INSERT INTO lists (sha1, games) VALUES (?, ?)', (sha1, blob)).lastrowid
+
+
+def _decode(blob):
+    return np.frombuffer(blob, dtype='<i4')
+
+
+def record_snapshot(conn, rankings, day=None):
+    """
+    Record one day's rankings, e.g. best.py's all_games_by_country.json.
+    Recording the same day again replaces that day's snapshot as long as it
+    is the latest one. Entries with neither a game_url nor a name cannot be
+    followed from one day to the next and are left out.
+
+    Args:
+        conn (sqlite3.Connection): Open history database
+        rankings (dict): {country: [game dict or name, ...]} in rank order
+        day (str, optional): ISO date. Defaults to today
+
+    Returns:
+        dict: Countries recorded, new distinct lists and rank events written
+    """
+    day = day or date.today().isoformat()
+    names = {}
+    for games in rankings.values():
+        for game in games:
+            if isinstance(game, dict):
+                if game_key(game):
+                    names.setdefault(game_key(game), game.get('name'))
+            elif game:
+                names.setdefault(game, game)
+
+    stats = {'countries': 0, 'lists': 0, 'events': 0}
+    with conn:
+        game_ids = _ids(conn, 'games', 'key', names, extra=names)
+        country_ids = _ids(conn, 'countries', 'code', rankings)
+        lists_before = conn.execute('SELECT COUNT(*) FROM lists').fetchone()[0]
+
+        for country, games in rankings.items():
+            country_id = country_ids[country]
+            keys = (game_key(game) if isinstance(game, dict) else game for game in games)
+            ranked = [game_ids[key] for key in keys if key]
+            later = conn.execute('SELECT 1 FROM snapshots WHERE country_id = ? AND day > ? LIMIT 1',
+                                 (country_id, day)).fetchone()
+            if later:
+                raise ValueError(f"{country} already has a snapshot after {day}; snapshots must be recorded in order")
+
+            conn.execute('DELETE FROM rank_events WHERE country_id = ? AND day = ?', (country_id, day))
+            previous = conn.execute(
+                'SELECT l.games FROM snapshots s JOIN lists l ON l.id = s.list_id '
+                'WHERE s.country_id = ? AND s.day < ? ORDER BY s.day DESC LIMIT 1',
+                (country_id, day),
+            ).fetchone()
+            old_ranks = {}
+            if previous:
+                for position, game_id in enumerate(_decode(previous[0]).tolist(), 1):
+                    old_ranks.setdefault(game_id, position)
+            new_ranks = {}
+            for position, game_id in enumerate(ranked, 1):
+                new_ranks.setdefault(game_id, position)
+
+            # Only positions that moved, new entries and drop-outs are stored
+            events = [(country_id, game_id, day, rank) for game_id, rank in new_ranks.items()
+                      if old_ranks.get(game_id) != rank]
+            events += [(country_id, game_id, day, None) for game_id in old_ranks if game_id not in new_ranks]
+            conn.executemany('INSERT INTO rank_events (country_id, game_id, day, rank) VALUES (?, ?, ?, ?)', events)
+            conn.execute('INSERT OR REPLACE INTO snapshots (day, country_id, list_id) VALUES (?, ?, ?)',
+                         (day, country_id, _list_id(conn, ranked)))
+            stats['countries'] += 1
+            stats['events'] += len(events)
+
+        stats['lists'] = conn.execute('SELECT COUNT(*) FROM lists').fetchone()[0] - lists_before
+    return stats
+
+
+def snapshot(conn, day, countries=None):
+    """
+    Rankings in force on `day` (the latest snapshot on or before it), decoding
+    one stored list per country.
+
+    Returns:
+        dict: {country: [game key, ...]} in rank order
+    """
+    keys = dict(conn.execute('SELECT id, key FROM games'))
+    rows = conn.execute('''
+        SELECT c.code, l.games FROM countries c
+        JOIN snapshots s ON s.country_id = c.id
+            AND s.day = (SELECT MAX(day) FROM snapshots WHERE country_id = c.id AND day <= ?)
+        JOIN lists l ON l.id = s.list_id
+    ''', (day,))
+    return {code: [keys[game_id] for game_id in _decode(blob).tolist()]
+            for code, blob in rows if countries is None or code in countries}
+
+
+def _game_id(conn, game):
+    row = conn.execute('SELECT id FROM games WHERE key = ? OR name = ? ORDER BY key = ? DESC LIMIT 1',
+                       (game, game, game)).fetchone()
+    if row is None:
+        raise KeyError(f"Unknown game: {game}")
+    return row[0]
+
+
+def trajectory(conn, game, country, start=None, end=None):
+    """
+    Daily rank of one game in one country, read from its change events only.
+
+    Args:
+        game (str): Game URL or name
+        country (str): Country code
+        start (str, optional): First ISO day. Defaults to 90 days before `end`
+        end (str, optional): Last ISO day. Defaults to today
+
+    Returns:
+        list: (day, rank) for every snapshot day in the range; rank is None
+        when the game was not listed
+    """
+    end = end or date.today().isoformat()
+    start = start or (date.fromisoformat(end) - timedelta(days=90)).isoformat()
+    game_id = _game_id(conn, game)
+    country_id = conn.execute('SELECT id FROM countries WHERE code = ?', (country,)).fetchone()
+    if country_id is None:
+        raise KeyError(f"Unknown country: {country}")
+    country_id = country_id[0]
+
+    days = [day for (day,) in conn.execute(
+        'SELECT day FROM snapshots WHERE country_id = ? AND day BETWEEN ? AND ? ORDER BY day',
+        (country_id, start, end))]
+    # The rank in force at `start` is the last change on or before it
+    initial = conn.execute(
+        'SELECT rank FROM rank_events WHERE country_id = ? AND game_id = ? AND day <= ? ORDER BY day DESC LIMIT 1',
+        (country_id, game_id, start)).fetchone()
+    changes = dict(conn.execute(
+        'SELECT day, rank FROM rank_events WHERE country_id = ? AND game_id = ? AND day > ? AND day <= ?',
+        (country_id, game_id, start, end)))
+
+    rank = initial[0] if initial else None
+    result = []
+    for day in days:
+        rank = changes.get(day, rank)
+        result.append((day, rank))
+    return result
+
+
+def ranks_on(conn, day):
+    """
+    Rank matrix for the snapshot in force on `day`.
+
+    Returns:
+        tuple: (country ids, ranks) where ranks is an int32 (countries, games)
+        array indexed by game id, 0 where a game is not listed
+    """
+    n_games = conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM games').fetchone()[0]
+    rows = conn.execute('''
+        SELECT s.country_id, l.games FROM snapshots s JOIN lists l ON l.id = s.list_id
+        WHERE s.day = (SELECT MAX(day) FROM snapshots WHERE country_id = s.country_id AND day <= ?)
+        ORDER BY s.country_id
+    ''', (day,)).fetchall()
+    ranks = np.zeros((len(rows), n_games), dtype=np.int32)
+    for i, (_, blob) in enumerate(rows):
+        game_ids = _decode(blob)
+        # Reverse so a game listed twice keeps its best position
+        ranks[i, game_ids[::-1]] = np.arange(len(game_ids), 0, -1, dtype=np.int32)
+    return [country_id for country_id, _ in rows], ranks
+
+
+def movers(conn, start, end, top=20, country=None):
+    """
+    Games whose rank changed most between two days, comparing the two
+    snapshots in force on those days (not the ones in between).
+
+    Args:
+        start (str): Earlier ISO day
+        end (str): Later ISO day
+        top (int): Number of risers and fallers to return
+        country (str, optional): Only this country
+
+    Returns:
+        dict: 'risers' and 'fallers', lists of (country, game key, name,
+        rank at start, rank at end, change); unlisted ranks are None
+    """
+    start_countries, start_ranks = ranks_on(conn, start)
+    end_countries, end_ranks = ranks_on(conn, end)
+    codes = dict(conn.execute('SELECT id, code FROM countries'))
+    games = {game_id: (key, name) for game_id, key, name in conn.execute('SELECT id, key, name FROM games')}
+
+    # Align on the countries present on both days
+    common = [c for c in end_countries if c in set(start_countries)]
+    if country is not None:
+        common = [c for c in common if codes[c] == country]
+    before = start_ranks[[start_countries.index(c) for c in common]]
+    after = end_ranks[[end_countries.index(c) for c in common]]
+
+    # Entering or leaving the list counts as moving from/to one past the bottom
+    floor = max(before.max(initial=0), after.max(initial=0)) + 1
+    change = np.where(before > 0, before, floor) - np.where(after > 0, after, floor)
+    change[(before == 0) & (after == 0)] = 0
+
+    def rows(order):
+        result = []
+        for flat in order:
+            i, game_id = np.unravel_index(flat, change.shape)
+            if change[i, game_id] == 0:
+                break
+            key, name = games[int(game_id)]
+            result.append((codes[common[i]], key, name,
+                           int(before[i, game_id]) or None, int(after[i, game_id]) or None,
+                           int(change[i, game_id])))
+        return result
+
+    flat = change.ravel()
+    k = min(top, flat.size)
+    if k == 0:
+        return {'risers': [], 'fallers': []}
+    risers = np.argpartition(-flat, k - 1)[:k]
+    fallers = np.argpartition(flat, k - 1)[:k]
+    return {
+        'risers': rows(risers[np.argsort(-flat[risers], kind='stable')]),
+        'fallers': rows(fallers[np.argsort(flat[fallers], kind='stable')]),
+    }
+
+
+def storage_stats(conn):
+    """
+    Returns:
+        dict: Days, snapshots, distinct lists and rank events stored
+    """
+    return {
+        'days': conn.execute('SELECT COUNT(DISTINCT day) FROM snapshots').fetchone()[0],
+        'snapshots': conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0],
+        'lists': conn.execute('SELECT COUNT(*) FROM lists').fetchone()[0],
+        'events': conn.execute('SELECT COUNT(*) FROM rank_events').fetchone()[0],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and query the history of per-country rankings")
+    parser.add_argument('--db', default=str(DEFAULT_DB), help="History database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help="Record a day's rankings")
+    record.add_argument('rankings', nargs='?', default=str(BASE_DIR / 'games_data' / 'all_games_by_country.json'),
+                        help="all_games_by_country.json written by best.py")
+    record.add_argument('--date', default=None, help="Snapshot day (ISO, defaults to today)")
+
+    show = commands.add_parser('trajectory', help="Rank of a game in a country over time")
+    show.add_argument('game', help="Game URL or name")
+    show.add_argument('country', help="Country code")
+    show.add_argument('--start', default=None, help="First day (defaults to 90 days before --end)")
+    show.add_argument('--end', default=None, help="Last day (defaults to today)")
+
+    move = commands.add_parser('movers', help="Biggest rank changes between two days")
+    move.add_argument('--end', default=None, help="Later day (defaults to today)")
+    move.add_argument('--days', type=int, default=7, help="Compare against this many days earlier")
+    move.add_argument('--country', default=None, help="Only this country")
+    move.add_argument('--top', type=int, default=20, help="Risers and fallers to show")
+
+    commands.add_parser('stats', help="Show storage statistics")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+    if args.command == 'record':
+        with open(args.rankings, 'r', encoding='utf-8') as f:
+            stats = record_snapshot(conn, json.load(f), day=args.date)
+        print(f"Recorded {stats['countries']} countries: {stats['lists']} new distinct lists, "
+              f"{stats['events']} rank changes")
+    elif args.command == 'trajectory':
+        for day, rank in trajectory(conn, args.game, args.country, start=args.start, end=args.end):
+            print(f"{day}\t{rank if rank is not None else '-'}")
+    elif args.command == 'movers':
+        end = args.end or date.today().isoformat()
+        start = (date.fromisoformat(end) - timedelta(days=args.days)).isoformat()
+        result = movers(conn, start, end, top=args.top, country=args.country)
+        for label in ('risers', 'fallers'):
+            print(f"{label.capitalize()} {start} -> {end}:")
+            for code, key, name, before, after, change in result[label]:
+                print(f"  {code}\t{name or key}\t{before or '-'} -> {after or '-'}\t{change:+d}")
+    else:
+        print(storage_stats(conn))
@@ -1,9 +1,35 @@
+import argparse
 import json
 import os
-import pandas as pd
+import re
+from datetime import date
 from pathlib import Path
 
-def convert_json_to_csv(json_file_path, output_csv_path=None):
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+import instrument
+from instrument import count, count_input, count_output, stage
+from jsonl import collect_fields
+from rankmatrix import UNLISTED, build_rank_matrix
+
+# Text cells that are plain numbers ("2020", "96.5") are written as numbers
+NUMERIC_TEXT = re.compile(r'-?\d+(?:\.\d+)?')
+# Catalog rows read per Arrow batch while streaming the Games sheet
+CATALOG_BATCH_ROWS = 4096
+# Number formats of typed catalog columns
+CATALOG_FORMATS = {
+    'rtp': '0.00',
+    'max_win': '#,##0.##',
+    'min_bet': '0.00',
+    'max_bet': '#,##0.00',
+    'hit_frequency': '0.00',
+    'release_date': 'yyyy-mm-dd',
+}
+
+def convert_json_to_csv(json_file_path, output_csv_path=None, catalog_path=None):
     """
     Extract game rankings from all countries and create a CSV file with game names in the first column
     and country codes in other columns, with values representing the game's position in each country's list.
@@ -11,64 +37,44 @@ def convert_json_to_csv(json_file_path, output_csv_path=None):
     Args:
         json_file_path (str): Path to the JSON file
         output_csv_path (str, optional): Path for the output CSV file. If None, will use the same name as JSON file.
+            A .parquet or .xlsx extension writes that format instead.
+        catalog_path (str, optional): Typed game catalog (see catalog.py). When given, provider,
+            RTP, volatility and max win columns are joined on by game name.
     
     Returns:
         str: Path to the created CSV file
     """
     try:
         # Load the JSON data
-        with open(json_file_path, 'r', encoding='utf-8') as file:
+        with stage('load'), open(json_file_path, 'r', encoding='utf-8') as file:
             data = json.load(file)
+        count_input(json_file_path)
         
         # If output path not specified, create one based on input file
         if output_csv_path is None:
             output_csv_path = os.path.splitext(json_file_path)[0] + '_rankings.csv'
         
-        # Dictionary to store game rankings across countries
-        game_rankings = {}
-        
-        # Process each country's data
-        for country_code, games in data.items():
-            # Enumerate games to get their position (1-based index)
-            for position, game in enumerate(games, 1):
-                # Get game name
-                game_name = game.get('name')
-                
-                if game_name:
-                    # Initialize entry for this game if it doesn't exist
-                    if game_name not in game_rankings:
-                        game_rankings[game_name] = {}
-                    
-                    # Add the position for this country
-                    game_rankings[game_name][country_code] = position
-         
-        # Convert the nested dictionary to a DataFrame
-        df = pd.DataFrame.from_dict(game_rankings, orient='index')
+        # Map games and countries to integer ids and fill the int16 rank matrix
+        with stage('matrix'):
+            matrix = build_rank_matrix(data)
+            df = matrix.to_frame()
+        count('records', len(matrix.positions))
         
-        # Reset index to make game names a column
-        df.reset_index(inplace=True)
-        df.rename(columns={'index': 'Game Name'}, inplace=True)
-        # Sort the DataFrame to have Game Name and provider columns first
-        # First, check if 'provider' is in the data
-        provider_column = None
-        for column in df.columns:
-            if column.lower() == 'provider':
-                provider_column = column
-                break
+        # Join typed attributes from the game catalog
+        if catalog_path:
+            from catalog import load_catalog
+            with stage('join_catalog'):
+                catalog = load_catalog(catalog_path, columns=['name', 'provider', 'rtp', 'volatility', 'max_win'])
+                catalog = catalog.drop_duplicates('name').rename(columns={'name': 'Game Name', 'provider': 'catalog_provider'})
+                df = df.merge(catalog, on='Game Name', how='left')
+                # The ranking pages already name the provider; the catalog fills the gaps
+                df['provider'] = df['provider'].fillna(df.pop('catalog_provider').astype(object))
+            count_input(catalog_path)
         
-        # Rearrange columns to have Game Name and provider (if exists) first
-        if provider_column:
-            # Get all columns except Game Name and provider
-            other_columns = [col for col in df.columns if col != 'Game Name' and col != provider_column]
-            # Reorder columns with Game Name and provider first
-            df = df[['Game Name', provider_column] + other_columns]
-        else:
-            # If provider column doesn't exist, just ensure Game Name is first
-            other_columns = [col for col in df.columns if col != 'Game Name']
-            df = df[['Game Name'] + other_columns]
-        
-        # Write to CSV
-        df.to_csv(output_csv_path, index=False, encoding='utf-8')
+        # Write to CSV (or Parquet/XLSX, by extension)
+        with stage('export'):
+            matrix.export(output_csv_path, frame=df)
+        count_output(output_csv_path)
         
         print(f"CSV file with game rankings created successfully at: {output_csv_path}")
         return output_csv_path
@@ -77,10 +83,217 @@ def convert_json_to_csv(json_file_path, output_csv_path=None):
         print(f"Error converting JSON to CSV: {str(e)}")
         return None
 
+def _write_cell(worksheet, row, col, value, cell_format=None):
+    """
+    Write one cell with a native type: numbers (and numeric text) as numbers,
+    dates as dates, lists joined, {'text', 'href'} properties as their text.
+    None leaves the cell empty.
+    """
+    if value is None:
+        return
+    if isinstance(value, dict):
+        value = value.get('text')
+        if value is None:
+            return
+    if isinstance(value, bool):
+        worksheet.write_boolean(row, col, value)
+    elif isinstance(value, (int, float)):
+        if value == value:  # NaN stays empty
+            worksheet.write_number(row, col, value, cell_format)
+    elif isinstance(value, date):
+        worksheet.write_datetime(row, col, value, cell_format)
+    elif isinstance(value, (list, tuple)):
+        worksheet.write_string(row, col, ', '.join(
+            f'{item[0]}: {item[1]}' if isinstance(item, tuple) else str(item) for item in value))
+    else:
+        text = str(value).strip()
+        if NUMERIC_TEXT.fullmatch(text):
+            worksheet.write_number(row, col, float(text), cell_format)
+        elif text:
+            worksheet.write_string(row, col, text)
+
+
+def _start_sheet(workbook, name, columns, header_format, freeze_cols=0, widths=None):
+    worksheet = workbook.add_worksheet(name)
+    for col, column in enumerate(columns):
+        worksheet.set_column(col, col, (widths or {}).get(column, max(10, min(40, len(str(column)) + 2))))
+    worksheet.write_row(0, 0, columns, header_format)
+    worksheet.freeze_panes(1, freeze_cols)
+    return worksheet
+
+
+def write_rankings_sheet(workbook, rankings, header_format):
+    """
+    Games x countries positions from best.py rankings, one row per game.
+
+    Returns:
+        int: Rows written
+    """
+    matrix = build_rank_matrix(rankings)
+    columns = ['Game Name', 'provider', 'SlotRank'] + matrix.countries
+    worksheet = _start_sheet(workbook, 'Rankings', columns, header_format, freeze_cols=1,
+                             widths={'Game Name': 32, 'provider': 20})
+    for game_id, (name, provider, slotrank, ranks) in enumerate(
+            zip(matrix.games, matrix.providers, matrix.slotranks.tolist(), matrix.ranks.tolist()), 1):
+        worksheet.write_string(game_id, 0, name)
+        _write_cell(worksheet, game_id, 1, provider)
+        if slotrank >= 0:
+            worksheet.write_number(game_id, 2, slotrank)
+        for col, position in enumerate(ranks, 3):
+            if position != UNLISTED:
+                worksheet.write_number(game_id, col, position)
+    worksheet.autofilter(0, 0, len(matrix.games), len(columns) - 1)
+    return len(matrix.games)
+
+
+def write_providers_sheet(workbook, details, header_format):
+    """
+    One row per provider from provider_details.json; every label becomes a
+    column, and linked properties also get a '<label> URL' column.
+
+    Returns:
+        int: Rows written
+    """
+    labels = collect_fields(details)
+    linked = {label for label in labels
+              if any(isinstance(detail.get(label), dict) and detail[label].get('href') for detail in details)}
+    columns = []
+    for label in labels:
+        columns.append(label)
+        if label in linked:
+            columns.append(f'{label} URL')
+    worksheet = _start_sheet(workbook, 'Providers', columns, header_format, freeze_cols=1,
+                             widths={'name': 28, 'Logo': 40, 'Licenses': 40})
+    for row, detail in enumerate(details, 1):
+        col = 0
+        for label in labels:
+            value = detail.get(label)
+            _write_cell(worksheet, row, col, value)
+            col += 1
+            if label in linked:
+                if isinstance(value, dict) and value.get('href'):
+                    worksheet.write_string(row, col, value['href'])
+                col += 1
+    worksheet.autofilter(0, 0, len(details), len(columns) - 1)
+    return len(details)
+
+
+def _open_catalog(catalog_path, batch_rows=CATALOG_BATCH_ROWS):
+    """
+    Open the typed catalog for streaming without loading the whole table.
+
+    Returns:
+        tuple: (pyarrow.Schema, iterator of record batches)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    path = str(catalog_path)
+    if path.endswith('.feather') or path.endswith('.arrow'):
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        return reader.schema, (reader.get_batch(index) for index in range(reader.num_record_batches))
+    parquet_file = pq.ParquetFile(path)
+    return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=batch_rows)
+
+
+def write_games_sheet(workbook, catalog_path, header_format):
+    """
+    The typed game catalog (see catalog.py), streamed batch by batch.
+
+    Returns:
+        int: Rows written
+    """
+    schema, batches = _open_catalog(catalog_path)
+    columns = schema.names
+    formats = {col: workbook.add_format({'num_format': CATALOG_FORMATS[column]})
+               for col, column in enumerate(columns) if column in CATALOG_FORMATS}
+    freeze_cols = columns.index('name') + 1 if 'name' in columns else 0
+    worksheet = _start_sheet(workbook, 'Games', columns, header_format, freeze_cols=freeze_cols,
+                             widths={'url': 36, 'name': 32, 'title': 32, 'provider': 20, 'thumbnail': 36,
+                                     'themes': 30, 'features': 40, 'attributes': 40})
+    row = 0
+    for batch in batches:
+        for values in zip(*(batch.column(i).to_pylist() for i in range(batch.num_columns))):
+            row += 1
+            for col, value in enumerate(values):
+                if isinstance(value, str):
+                    # Catalog strings are text even when they look numeric
+                    if value:
+                        worksheet.write_string(row, col, value)
+                else:
+                    _write_cell(worksheet, row, col, value, formats.get(col))
+    worksheet.autofilter(0, 0, row, len(columns) - 1)
+    return row
+
+
+def export_workbook(xlsx_path, rankings_path=None, providers_path=None, catalog_path=None):
+    """
+    Write one XLSX workbook with a Rankings, a Providers and a Games sheet
+    (each only when its source is given). Rows are streamed to disk in
+    xlsxwriter's constant_memory mode with native number and date cells and
+    frozen header rows, so memory stays flat however large the catalog is.
+
+    Args:
+        xlsx_path (str): Output workbook
+        rankings_path (str, optional): Rankings JSON written by best.py
+        providers_path (str, optional): provider_details.json written by detail.py
+        catalog_path (str, optional): Typed catalog written by catalog.py (.parquet or .feather)
+
+    Returns:
+        str: Path to the workbook, or None on error
+    """
+    if xlsxwriter is None:
+        print("Error exporting workbook: xlsxwriter is not installed")
+        return None
+    try:
+        workbook = xlsxwriter.Workbook(str(xlsx_path), {'constant_memory': True, 'strings_to_numbers': False})
+        header_format = workbook.add_format({'bold': True, 'bottom': 1})
+        if rankings_path:
+            with stage('rankings'), open(rankings_path, 'r', encoding='utf-8') as f:
+                count('ranking_rows', write_rankings_sheet(workbook, json.load(f), header_format))
+            count_input(rankings_path)
+        if providers_path:
+            with stage('providers'), open(providers_path, 'r', encoding='utf-8') as f:
+                count('provider_rows', write_providers_sheet(workbook, json.load(f), header_format))
+            count_input(providers_path)
+        if catalog_path:
+            with stage('games'):
+                count('game_rows', write_games_sheet(workbook, catalog_path, header_format))
+            count_input(catalog_path)
+        with stage('close'):
+            workbook.close()
+        count_output(xlsx_path)
+        print(f"Workbook saved to {xlsx_path}")
+        return str(xlsx_path)
+    except Exception as e:
+        print(f"Error exporting workbook: {str(e)}")
+        return None
+
 if __name__ == "__main__":
-    # Get the path to the JSON file
     base_dir = Path(__file__).parent
-    json_file_path = base_dir / 'games_data' / 'all_games_by_country.json'
+    parser = argparse.ArgumentParser(description="Build the game x country rankings table")
+    parser.add_argument('--xlsx', default=None,
+                        help="Write one workbook with Rankings, Providers and Games sheets here instead of the CSV")
+    parser.add_argument('--rankings', default=str(base_dir / 'games_data' / 'all_games_by_country.json'),
+                        help="Rankings JSON written by best.py")
+    parser.add_argument('--providers', default=str(base_dir / 'provider_details.json'),
+                        help="Provider details written by detail.py (--xlsx only)")
+    parser.add_argument('--catalog', default=str(base_dir / 'games_catalog.parquet'),
+                        help="Typed game catalog written by catalog.py")
+    instrument.add_arguments(parser)
+    args = parser.parse_args()
+    instrument.start_from_args('toexcel', args)
+    
+    if args.xlsx:
+        # Sources that have not been built yet are left out of the workbook
+        workbook_path = export_workbook(args.xlsx, *(path if os.path.exists(path) else None
+                                                     for path in (args.rankings, args.providers, args.catalog)))
+        raise SystemExit(0 if workbook_path else 1)
+    
+    # Get the path to the JSON file
+    json_file_path = Path(args.rankings)
+    
+    # Join the typed catalog when it has been built
+    catalog_path = Path(args.catalog)
     
     # Convert to CSV
-    convert_json_to_csv(json_file_path)
+    convert_json_to_csv(json_file_path, catalog_path=catalog_path if catalog_path.exists() else None)
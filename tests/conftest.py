@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The crawl package is imported as slotcatalog.crawl, the pipeline scripts by bare name
+sys.path[:0] = [str(ROOT), str(ROOT / 'slotcatalog')]
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+import io
+import json
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from slotcatalog.crawl.assets import AssetStore, asset_urls, assets_job, rewrite_records
+from slotcatalog.crawl.client import HttpClient
+from slotcatalog.crawl.engine import run_job
+from slotcatalog.crawl.standin import STATS, make_app
+
+
+def png(color, size=(64, 32)):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def site(tmp_path):
+    """
+    Stand-in asset directory: two URLs with identical bytes, one other
+    image, and records referencing them plus a missing image.
+    """
+    images = tmp_path / 'site' / 'image'
+    images.mkdir(parents=True)
+    red, blue = png('red'), png('blue')
+    (images / 'book-of-dead.png').write_bytes(red)
+    (images / 'book-of-dead-copy.png').write_bytes(red)
+    (images / 'keks.png').write_bytes(blue)
+    rankings = {
+        'DE': [{'name': 'Book of Dead', 'image_url': '/userfiles/image/book-of-dead.png'},
+               {'name': 'Keks', 'image_url': '/userfiles/image/keks.png'}],
+        'GB': [{'name': 'Book of Dead', 'image_url': '/userfiles/image/book-of-dead-copy.png'},
+               {'name': 'Gone', 'image_url': '/userfiles/image/missing.png'}],
+    }
+    return {'dir': tmp_path / 'site', 'rankings': rankings, 'red': red, 'blue': blue}
+
+
+async def mirror(server, store, urls, sizes=()):
+    async with HttpClient(base_url=str(server.make_url('')), rate=100, retries=0) as client:
+        return await run_job(assets_job(store, urls, sizes), client, window=4)
+
+
+def test_mirror_dedups_caches_failures_and_rewrites(tmp_path, site):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    app = make_app(pages, assets_dir=site['dir'])
+    rankings = site['rankings']
+    records_path = tmp_path / 'all_games_by_country.json'
+    records_path.write_text(json.dumps(rankings), encoding='utf-8')
+    urls = asset_urls([records_path])
+    assert urls == [record['image_url'] for country in rankings.values() for record in country]
+
+    async def scenario():
+        async with TestServer(app) as server:
+            with AssetStore(tmp_path / 'assets') as store:
+                stats = await mirror(server, store, urls, sizes=(16,))
+                assert stats['done'] == 3 and stats['failed'] == 1
+                assert app[STATS][200] == 3 and app[STATS][404] == 1
+
+                # Identical bytes behind two URLs are stored once
+                red = hashlib.sha256(site['red']).hexdigest()
+                original = store.lookup('/userfiles/image/book-of-dead.png')
+                assert original == (red, '.png', 200)
+                assert store.lookup('/userfiles/image/book-of-dead-copy.png') == original
+                assert store.path(red, '.png').read_bytes() == site['red']
+                assert store.lookup('/userfiles/image/keks.png')[0] == hashlib.sha256(site['blue']).hexdigest()
+                summary = store.stats()
+                assert summary['urls'] == 4 and summary['stored'] == 3 and summary['files'] == 2
+                assert summary['bytes_on_disk'] == len(site['red']) + len(site['blue'])
+                assert summary['thumbnails'] == 2
+
+                # The 404 is remembered, so nothing is requested on the next run
+                assert store.lookup('/userfiles/image/missing.png') == (None, None, 404)
+                assert store.known('/userfiles/image/missing.png')
+                stats = await mirror(server, store, urls, sizes=(16,))
+                assert stats['skipped'] == 4 and stats['done'] == 0
+                assert app[STATS][200] == 3 and app[STATS][404] == 1
+
+                rewritten = rewrite_records(rankings, store, size=16)
+                assert rewritten == 3
+                first = rankings['DE'][0]
+                assert first['image_url_source'] == '/userfiles/image/book-of-dead.png'
+                assert first['image_url'] == f'assets/{store.variant(red, 16)}'
+                assert first['image_url'] == rankings['GB'][0]['image_url']
+                assert rankings['GB'][1] == {'name': 'Gone', 'image_url': '/userfiles/image/missing.png'}
+                assert store.local_path('/userfiles/image/keks.png').endswith('.png')
+
+    asyncio.run(scenario())
@@ -0,0 +1,144 @@
+import asyncio
+import socket
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from slotcatalog.crawl.client import HttpClient
+from slotcatalog.crawl.engine import run_job
+from slotcatalog.crawl.frontier import Frontier
+from slotcatalog.crawl.jobs import Job, best_slots_job
+from slotcatalog.crawl.ratelimit import TokenBucket
+
+
+def make_app(failures=0, fail_status=503):
+    """
+    /page answers `fail_status` to its first `failures` requests, then 200.
+
+    Returns:
+        tuple: (app, hits) with the arrival time and headers of every request
+    """
+    hits = []
+
+    async def page(request):
+        hits.append((time.monotonic(), dict(request.headers)))
+        if len(hits) <= failures:
+            return web.Response(status=fail_status, text='busy')
+        return web.Response(text=f'ok {len(hits)}')
+
+    app = web.Application()
+    app.router.add_get('/page', page)
+    return app, hits
+
+
+async def fetch_all(app, paths, **client_kwargs):
+    async with TestServer(app) as server:
+        async with HttpClient(base_url=str(server.make_url('')), **client_kwargs) as client:
+            return await asyncio.gather(*(client.get(path) for path in paths))
+
+
+def test_token_bucket_allows_burst_then_rate():
+    async def acquire_all():
+        bucket = TokenBucket(rate=20, capacity=5)
+        start = time.monotonic()
+        stamps = []
+        for _ in range(15):
+            await bucket.acquire()
+            stamps.append(time.monotonic() - start)
+        return stamps
+
+    stamps = asyncio.run(acquire_all())
+    # The first 5 tokens are available at once, the other 10 arrive at 20/s
+    assert stamps[4] < 0.05
+    assert stamps[-1] == pytest.approx(10 / 20, abs=0.1)
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_client_sends_cookies_and_headers():
+    app, hits = make_app()
+    responses = asyncio.run(fetch_all(app, ['/page'], cookie='session=abc'))
+    assert responses[0].status == 200
+    headers = hits[0][1]
+    assert headers['Cookie'] == 'session=abc'
+    assert 'Mozilla' in headers['User-Agent']
+
+
+def test_client_retries_transient_status():
+    app, hits = make_app(failures=1, fail_status=503)
+    response, = asyncio.run(fetch_all(app, ['/page'], retries=2))
+    assert response.status == 200
+    assert response.text == 'ok 2'
+    assert len(hits) == 2
+
+
+def test_client_returns_last_response_when_retries_run_out():
+    app, hits = make_app(failures=10, fail_status=429)
+    response, = asyncio.run(fetch_all(app, ['/page'], retries=1))
+    assert response.status == 429
+    assert len(hits) == 2
+
+
+def test_client_does_not_retry_client_errors():
+    app, hits = make_app(failures=10, fail_status=404)
+    response, = asyncio.run(fetch_all(app, ['/page'], retries=2))
+    assert response.status == 404
+    assert len(hits) == 1
+
+
+def test_client_is_rate_limited():
+    app, hits = make_app()
+    responses = asyncio.run(fetch_all(app, ['/page'] * 6, rate=10, burst=1, concurrency=6))
+    assert all(response.status == 200 for response in responses)
+    arrivals = [stamp for stamp, _ in hits]
+    # One request at once, then one every 0.1 s however many are in flight
+    assert arrivals[-1] - arrivals[0] >= 0.45
+
+
+def test_run_job_keeps_a_sliding_window():
+    active = 0
+    peak = 0
+    finished = []
+
+    async def fetch(client, item):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.3 if item == 0 else 0.01)
+        active -= 1
+        if item == 5:
+            raise RuntimeError("broken page")
+        finished.append(item)
+        return False if item == 6 else None
+
+    job = Job('test', lambda: range(20), fetch)
+    stats = asyncio.run(run_job(job, client=None, window=4))
+
+    assert peak == 4
+    assert stats['done'] == 18 and stats['skipped'] == 1 and stats['failed'] == 1
+    # The slow first item held one slot while the other slots worked through the rest
+    assert finished[-1] == 0
+
+
+def test_best_slots_records_network_failures(tmp_path):
+    (tmp_path / 'games_data').mkdir()
+    (tmp_path / 'countries.txt').write_text('DE\nGB\n', encoding='utf-8')
+    # A port nothing listens on: every request fails to connect
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    async def scenario():
+        frontier = Frontier(tmp_path / 'frontier.db')
+        async with HttpClient(base_url=f'http://127.0.0.1:{port}', rate=100, retries=0) as client:
+            stats = await run_job(best_slots_job(base_dir=tmp_path, frontier=frontier), client, window=2)
+        return stats, frontier.counts('best_slots')
+
+    stats, counts = asyncio.run(scenario())
+    assert stats['failed'] == 2
+    assert counts == {'failed': 2}
@@ -0,0 +1,48 @@
+import json
+
+from games import extract_game_data, iter_game_data, process_game_files
+
+CARD = """<div {attrs}>
+  <div class="slotCardImage"><a href="/en/slots/{slug}"><img data-src="/img/{slug}.png"></a></div>
+  <a href="/en/slots/{slug}" class="slotCardName">{name}</a>
+  <div class="propTable"><div class="propTableLine">RTP: 96.{i}</div></div>
+</div>
+"""
+
+# Class lists and attributes that find_all('div', class_='slotCard') matches
+# but the plain '<div class="slotCard">' tag does not
+ATTRS = ['class="slotCard"', 'class="slotCard featured"', "data-id=\"3\" class='slotCard'",
+         'class="new slotCard"', 'CLASS="slotCard" id="last"']
+
+
+def write_page(path, count):
+    cards = ''.join(CARD.format(attrs=ATTRS[i % len(ATTRS)], slug=f'Game-{i}', name=f'Game {i}', i=i)
+                    for i in range(count))
+    # A look-alike class that is not a card
+    html = f'<html><body><div class="slotCardList">{cards}</div><div class="slotCardName">x</div></body></html>'
+    path.write_text(html, encoding='utf-8')
+    return html
+
+
+def test_chunks_find_every_card_the_tree_finds(tmp_path):
+    page = tmp_path / 'Acme_games.html'
+    html = write_page(page, 11)
+    full = extract_game_data(html)
+    assert len(full) == 11
+    for cards_per_chunk in (1, 3, 32):
+        assert list(iter_game_data(page, cards_per_chunk=cards_per_chunk)) == full
+    assert list(iter_game_data(page, cards_per_chunk=2, workers=2)) == full
+
+
+def test_streaming_mode_writes_every_game(tmp_path):
+    pages = tmp_path / 'pages'
+    pages.mkdir()
+    write_page(pages / 'Acme_games.html', 7)
+    write_page(pages / 'Zeta_games.html', 4)
+    jsonl_path = tmp_path / 'games.jsonl'
+
+    assert process_game_files(str(pages), incremental=False, jsonl_path=str(jsonl_path), workers=2) == []
+    games = [json.loads(line) for line in jsonl_path.read_text(encoding='utf-8').splitlines()]
+    assert [game['provider'] for game in games] == ['Acme'] * 7 + ['Zeta'] * 4
+    assert games[0] == {'name': 'Game 0', 'thumbnail': '/img/Game-0.png', 'url': '/en/slots/Game-0',
+                        'RTP': '96.0', 'provider': 'Acme'}
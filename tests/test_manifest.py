@@ -0,0 +1,40 @@
+from manifest import Manifest, incremental_map
+
+
+def word_count(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return len(f.read().split())
+
+
+def test_incremental_map_streams_and_persists_as_it_goes(tmp_path):
+    pages = []
+    for i in range(4):
+        page = tmp_path / f'page_{i}.html'
+        page.write_text('word ' * (i + 1), encoding='utf-8')
+        pages.append(page)
+    cache_dir = tmp_path / 'cache'
+
+    manifest = Manifest('test', 'v1', cache_dir)
+    results = incremental_map(word_count, pages, manifest)
+    first = next(results)
+    assert first == (pages[0], 1, None)
+    # Each parsed file is in the manifest as soon as it has been yielded
+    assert manifest.lookup(pages[0]) == (True, 1)
+    assert manifest.lookup(pages[1]) == (False, None)
+    assert [records for _, records, _ in results] == [2, 3, 4]
+    manifest.close()
+
+    pages[2].write_text('changed ' * 10, encoding='utf-8')
+    manifest = Manifest('test', 'v1', cache_dir)
+    results = list(incremental_map(word_count, pages[:3], manifest))
+    assert results == [(pages[0], 1, None), (pages[1], 2, None), (pages[2], 10, None)]
+    assert manifest.hits == {pages[0], pages[1]}
+    # page_3 left the input set and was pruned
+    assert manifest.lookup(pages[3]) == (False, None)
+    manifest.close()
+
+    # Another extractor version invalidates every entry
+    manifest = Manifest('test', 'v2', cache_dir)
+    assert manifest.split(pages[:3]) == ([], pages[:3])
+    manifest.close()
+
@@ -0,0 +1,34 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from parsers import available_backends, check_parity, default_backend
+
+CORPUS = Path(__file__).resolve().parent.parent / 'slotcatalog'
+# Provider pages checked per run; the CLI (python parsers.py) checks them all
+SAMPLE = 25
+
+
+def corpus_sample():
+    pages = sorted((CORPUS / 'details').glob('*.html'))
+    sample = random.Random(0).sample(pages, min(SAMPLE, len(pages)))
+    best = CORPUS / 'games_data' / 'best_slots.html'
+    return sample + ([best] if best.exists() else [])
+
+
+def test_backends_match_bs4():
+    files = corpus_sample()
+    if not files:
+        pytest.skip("no HTML corpus checked in")
+    if available_backends() == ['bs4']:
+        pytest.skip("no C parser backend installed")
+    # (backend, file, extractor) for every record that differs from bs4
+    assert check_parity([str(path) for path in files]) == []
+
+
+def test_default_backend_is_the_first_available(monkeypatch):
+    monkeypatch.delenv('SLOTCATALOG_PARSER', raising=False)
+    assert default_backend() == available_backends()[0]
+    monkeypatch.setenv('SLOTCATALOG_PARSER', 'bs4')
+    assert default_backend() == 'bs4'
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from best import parse_best_slots_file
+from rankmatrix import build_rank_matrix
+from toexcel import convert_json_to_csv
+
+CARD = """<div class="arrowCardItem">
+  <a class="slotPageOverlay-link" href="/en/slots/{slug}"></a>
+  <div class="gameItemimg"><img src="/img/{slug}.png"></div>
+  <h3 class="arrowCardName">{name}</h3>
+  <div class="propTable"><div class="propTableLine">Provider: <a href="/en/soft/{provider}">{provider}</a></div></div>
+  <div class="slotrank-block">SlotRank {rank}</div>
+</div>
+"""
+
+GAMES = {
+    'Book of Dead': ('Book-of-Dead', "Play'n GO", 890),
+    'Sweet Bonanza': ('Sweet-Bonanza', 'Pragmatic Play', 910),
+    'Starburst': ('Starburst', 'NetEnt', 870),
+}
+
+# SE has a page without cards and is the only country of 'nordics'
+LISTINGS = {
+    'DE': ['Book of Dead', 'Sweet Bonanza', 'Starburst'],
+    'GB': ['Sweet Bonanza', 'Book of Dead'],
+    'SE': [],
+}
+REGIONS = {'DE': 'eu', 'GB': 'eu', 'SE': 'nordics'}
+
+
+def write_pages(directory):
+    for country, names in LISTINGS.items():
+        cards = ''.join(CARD.format(name=name, slug=GAMES[name][0], provider=GAMES[name][1], rank=GAMES[name][2])
+                        for name in names)
+        (directory / f'best_slots_{country}.html').write_text(f'<html><body>{cards}</body></html>', encoding='utf-8')
+
+
+def test_best_slots_pages_to_rank_table(tmp_path):
+    write_pages(tmp_path)
+    rankings = {country: parse_best_slots_file(str(tmp_path / f'best_slots_{country}.html'))
+                for country in LISTINGS}
+    assert [game['name'] for game in rankings['DE']] == LISTINGS['DE']
+    assert rankings['GB'][0] == {'name': 'Sweet Bonanza', 'game_url': '/en/slots/Sweet-Bonanza',
+                                 'image_url': '/img/Sweet-Bonanza.png', 'provider': 'Pragmatic Play',
+                                 'rank': 910}
+    assert rankings['SE'] == []
+
+    matrix = build_rank_matrix(rankings)
+    top = matrix.region_top(REGIONS, n=2)
+    assert top['eu'] == [('Book of Dead', 1.5), ('Sweet Bonanza', 1.5)]
+    # Nothing listed in the region: no arbitrary "top" games
+    assert top['nordics'] == []
+    assert matrix.region_top(REGIONS, n=0)['eu'] == []
+
+    # A country without games gets no column, as in the original CSV
+    rankings_path = tmp_path / 'all_games_by_country.json'
+    rankings_path.write_text(json.dumps(rankings), encoding='utf-8')
+    csv_path = convert_json_to_csv(str(rankings_path), str(tmp_path / 'rankings.csv'))
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['Game Name', 'provider', 'SlotRank', 'DE', 'GB']
+    assert rows[1:] == [
+        ['Book of Dead', "Play'n GO", '890', '1', '2'],
+        ['Sweet Bonanza', 'Pragmatic Play', '910', '2', '1'],
+        ['Starburst', 'NetEnt', '870', '3', ''],
+    ]
@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+import json
+
+from aiohttp.test_utils import TestServer
+
+from slotcatalog.crawl.client import HttpClient
+from slotcatalog.crawl.engine import run_job
+from slotcatalog.crawl.jobs import game_details_job
+from slotcatalog.crawl.revalidate import ValidatorCache, body_digest
+from slotcatalog.crawl.standin import STATS, make_app
+
+SLUGS = ('Book-of-Dead', 'Sweet-Life', 'Keks')
+
+
+def etag_of(text):
+    return '"' + hashlib.sha1(text.encode('utf-8')).hexdigest() + '"'
+
+
+async def crawl(server, base_dir, cache, revalidate):
+    async with HttpClient(base_url=str(server.make_url('')), rate=100) as client:
+        job = game_details_job(base_dir=base_dir, validators=cache, revalidate=revalidate)
+        return await run_job(job, client, window=3)
+
+
+def test_recrawl_gets_304s_and_rewrites_only_edited_pages(tmp_path):
+    site = tmp_path / 'site'
+    site.mkdir()
+    for slug in SLUGS:
+        (site / f'{slug}.html').write_text(f'<html><h1>{slug}</h1></html>', encoding='utf-8')
+    base_dir = tmp_path / 'data'
+    (base_dir / 'game_details').mkdir(parents=True)
+    (base_dir / 'game_urls.json').write_text(json.dumps([f'/en/slots/{slug}' for slug in SLUGS]))
+    saved = {slug: base_dir / 'game_details' / f'{slug}.html' for slug in SLUGS}
+
+    async def scenario():
+        app = make_app(site)
+        async with TestServer(app) as server:
+            with ValidatorCache(base_dir / 'game_details' / '.validators.db') as cache:
+                # First crawl: every page is downloaded and its validators kept
+                stats = await crawl(server, base_dir, cache, revalidate=False)
+                assert stats['done'] == 3
+                assert app[STATS] == {200: 3, 304: 0, 404: 0}
+                for slug in SLUGS:
+                    body = saved[slug].read_text(encoding='utf-8')
+                    etag, last_modified, sha1 = cache.get(f'/en/slots/{slug}')
+                    assert etag == etag_of(body)
+                    assert last_modified
+                    assert sha1 == body_digest(body)
+                mtimes = {slug: saved[slug].stat().st_mtime_ns for slug in SLUGS}
+
+                # Recrawl: all 304, nothing rewritten
+                stats = await crawl(server, base_dir, cache, revalidate=True)
+                assert stats['skipped'] == 3
+                assert app[STATS] == {200: 3, 304: 3, 404: 0}
+                assert {slug: saved[slug].stat().st_mtime_ns for slug in SLUGS} == mtimes
+
+                # An edited page comes back 200 and is rewritten with new validators
+                edited = '<html><h1>Sweet Life</h1><p>RTP 96%</p></html>'
+                (site / 'Sweet-Life.html').write_text(edited, encoding='utf-8')
+                stats = await crawl(server, base_dir, cache, revalidate=True)
+                assert stats['done'] == 1 and stats['skipped'] == 2
+                assert app[STATS] == {200: 4, 304: 5, 404: 0}
+                assert saved['Sweet-Life'].read_text(encoding='utf-8') == edited
+                etag, _, sha1 = cache.get('/en/slots/Sweet-Life')
+                assert etag == etag_of(edited)
+                assert sha1 == body_digest(edited)
+                assert saved['Keks'].stat().st_mtime_ns == mtimes['Keks']
+
+    asyncio.run(scenario())